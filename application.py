@@ -2,12 +2,17 @@
 
 
 import sys
+import argparse
+import nn
 from world_generator import WorldGenerator
 from renderer.v3dto.renderer import Renderer
 from simparams import sp
 from service.logger.logger import logme
 from service.performance_monitor.performance_monitor import PerformanceMonitor
 from service.world_persistence.world_persistence import world_persistence
+from service.jit_warmup.jit_warmup import warmup, format_report
+from service.rng.rng import rng
+from service.checkpoint.checkpoint import CheckpointScheduler
 
 
 class Application():
@@ -19,15 +24,30 @@ class Application():
 		self.performance_monitor = PerformanceMonitor(self)
 		self.experiment_mode = False
 		self.experiment = None
+		self.save_job = None  # последнее фоновое сохранение (SaveJob) - его статус показывает Renderer
 
-		if len(sys.argv) == 3 and sys.argv[1] == '-csvmap':
+		args = Application.parse_args(sys.argv[1:])
+		# Бэкенд нейросети выбирается на запуск: -nn rnn, или группами существ: -nn-groups ff:1,rnn:1
+		if args.nn:
+			nn.set_default_backend(args.nn)
+		backend_groups = nn.parse_backend_groups(args.nn_groups)
+		# Зерно мира: -seed N повторяет прогон; без него зерно случайное, но печатается и пишется в сохранения
+		rng.seed(args.seed)
+		print(f"Зерно: {rng.seed_value}")
+
+		# Горячие numba-ядра компилируются (или грузятся из дискового кэша) до первого тика
+		backends = list(dict.fromkeys([nn.get_default_backend()] + list(backend_groups or {})))
+		print(format_report(warmup(backends)))
+
+		if args.csvmap:
 			# Загрузка мира из CSV
 			self.world = WorldGenerator.generate_world_fromCSV(
-				file_path=sys.argv[2],
+				file_path=args.csvmap,
 				random_wall_count=350, 
 				food_count=sp.food_amount,
 				creatures_count=500,
 				border_walls=True,
+				backend_groups=backend_groups,
 			)
 		else:
 			# Генерация мира стандартным способом
@@ -38,12 +58,62 @@ class Application():
 				food_count=sp.food_amount,
 				creatures_count=500,
 				border_walls=True,
+				backend_groups=backend_groups,
 			)
 		
 
+		# Продолжение с последнего автосохранения
+		if args.resume:
+			stem = CheckpointScheduler.latest(args.autosave_name)
+			if stem is None:
+				print(f"Автосохранений '{args.autosave_name}' нет - начинаем новый мир")
+			elif world_persistence.load_world(self.world, stem):
+				print(f"Продолжение с тика {self.world.tick}: {stem}")
+
+		# Автосохранение по тикам и/или по времени; снимок в цикле, запись в фоне
+		self.autosave = CheckpointScheduler(
+			args.autosave_name,
+			every_ticks=args.autosave_every,
+			every_seconds=args.autosave_seconds,
+			keep_last=args.autosave_keep,
+			keep_every=args.autosave_keep_every,
+			delta=args.autosave_delta,
+			full_every=args.autosave_full_every,
+		)
+
+		# Пофазный профайлер тика: фазы мира отмечает World.update(), checkpoint, logging и render - цикл ниже
+		self.world.profiler = self.performance_monitor.profiler
+		self.performance_monitor.print_phases = args.profile
+		if args.profile_csv:
+			self.performance_monitor.profiler.open_csv(args.profile_csv)
+
 		self.renderer = Renderer(self.world, self)
 		
 		
+	@staticmethod
+	def parse_args(argv):
+		parser = argparse.ArgumentParser(prog='nnevol.py')
+		parser.add_argument('-csvmap', metavar='PATH', help="карта мира из CSV-файла")
+		parser.add_argument('-nn', choices=nn.available_backends(), help="бэкенд нейросети для новых существ")
+		parser.add_argument('-nn-groups', dest='nn_groups', metavar='NAME:SHARE,...',
+			help="группы существ с разными бэкендами, например ff:1,rnn:1")
+		parser.add_argument('-seed', type=int, help="зерно случайных чисел для воспроизводимого прогона")
+		parser.add_argument('-autosave-every', dest='autosave_every', type=int, default=0, metavar='N', help="автосохранение каждые N тиков")
+		parser.add_argument('-autosave-seconds', dest='autosave_seconds', type=float, default=0, metavar='S', help="автосохранение каждые S секунд")
+		parser.add_argument('-autosave-name', dest='autosave_name', default='autosave', help="базовое имя автосохранений в saves/")
+		parser.add_argument('-autosave-keep', dest='autosave_keep', type=int, default=5, metavar='N', help="хранить N последних автосохранений (0 - все)")
+		parser.add_argument('-autosave-keep-every', dest='autosave_keep_every', type=int, default=0, metavar='K', help="дополнительно хранить каждое K-е автосохранение")
+		parser.add_argument('-autosave-delta', dest='autosave_delta', action='store_true', help="между полными автосохранениями писать дельты")
+		parser.add_argument('-autosave-full-every', dest='autosave_full_every', type=int, default=10, metavar='K', help="с -autosave-delta каждое K-е автосохранение полное")
+		parser.add_argument('-resume', action='store_true', help="продолжить с последнего автосохранения")
+		parser.add_argument('-profile', action='store_true', help="печатать пофазные тайминги тика в консоль")
+		parser.add_argument('-profile-csv', dest='profile_csv', metavar='PATH', help="дописывать пофазные тайминги тика в CSV-файл")
+		# Раньше окно не разбирало аргументы вовсе - незнакомые пропускаем с предупреждением, а не выходим
+		args, unknown = parser.parse_known_args(argv)
+		if unknown:
+			print(f"Неизвестные аргументы пропущены: {' '.join(unknown)}")
+		return args
+
 	def run(self):
 
 		print("/ Fucking go! /")
@@ -56,16 +126,26 @@ class Application():
 				self.renderer.control_run()
 			else:
 				if self.is_running:
+					# Точки лучей зрения записываем только когда viewport их рисует
+					self.world.raycast_dots_mode = 'all' if self.animate_flag else 'none'
 					self.world.update()
 					self.world.update_map()
+					profiler = self.performance_monitor.profiler
+					job = self.autosave.maybe_checkpoint(self.world)
+					if job is not None:
+						self.save_job = job
+					profiler.lap('checkpoint')
 					if logme.is_enabled():
 						logme.write_stats(self.world.creatures)
 						logme.write_population_size(len(self.world.creatures))
+					profiler.lap('logging')
 					if self.animate_flag:
 						self.renderer.draw(self.renderer._prepare_render_state_dto())
 						self.renderer.control_run()
 					else:
 						self.renderer.control_run()
+					profiler.lap('render')
+					profiler.end_tick()
 				else:
 					self.renderer.draw(self.renderer._prepare_render_state_dto())
 					self.renderer.control_run()
@@ -75,6 +155,8 @@ class Application():
 
 			self.performance_monitor.tick(self.world.tick)
 
+		self.autosave.close()
+		world_persistence.wait_saves()
 		print("/ Terminated. /")
 
 	def init_experiment(self, experiment_type: str, experimental_creature_id: int = None):
@@ -144,7 +226,10 @@ class Application():
 		Args:
 			save_file_name: Имя файла для сохранения
 		"""
-		world_persistence.save_world(self.world, save_file_name)
+		# Снимок мира снимается сразу, запись файла идет в фоне - симуляция не останавливается
+		job = world_persistence.save_world_async(self.world, save_file_name)
+		if job is not None:
+			self.save_job = job
 	
 	def load_world(self, save_file_name: str):
 		"""Загрузить мир из слота.
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Холодный и теплый старт горячих numba-ядер.
+
+Каждый замер - отдельный процесс (как короткий запуск перебора параметров):
+импорт модулей + service.jit_warmup.warmup(). Первый процесс стартует с пустым
+дисковым кэшем numba и компилирует ядра, следующие грузят их из кэша.
+Кэш пишется во временный каталог (NUMBA_CACHE_DIR), рабочий кэш проекта не трогается.
+
+Запуск:
+    python benchmarks/bench_jit_startup.py
+    python benchmarks/bench_jit_startup.py --backends ff rnn --warm-runs 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+from service.jit_warmup.jit_warmup import warmup
+report = warmup(sys.argv[1:])
+report['startup_seconds'] = time.perf_counter() - start
+print(json.dumps(report))
+"""
+
+
+def run_once(backends, cache_dir: str) -> dict:
+    env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD_CODE, *backends], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['process_seconds'] = time.perf_counter() - start
+    return report
+
+
+def print_report(title: str, report: dict) -> None:
+    print(f"{title}: процесс {report['process_seconds']:.2f} с, импорт+прогрев {report['startup_seconds']:.2f} с")
+    for kernel in report['kernels']:
+        print(f"  {kernel['name']:<55s} {kernel['seconds']:7.3f} с  {kernel['source']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', nargs='+', default=['ff'])
+    parser.add_argument('--warm-runs', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='nnevol_numba_cache_') as cache_dir:
+        cold = run_once(args.backends, cache_dir)
+        print_report("Холодный старт", cold)
+        warm = [run_once(args.backends, cache_dir) for _ in range(args.warm_runs)]
+        for index, report in enumerate(warm, 1):
+            print_report(f"Теплый старт #{index}", report)
+    best_warm = min(report['startup_seconds'] for report in warm)
+    print(f"\nУскорение старта: {cold['startup_seconds'] / best_warm:.1f}x "
+          f"({cold['startup_seconds']:.2f} с -> {best_warm:.2f} с)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Сравнение скорости инференса бэкендов нейросетей на полной популяции.
+
+Существа живут в CreaturePool, поэтому веса (и состояния RNN) берутся прямо
+из GenomeBank - так же, как в World.update(). Меряется один тик:
+prepare_calc + make_all_decisions.
+
+Запуск:
+    python benchmarks/bench_nn_backends.py
+    python benchmarks/bench_nn_backends.py --backends ff rnn --sizes 1000 --repeats 50
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from creature import Creature
+from creature_pool import CreaturePool
+
+BACKEND_MODULES = {
+    'ff': 'nn.my_handmade_ff',
+    'rnn': 'nn.rnn',
+    'torch_rnn': 'nn.nn_torch_rnn',
+}
+
+
+def time_tick(network_class, creatures, all_inputs, repeats: int) -> float:
+    """Среднее время prepare_calc + make_all_decisions, в миллисекундах."""
+    network_class.make_all_decisions(all_inputs, creatures, network_class.prepare_calc(creatures)) # прогрев/компиляция
+    start = time.perf_counter()
+    for _ in range(repeats):
+        creatures_nns = network_class.prepare_calc(creatures)
+        network_class.make_all_decisions(all_inputs, creatures, creatures_nns)
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', nargs='+', default=list(BACKEND_MODULES))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 1000, 5000])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    for n in args.sizes:
+        print(f"\n{n} creatures:")
+        for backend in args.backends:
+            try:
+                network_class = importlib.import_module(BACKEND_MODULES[backend]).NeuralNetwork
+            except ImportError as e:
+                print(f"  {backend:<9s} skipped: {e}")
+                continue
+            pool = CreaturePool(capacity=n)
+            for _ in range(n):
+                pool.add(Creature(1, 1, nn=network_class()))
+            creatures = pool.creatures()
+            all_inputs = rng.random((n, 50), dtype=np.float32)
+            ms = time_tick(network_class, creatures, all_inputs, args.repeats)
+            print(f"  {backend:<9s} {ms:8.3f} ms/tick  {n / ms * 1000.0:12.0f} creature-steps/s")
+
+
+if __name__ == '__main__':
+    main()
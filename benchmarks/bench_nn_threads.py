@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Замер масштабирования инференса нейросетей (nn/my_handmade_ff.py) по ядрам.
+
+Для 250, 1000 и 5000 существ меряет NeuralNetwork.make_all_decisions
+в последовательном режиме и в параллельном с 1..N потоками numba.
+Заодно проверяет, что параллельный режим дает те же выходы, что и последовательный.
+
+Запуск:
+    python benchmarks/bench_nn_threads.py
+    python benchmarks/bench_nn_threads.py --sizes 250 1000 --threads 1 2 4 --repeats 50
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from nn.my_handmade_ff import NeuralNetwork, INPUT_SIZE
+from nn import threads
+
+
+class _Holder:
+    """Минимальный носитель сети - prepare_calc нужен только атрибут .nn"""
+    def __init__(self, nn):
+        self.nn = nn
+
+
+def time_decisions(all_inputs, holders, nns, repeats: int) -> float:
+    """Среднее время одного вызова make_all_decisions, в миллисекундах."""
+    NeuralNetwork.make_all_decisions(all_inputs, holders, nns) # прогрев/компиляция
+    start = time.perf_counter()
+    for _ in range(repeats):
+        NeuralNetwork.make_all_decisions(all_inputs, holders, nns)
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 1000, 5000])
+    parser.add_argument('--threads', type=int, nargs='+', default=None,
+                        help='числа потоков (по умолчанию 1..max)')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    thread_counts = args.threads or list(range(1, threads.max_threads() + 1))
+    print(f"numba threads available: {threads.max_threads()}")
+
+    rng = np.random.default_rng(args.seed)
+    np.random.seed(args.seed)
+    for n in args.sizes:
+        holders = [_Holder(NeuralNetwork()) for _ in range(n)]
+        nns = NeuralNetwork.prepare_calc(holders)
+        all_inputs = rng.random((n, INPUT_SIZE), dtype=np.float32)
+
+        NeuralNetwork.parallel = False
+        serial_ms = time_decisions(all_inputs, holders, nns, args.repeats)
+        serial_outs = NeuralNetwork.make_all_decisions(all_inputs, holders, nns)
+
+        print(f"\n{n} creatures: serial {serial_ms:8.3f} ms")
+        NeuralNetwork.parallel = True
+        for num in thread_counts:
+            actual = threads.set_threads(num)
+            ms = time_decisions(all_inputs, holders, nns, args.repeats)
+            same = np.array_equal(NeuralNetwork.make_all_decisions(all_inputs, holders, nns), serial_outs)
+            print(f"  parallel x{actual:<3d} {ms:8.3f} ms  speedup {serial_ms / ms:5.2f}  outputs {'match' if same else 'DIFFER'}")
+
+    threads.set_threads(None)
+
+
+if __name__ == '__main__':
+    main()
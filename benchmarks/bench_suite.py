@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Воспроизводимый набор замеров горячих путей симуляции.
+
+Сценарии с фиксированным зерном (карта, численность, пища):
+    small    80x60,   100 существ,  1500 пищи
+    default  100x50, 1000 существ,  1500 пищи (как в Application)
+    large    400x250, 5000 существ, 50000 пищи
+
+Замеры в каждом сценарии:
+    world_update         полный тик World.update()
+    death, reprod        внутри тиков World.update() (control_population;
+                         при популяции от 950 reprod не вызывается - 0 замеров)
+    update_map           World.update_map() после каждого тика
+    vision               ядро зрения на текущем состоянии мира
+    fast_calc_all_outs   prepare_calc + make_all_decisions бэкенда по умолчанию
+    save, load           world_persistence во временный каталог
+
+Результаты - JSON (медиана, среднее, минимум, p95 в миллисекундах). С --baseline
+новые медианы сравниваются с сохраненной базой: замедление больше --threshold
+помечается как регрессия, и процесс завершается с кодом 1.
+
+Запуск:
+    python benchmarks/bench_suite.py --out bench.json
+    python benchmarks/bench_suite.py --scenarios small default --update-baseline
+    python benchmarks/bench_suite.py --baseline benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import numba
+
+from simparams import sp
+from world import World
+from world_generator import WorldGenerator
+from service.jit_warmup.jit_warmup import warmup
+from service.world_persistence.world_persistence import world_persistence
+from service.rng.rng import rng
+
+SCENARIOS = {
+    'small':   {'width': 80,  'height': 60,  'walls': 100, 'creatures': 100,  'food': 1500},
+    'default': {'width': 100, 'height': 50,  'walls': 350, 'creatures': 1000, 'food': 1500},
+    'large':   {'width': 400, 'height': 250, 'walls': 2000, 'creatures': 5000, 'food': 50000},
+}
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+
+
+def stats_ms(samples) -> dict:
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    if len(values) == 0:
+        return {'median_ms': 0.0, 'mean_ms': 0.0, 'min_ms': 0.0, 'p95_ms': 0.0, 'samples': 0}
+    return {
+        'median_ms': round(float(np.median(values)), 4),
+        'mean_ms': round(float(values.mean()), 4),
+        'min_ms': round(float(values.min()), 4),
+        'p95_ms': round(float(np.percentile(values, 95)), 4),
+        'samples': int(len(values)),
+    }
+
+
+def time_calls(func, repeats: int) -> list:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def timed_method(world, name: str, samples: list) -> None:
+    """Подменяет метод экземпляра мира оберткой, которая копит время вызовов в samples."""
+    method = getattr(world, name)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = method(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+        return result
+    setattr(world, name, wrapper)
+
+
+def build_world(scenario: dict, seed: int) -> World:
+    rng.seed(seed)
+    world = WorldGenerator.generate_world(
+        width=scenario['width'],
+        height=scenario['height'],
+        wall_count=scenario['walls'],
+        food_count=scenario['food'],
+        creatures_count=scenario['creatures'],
+        border_walls=True,
+    )
+    world.update_map()
+    return world
+
+
+def run_scenario(name: str, scenario: dict, args) -> dict:
+    saved_food_amount = sp.food_amount
+    sp.food_amount = scenario['food'] # regulate_food держит пищу на уровне сценария
+    try:
+        world = build_world(scenario, args.seed)
+        world.update() # первый тик - вне замеров
+        world.update_map()
+
+        # Тики мира; death/reprod меряются внутри них
+        death_samples, reprod_samples, update_map_samples, update_samples = [], [], [], []
+        timed_method(world, 'death', death_samples)
+        timed_method(world, 'reprod', reprod_samples)
+        for _ in range(args.ticks):
+            start = time.perf_counter()
+            world.update()
+            update_samples.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            world.update_map()
+            update_map_samples.append(time.perf_counter() - start)
+
+        # Зрение и инференс на зафиксированном состоянии мира
+        pool = world.pool
+        slots = pool.slots()
+        creatures_pos = np.column_stack((pool.x[slots], pool.y[slots], pool.angle[slots], pool.vision_distance[slots])).astype('float')
+        record_dots = world.get_raycast_dots_mask(slots)
+        day_lighting = World.dayLighting(world.tick)
+        vision_samples = time_calls(lambda: world.get_all_visions(world.map, creatures_pos, day_lighting, record_dots), args.repeats)
+        all_visions, _ = world.get_all_visions(world.map, creatures_pos, day_lighting, record_dots)
+        all_inputs = np.concatenate((all_visions, World.get_all_other_inputs(pool, slots)), axis=1)
+        inference_samples = time_calls(lambda: world.make_all_decisions(all_inputs), args.repeats)
+
+        # Сохранение и загрузка - в конце: загрузка перезаписывает состояние мира
+        with tempfile.TemporaryDirectory(prefix='nnevol_bench_') as tmp, contextlib.redirect_stdout(io.StringIO()):
+            world_persistence.SAVES_DIR = Path(tmp)
+            try:
+                save_samples = time_calls(lambda: world_persistence.save_world(world, 'bench'), args.save_repeats)
+                stem = sorted(Path(tmp).glob('bench__*.world.npz'))[0].name[:-len('.world.npz')]
+                load_samples = time_calls(lambda: world_persistence.load_world(world, stem), args.save_repeats)
+            finally:
+                del world_persistence.SAVES_DIR # снова атрибут класса
+    finally:
+        sp.food_amount = saved_food_amount
+
+    return {
+        'world_update': stats_ms(update_samples),
+        'death': stats_ms(death_samples),
+        'reprod': stats_ms(reprod_samples),
+        'update_map': stats_ms(update_map_samples),
+        'vision': stats_ms(vision_samples),
+        'fast_calc_all_outs': stats_ms(inference_samples),
+        'save': stats_ms(save_samples),
+        'load': stats_ms(load_samples),
+    }
+
+
+def environment() -> dict:
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': numba.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numba_threads': numba.get_num_threads(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Сравнение медиан с базой. Возвращает список регрессий (сценарий, замер, база, сейчас, изменение)."""
+    regressions = []
+    print(f"\nСравнение с базой ({baseline['environment'].get('created_at', '?')}), порог +{threshold * 100:.0f}%:")
+    for scenario, benches in results['scenarios'].items():
+        base_benches = baseline['scenarios'].get(scenario)
+        if base_benches is None:
+            print(f"  {scenario}: нет в базе")
+            continue
+        for bench, stats in benches.items():
+            base = base_benches.get(bench)
+            if base is None or base['median_ms'] <= 0:
+                continue
+            change = stats['median_ms'] / base['median_ms'] - 1.0
+            mark = 'РЕГРЕССИЯ' if change > threshold else ('ускорение' if change < -threshold else '')
+            print(f"  {scenario:<8s} {bench:<20s} {base['median_ms']:10.3f} -> {stats['median_ms']:10.3f} ms  {change * 100:+6.1f}%  {mark}")
+            if change > threshold:
+                regressions.append((scenario, bench, base['median_ms'], stats['median_ms'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--ticks', type=int, default=50, help="тиков World.update() на сценарий")
+    parser.add_argument('--repeats', type=int, default=20, help="повторов для зрения и инференса")
+    parser.add_argument('--save-repeats', type=int, default=1, help="повторов сохранения и загрузки")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', metavar='PATH', help="записать результаты в JSON")
+    parser.add_argument('--baseline', metavar='PATH', help=f"сравнить с базой (например {DEFAULT_BASELINE.name})")
+    parser.add_argument('--threshold', type=float, default=0.10, help="допустимое замедление медианы, доля")
+    parser.add_argument('--update-baseline', action='store_true', help=f"записать результаты как базу в {DEFAULT_BASELINE}")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        warmup()
+
+    results = {'environment': environment(), 'seed': args.seed, 'ticks': args.ticks, 'scenarios': {}}
+    for name in args.scenarios:
+        scenario = SCENARIOS[name]
+        print(f"\n{name}: {scenario['width']}x{scenario['height']}, существ {scenario['creatures']}, пищи {scenario['food']}")
+        results['scenarios'][name] = run_scenario(name, scenario, args)
+        for bench, stats in results['scenarios'][name].items():
+            print(f"  {bench:<20s} median {stats['median_ms']:10.3f} ms   p95 {stats['p95_ms']:10.3f} ms   ({stats['samples']})")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"\nРезультаты: {args.out}")
+    if args.update_baseline:
+        DEFAULT_BASELINE.write_text(json.dumps(results, indent=2))
+        print(f"База обновлена: {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nРегрессий: {len(regressions)}")
+            sys.exit(1)
+        print("\nРегрессий нет")
+
+
+if __name__ == '__main__':
+    main()
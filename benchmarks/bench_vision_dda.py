@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Сравнение ядер зрения: прежний шаг по лучу (march) и точный обход клеток (DDA).
+
+Точность:
+- совпадение класса увиденного объекта (пусто/стена/пища/существо) по всем пикселям
+- средняя разница яркости пикселей, где оба ядра видят одно и то же
+- стены в 1 клетку толщиной по диагонали: сколько лучей march проскакивает насквозь
+Скорость: среднее время одного вызова на сгенерированном мире.
+
+Запуск:
+    python benchmarks/bench_vision_dda.py
+    python benchmarks/bench_vision_dda.py --creatures 500 2000 --repeats 30
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from simparams import sp
+from world import World
+from world_generator import WorldGenerator
+from service.rng.rng import rng
+
+RESOLUTION = 15
+
+
+def classify(all_visions: np.ndarray) -> np.ndarray:
+    """Класс объекта в каждом пикселе по соотношению каналов: 0 пусто, 1 стена, 2 пища, 3 существо."""
+    r = all_visions[:, :RESOLUTION]
+    g = all_visions[:, RESOLUTION:2 * RESOLUTION]
+    b = all_visions[:, 2 * RESOLUTION:]
+    cls = np.zeros(r.shape, dtype=np.int64)
+    cls[(r > 0) & (r == g) & (g == b)] = 1
+    cls[r > b] = 2
+    cls[b > r] = 3
+    return cls
+
+
+def time_kernel(kernel, world_map, creatures_pos, record_dots, repeats: int) -> float:
+    kernel(world_map, creatures_pos, 1.0, record_dots) # прогрев/компиляция
+    start = time.perf_counter()
+    for _ in range(repeats):
+        kernel(world_map, creatures_pos, 1.0, record_dots)
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def diagonal_wall_leaks() -> tuple:
+    """Лучи в сторону диагональной стены толщиной в 1 клетку: сколько лучей ядро пропустило насквозь."""
+    world_map = np.zeros((60, 60), dtype='int')
+    for i in range(60):
+        world_map[i, 59 - i] = 1 # диагональ из правого верхнего в левый нижний угол
+    generator = np.random.default_rng(0)
+    n = 2000
+    xs = generator.uniform(2, 25, n)
+    ys = generator.uniform(2, 25, n)
+    angles = generator.uniform(0.7, 0.87, n) # все 15 лучей смотрят вправо-вниз, на стену
+    creatures_pos = np.column_stack((xs, ys, angles, np.full(n, 80.0))).astype('float')
+    record_dots = np.zeros(n, dtype=np.bool_)
+    leaks = []
+    for kernel in (World.fast_get_all_visions_darken_with_distance, World.fast_get_all_visions_dda):
+        all_visions, _ = kernel(world_map, creatures_pos, 1.0, record_dots)
+        leaks.append(int(np.count_nonzero(classify(all_visions) != 1)))
+    return n * RESOLUTION, leaks[0], leaks[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--creatures', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    for n in args.creatures:
+        rng.seed(args.seed)
+        world = WorldGenerator.generate_world(
+            width=100, height=50, wall_count=350,
+            food_count=sp.food_amount, creatures_count=n, border_walls=True,
+        )
+        world.update_map()
+        slots = world.pool.slots()
+        creatures_pos = np.column_stack((
+            world.pool.x[slots], world.pool.y[slots],
+            world.pool.angle[slots], world.pool.vision_distance[slots],
+        )).astype('float')
+        record_dots = np.zeros(len(slots), dtype=np.bool_)
+
+        march, _ = World.fast_get_all_visions_darken_with_distance(world.map, creatures_pos, 1.0, record_dots)
+        dda, _ = World.fast_get_all_visions_dda(world.map, creatures_pos, 1.0, record_dots)
+        march_cls = classify(march)
+        dda_cls = classify(dda)
+        same = march_cls == dda_cls
+        both_seen = same & (march_cls > 0)
+        brightness_diff = np.abs(march - dda).reshape(len(slots), 3, RESOLUTION).max(axis=1)[both_seen]
+
+        march_ms = time_kernel(World.fast_get_all_visions_darken_with_distance, world.map, creatures_pos, record_dots, args.repeats)
+        dda_ms = time_kernel(World.fast_get_all_visions_dda, world.map, creatures_pos, record_dots, args.repeats)
+
+        print(f"\n{len(slots)} creatures, map {world.width}x{world.height}")
+        print(f"  march {march_ms:8.3f} ms   dda {dda_ms:8.3f} ms   speedup {march_ms / dda_ms:5.2f}")
+        print(f"  same object class: {same.mean() * 100:6.2f}% of pixels")
+        if both_seen.any():
+            print(f"  brightness diff where both see the same object: mean {brightness_diff.mean():.4f}, max {brightness_diff.max():.4f}")
+
+    rays, march_leaks, dda_leaks = diagonal_wall_leaks()
+    print(f"\nthin diagonal wall, {rays} rays: march leaks {march_leaks}, dda leaks {dda_leaks}")
+
+
+if __name__ == '__main__':
+    main()
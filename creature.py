@@ -1,14 +1,39 @@
 # -*- coding: utf-8 -*-
-from nn import NeuralNetwork
+from nn import get_backend
+from creature_pool import PoolField
 import copy
-import random
 from simparams import sp
+from service.rng.rng import rng
 
 
 class Creature():
     _id_counter = 0
+
+    # Скалярные поля существа. Пока существо живет в мире, они хранятся
+    # в колонках CreaturePool, а сам объект служит лишь представлением своего слота.
+    id = PoolField(int)
+    generation = PoolField(int)
+    age = PoolField(int)
+    x = PoolField(float)
+    y = PoolField(float)
+    angle = PoolField(float)
+    speed = PoolField(float)
+    energy = PoolField(float)
+    health = PoolField(float)
+    bite_effort = PoolField(float)
+    vision_distance = PoolField(float)
+    bite_range = PoolField(float)
+    input_hurting = PoolField(float)
+    input_starving = PoolField(float)
+    input_wayblocked = PoolField(float)
+    input_bite_success = PoolField(float)
     
-    def __init__(self, x: float, y: float):
+    def __init__(self, x: float, y: float, nn=None):
+        # Пока существо не добавлено в пул мира - поля хранятся локально
+        self._pool = None
+        self._slot = -1
+        self._local = {}
+
         # назначаем уникальный ID
         Creature._id_counter += 1
         self.id = Creature._id_counter
@@ -20,11 +45,13 @@ class Creature():
         self.health = 1.0
         self.age = 0
         self.speed = 1
-        self.angle = random.random()*3.14
+        self.angle = rng.stream('creatures').random()*3.14
         self.bite_effort = 0.0
         self.vision_distance = 20
         self.bite_range = 0.5
-        self.nn = NeuralNetwork()
+        # Сеть можно передать готовой (потомок, загрузка мира) - тогда случайная не создается
+        # Случайная сеть создается бэкендом по умолчанию (nn.set_default_backend)
+        self.nn = nn if nn is not None else get_backend()()
         self.birth_ages = Creature.diceRandomAges(sp.reproduction_ages) # Рандомные возрасты для рождения потомства
         # Дополнительные входы сетки, которые не зависят от зрения, а зависят от других факторов, таких как голод, боль и т.д.
         self.input_hurting = 0.0
@@ -32,6 +59,23 @@ class Creature():
         self.input_wayblocked = 0.0
         self.input_bite_success = 0.0
 
+    @property
+    def slot(self) -> int:
+        """Номер слота в CreaturePool, или -1 если существо не в пуле."""
+        return self._slot
+
+    @property
+    def nn(self):
+        return self._nn
+
+    @nn.setter
+    def nn(self, nn):
+        # Веса сети живого существа лежат в GenomeBank пула - новую сеть перепривязываем к слоту
+        if self._pool is not None:
+            self._pool.unbind_genome(self._nn)
+            self._pool.bind_genome(self._slot, nn)
+        self._nn = nn
+
 
     @staticmethod
     def string_to_list(input_string):
@@ -91,13 +135,15 @@ class Creature():
             reproduction_ages_list = reproduction_ages
         else:
             reproduction_ages_list = Creature.string_to_list(reproduction_ages)
-        ages = []
-        for age in reproduction_ages_list:
-            variation = random.randint(-10, 10)
-            ages.append(age + variation)
-        return ages
+        # Разброс возрастов [-10, 10] - одной пачкой из потока существ
+        variations = rng.stream('creatures').integers(-10, 11, size=len(reproduction_ages_list))
+        return [age + int(variation) for age, variation in zip(reproduction_ages_list, variations)]
     
-    def reprodCreature(self):
+    def reprodCreature(self, mutate: bool = True):
+        # mutate=False - мир сам мутирует всех новорожденных тика одним пакетом (World.reprod).
+        # Если родитель живет в пуле, потомки получают пустые сети (blank()): World.reprod
+        # добавляет их с genome_from=слот родителя, и веса копируются один раз строкой банка
+        in_bank = not mutate and self.nn._bank is not None
         cr_babies = []
         # print ("начало цикла по рождению детей")
         for j in range(0, sp.reproduction_offsprings):
@@ -110,11 +156,11 @@ class Creature():
             # print ("Процесс рождения существа. 4")
             # c.generation = self.generation + 1
             # print ("Процесс рождения существа. 5")
-            c = Creature(self.x, self.y)
+            # Бэкенд потомок наследует от родителя; случайная инициализация весов не нужна
+            c = Creature(self.x, self.y, nn=type(self.nn).blank() if in_bank else type(self.nn).copy(self.nn))
             c.generation = self.generation + 1
             # print ("Рождение существа поколения №" + str(c.generation))
-            c.nn = NeuralNetwork.copy(self.nn)
-            if sp.allow_mutations == 1:
+            if mutate and sp.allow_mutations == 1:
                 c.nn.mutate(sp.mutation_probability, sp.mutation_strength)
                 # print("##################  c.nn.mutate  ##################")
             # c.isSelected = False
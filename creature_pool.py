@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""Колоночное хранилище состояния существ (structure-of-arrays)."""
+
+import heapq
+import numpy as np
+from simparams import sp
+from nn.genome_bank import GenomeBank
+
+
+# Колонки пула: имя -> dtype.
+# Все скалярные поля существа хранятся здесь непрерывными массивами,
+# чтобы World.update() мог работать сразу со всей популяцией.
+POOL_COLUMNS = {
+    'id': np.int64,
+    'generation': np.int32,
+    'age': np.int32,
+    'x': np.float32,
+    'y': np.float32,
+    'angle': np.float32,
+    'speed': np.float32,
+    'energy': np.float32,
+    'health': np.float32,
+    'bite_effort': np.float32,
+    'vision_distance': np.float32,
+    'bite_range': np.float32,
+    'input_hurting': np.float32,
+    'input_starving': np.float32,
+    'input_wayblocked': np.float32,
+    'input_bite_success': np.float32,
+}
+
+
+class PoolField:
+    """
+    Дескриптор поля существа.
+
+    Пока существо не добавлено в пул (например, в экспериментах), значение
+    хранится в обычном словаре существа. Когда существо живет в пуле,
+    чтение и запись идут прямо в колонку пула по номеру слота.
+    """
+
+    def __init__(self, cast):
+        self.cast = cast
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        pool = obj._pool
+        if pool is None:
+            return obj._local[self.name]
+        return self.cast(pool.columns[self.name][obj._slot])
+
+    def __set__(self, obj, value):
+        pool = obj._pool
+        if pool is None:
+            obj._local[self.name] = value
+        else:
+            pool.columns[self.name][obj._slot] = value
+
+
+class CreaturePool:
+    """
+    Пул существ с переиспользованием слотов.
+
+    - columns[name] — numpy-колонка длиной capacity для каждого поля из POOL_COLUMNS
+    - alive[slot] — занят ли слот
+    - objects[slot] — объект Creature (тонкое представление слота) или None
+    - освободившиеся слоты попадают в free-list (min-heap), и новые существа
+      занимают самые младшие свободные слоты — колонки остаются плотными.
+    - genome_banks[класс сети] — GenomeBank с весами сетей существ по тем же слотам
+      (для бэкендов, у которых есть NeuralNetwork.GENOME)
+    """
+
+    DEFAULT_CAPACITY = 1024
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = 0
+        self.columns = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.objects = []
+        self._free = []
+        self._slots_cache = None
+        self._creatures_cache = None
+        self.genome_banks = {}
+        self._grow(max(1, capacity))
+
+    def __len__(self):
+        return len(self.slots())
+
+    # Прямой доступ к колонкам: pool.x, pool.energy и т.д.
+    def __getattr__(self, name):
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def _grow(self, new_capacity: int) -> None:
+        """Увеличивает емкость пула, сохраняя содержимое колонок."""
+        old_capacity = self.capacity
+        for name, dtype in POOL_COLUMNS.items():
+            column = np.zeros(new_capacity, dtype=dtype)
+            if old_capacity:
+                column[:old_capacity] = self.columns[name]
+            self.columns[name] = column
+
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:old_capacity] = self.alive
+        self.alive = alive
+
+        self.objects.extend([None] * (new_capacity - old_capacity))
+        for slot in range(old_capacity, new_capacity):
+            heapq.heappush(self._free, slot)
+        self.capacity = new_capacity
+
+        for bank in self.genome_banks.values():
+            bank.grow(new_capacity)
+
+    def _invalidate(self) -> None:
+        self._slots_cache = None
+        self._creatures_cache = None
+
+    def add(self, creature, genome_from: int = None) -> int:
+        """
+        Размещает существо в свободном слоте и превращает его в представление слота.
+        Локальные значения полей существа переносятся в колонки.
+        genome_from - слот родителя: веса сети копируются из его строки банка весов.
+        """
+        if creature._pool is not None:
+            raise ValueError(f"Creature {creature.id} already lives in a pool")
+        if not self._free:
+            self._grow(self.capacity * 2)
+
+        slot = heapq.heappop(self._free)
+        for name in POOL_COLUMNS:
+            self.columns[name][slot] = creature._local[name]
+        self.alive[slot] = True
+        self.objects[slot] = creature
+
+        creature._local = {}
+        creature._pool = self
+        creature._slot = slot
+        self.bind_genome(slot, creature.nn, genome_from)
+        self._invalidate()
+        return slot
+
+    def release(self, slot: int) -> None:
+        """
+        Освобождает слот. Значения полей копируются обратно в существо,
+        чтобы объект (например, выбранный в GUI) оставался читаемым после смерти.
+        """
+        creature = self.objects[slot]
+        if creature is not None:
+            self.unbind_genome(creature.nn)
+            creature._local = {
+                name: self.columns[name][slot].item() for name in POOL_COLUMNS
+            }
+            creature._pool = None
+            creature._slot = -1
+        self.alive[slot] = False
+        self.objects[slot] = None
+        heapq.heappush(self._free, slot)
+        self._invalidate()
+
+    def bind_genome(self, slot: int, nn, source_slot: int = None) -> None:
+        """Переносит веса сети в GenomeBank ее класса (банк создается при первой сети класса)."""
+        genome = getattr(type(nn), 'GENOME', None)
+        if genome is None:
+            return # бэкенд без банка весов
+        bank = self.genome_banks.get(type(nn))
+        if bank is None:
+            bank = GenomeBank(genome, self.capacity, getattr(type(nn), 'STATE', None))
+            self.genome_banks[type(nn)] = bank
+        bank.bind(slot, nn, source_slot)
+
+    def mutate_genomes(self, slots, mutation_probability: float, mutation_strength: float, rng) -> None:
+        """Пакетная мутация сетей существ в слотах slots - по одному проходу на каждый банк весов."""
+        slots = np.asarray(slots, dtype=np.int64)
+        for bank in self.genome_banks.values():
+            rows = slots[bank.bound[slots]]
+            bank.mutate_rows(rows, mutation_probability, mutation_strength, rng)
+
+    @staticmethod
+    def unbind_genome(nn) -> None:
+        bank = getattr(nn, '_bank', None)
+        if bank is not None:
+            bank.unbind(nn._row)
+
+    def release_many(self, slots) -> None:
+        for slot in slots:
+            self.release(int(slot))
+
+    def clear(self) -> None:
+        self.release_many(self.slots())
+
+    def slots(self) -> np.ndarray:
+        """Номера занятых слотов по возрастанию (кэшируется до изменения состава)."""
+        if self._slots_cache is None:
+            self._slots_cache = np.flatnonzero(self.alive)
+        return self._slots_cache
+
+    def creatures(self) -> list:
+        """Список объектов Creature в порядке slots() (кэшируется до изменения состава)."""
+        if self._creatures_cache is None:
+            objects = self.objects
+            self._creatures_cache = [objects[slot] for slot in self.slots()]
+        return self._creatures_cache
+
+    def update(self, slots: np.ndarray) -> None:
+        """
+        Векторный аналог Creature.update() для всех указанных слотов:
+        затраты энергии, здоровье от сытости, сигнал голода и старение.
+        """
+        energy = self.energy[slots]
+        energy -= sp.energy_cost_tick
+        energy -= np.abs(self.speed[slots]) * sp.energy_cost_speed
+        energy -= np.abs(self.angle[slots]) * sp.energy_cost_rotate
+        energy -= np.abs(self.bite_effort[slots]) * sp.energy_cost_bite
+
+        # Здоровье восстанавливается при энергии > 0.5 и падает при голоде (см. Creature.gain_health)
+        health = self.health[slots]
+        fed = energy > 0.5
+        health = np.where(fed, np.minimum(health + (energy - 0.5) * 0.1, 1.0), health - (0.5 - energy) * 0.02)
+        starving = np.where(fed, 0.0, (0.5 - energy) * 2.0)
+
+        # Существа стареют
+        age = self.age[slots] + 1
+        health[age > sp.creature_max_age] = -100.0
+
+        self.energy[slots] = energy
+        self.health[slots] = health
+        self.input_starving[slots] = starving
+        self.age[slots] = age
@@ -47,7 +47,6 @@ from world import World
 from world_generator import WorldGenerator
 from creature import Creature
 from food import Food
-from nn import NeuralNetwork
 
 
 
@@ -64,8 +63,7 @@ class ScenarioBuilder:
     @staticmethod
     def copy_creature(creature: Creature) -> Creature:
         """Создать новое чистое существо. Скопировать к него нейронную сеть, используя собственный метод нейронной сети"""
-        new_creature = Creature(x=1, y=1)  # позиция будет переопределена при размещении
-        new_creature.nn = NeuralNetwork.copy(creature.nn)  # используем метод копирования из класса NeuralNetwork
+        new_creature = Creature(x=1, y=1, nn=type(creature.nn).copy(creature.nn))  # позиция будет переопределена при размещении; сеть копируем методом класса ее бэкенда
         return new_creature
 
     
@@ -116,7 +114,8 @@ class VisionSimulator:
         """
         world.update_map()  # обновить карту перед raycast
         creatures_pos = np.array([[creature.x, creature.y, creature.angle, creature.vision_distance]], dtype='float')
-        all_visions, raycast_dots = World.fast_get_all_visions_darken_with_distance(world.map, creatures_pos, 1.0)
+        record_dots = np.ones(1, dtype=np.bool_)
+        all_visions, raycast_dots = World.fast_get_all_visions_darken_with_distance(world.map, creatures_pos, 1.0, record_dots)
         return all_visions[0], raycast_dots  # возвращаем vision и raycast_dots первого существа
     
     @staticmethod
@@ -129,7 +128,8 @@ class VisionSimulator:
             (angle_delta, speed_delta, bite): выходы нейросети
         """
         # Подготовить веса NN для fast_calc_all_outs
-        creatures_nns = NeuralNetwork.prepare_calc([creature])
+        network_class = type(creature.nn)
+        creatures_nns = network_class.prepare_calc([creature])
         
         # Обернуть vision в правильную форму: [1, 45]
         all_inputs = vision.reshape(1, -1).astype(np.float32)
@@ -146,7 +146,7 @@ class VisionSimulator:
         all_inputs = np.hstack([all_inputs, other_inputs])
         
         # Вызвать fast_calc_all_outs через make_all_decisions (тот же путь, что в основной симуляции)
-        outputs = NeuralNetwork.make_all_decisions(all_inputs, creatures=[creature], creatures_nns=creatures_nns)
+        outputs = network_class.make_all_decisions(all_inputs, creatures=[creature], creatures_nns=creatures_nns)
         
         return float(outputs[0, 0]), float(outputs[0, 1]), float(outputs[0, 2])
 
@@ -1,13 +1,33 @@
 # -*- coding: utf-8 -*-
 from simparams import sp
+from creature_pool import PoolField
 
 class Food():
+    # Поля пищи. Пища в мире хранится колонками FoodStore, а объект Food
+    # либо самостоятельный (еще не добавлен в мир), либо представление строки FoodStore.
+    x = PoolField(int)
+    y = PoolField(int)
+    nutrition = PoolField(float)
+    food_age = PoolField(int)
+
     def __init__(self, x, y):
+        self._pool = None
+        self._slot = -1
+        self._local = {}
+
         self.x = x
         self.y = y
         self.nutrition = sp.food_energy_capacity
         self.food_age = 0
     
+    @classmethod
+    def view(cls, store, index):
+        """Представление строки index хранилища FoodStore (без копирования данных)."""
+        food = cls.__new__(cls)
+        food._pool = store
+        food._slot = index
+        food._local = {}
+        return food
 
     def decrement(self):
         self.nutrition -= sp.food_energy_chunk
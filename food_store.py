@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Колоночное хранилище пищи с индексом клеток."""
+
+import numpy as np
+from simparams import sp
+from food import Food
+
+
+# Колонки хранилища: имя -> dtype
+FOOD_COLUMNS = {
+    'x': np.int32,
+    'y': np.int32,
+    'nutrition': np.float32,
+    'food_age': np.int32,
+}
+
+
+class FoodStore:
+    """
+    Пища мира в виде плотных numpy-колонок x, y, nutrition, food_age.
+
+    - живая пища всегда занимает строки [0, count) — после удаления
+      колонки уплотняются одной векторной операцией
+    - grid[y, x] — номер строки пищи в клетке, или -1 если клетка пуста
+      (в одной клетке лежит не больше одной пищи)
+    - store[i] и итерация возвращают представления Food строк хранилища;
+      представления действительны до ближайшего уплотнения (proceed())
+    - клетки, где пища появилась или исчезла, копятся в журнале изменений
+      до вызова take_changed_cells() (этим пользуется OccupancyMap)
+    """
+
+    DEFAULT_CAPACITY = 2048
+    MAX_CHANGED_CHUNKS = 4096 # Если журнал изменений никто не забирает - перестаем его вести
+
+    def __init__(self, width: int, height: int, capacity: int = DEFAULT_CAPACITY):
+        self.width = width
+        self.height = height
+        self.grid = np.full((height, width), -1, dtype=np.int32)
+        self.count = 0
+        self.capacity = max(1, capacity)
+        self.columns = {
+            name: np.zeros(self.capacity, dtype=dtype) for name, dtype in FOOD_COLUMNS.items()
+        }
+        self._changed_cells = []
+        self._changed_overflow = False
+
+    # Прямой доступ к колонкам: store.x, store.nutrition и т.д.
+    def __getattr__(self, name):
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError(index)
+        return Food.view(self, index)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield Food.view(self, index)
+
+    @classmethod
+    def from_columns(cls, width: int, height: int, columns: dict) -> 'FoodStore':
+        """
+        Хранилище из готовых колонок (загрузка мира): колонки и индекс клеток
+        заполняются векторно. Пища в одной клетке не повторяется - лишние строки отбрасываются.
+        """
+        xs = np.asarray(columns['x'], dtype=np.int64)
+        ys = np.asarray(columns['y'], dtype=np.int64)
+        cells = ys * width + xs
+        _, first = np.unique(cells, return_index=True)
+        keep = np.sort(first)
+        n = len(keep)
+        store = cls(width, height, capacity=max(cls.DEFAULT_CAPACITY, n))
+        for name, dtype in FOOD_COLUMNS.items():
+            store.columns[name][:n] = np.asarray(columns[name], dtype=dtype)[keep]
+        store.count = n
+        store.grid[ys[keep], xs[keep]] = np.arange(n, dtype=np.int32)
+        store._mark_changed(cells[keep])
+        return store
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.columns[name] = grown
+
+    def add(self, x: int, y: int, nutrition: float, food_age: int = 0) -> bool:
+        """Добавляет пищу в клетку (x, y). Занятую клетку отвергает и возвращает False."""
+        if self.grid[y, x] >= 0:
+            return False
+        if self.count == self.capacity:
+            self._grow()
+        index = self.count
+        self.columns['x'][index] = x
+        self.columns['y'][index] = y
+        self.columns['nutrition'][index] = nutrition
+        self.columns['food_age'][index] = food_age
+        self.grid[y, x] = index
+        self.count += 1
+        self._mark_changed(np.array([y * self.width + x], dtype=np.int64))
+        return True
+
+    def add_food(self, food) -> bool:
+        return self.add(int(food.x), int(food.y), food.nutrition, food.food_age)
+
+    def index_at(self, x: int, y: int) -> int:
+        return int(self.grid[y, x])
+
+    def remove_mask(self, mask: np.ndarray) -> int:
+        """
+        Удаляет пищу по bool-маске длиной count и уплотняет колонки.
+        Индекс клеток перестраивается векторно. Возвращает число удаленных.
+        """
+        removed = int(np.count_nonzero(mask))
+        if removed == 0:
+            return 0
+        n = self.count
+        keep = ~mask
+        xs = self.columns['x']
+        ys = self.columns['y']
+        removed_y = ys[:n][mask]
+        removed_x = xs[:n][mask]
+        self.grid[removed_y, removed_x] = -1
+        self._mark_changed(removed_y.astype(np.int64) * self.width + removed_x)
+        for column in self.columns.values():
+            kept = column[:n][keep]
+            column[:len(kept)] = kept
+        self.count = n - removed
+        self.grid[ys[:self.count], xs[:self.count]] = np.arange(self.count, dtype=np.int32)
+        return removed
+
+    def proceed(self, tick: int) -> None:
+        """
+        Удаляет съеденную пищу, старит пищу каждые 10 тиков и удаляет
+        пищу старше sp.food_max_age — всё одной уплотняющей операцией.
+        """
+        n = self.count
+        dead = self.columns['nutrition'][:n] < 0
+        if tick % 10 == 0:
+            food_age = self.columns['food_age'][:n]
+            food_age += 10
+            dead |= food_age > sp.food_max_age
+        self.remove_mask(dead)
+
+    def _mark_changed(self, cells: np.ndarray) -> None:
+        if self._changed_overflow:
+            return
+        if len(self._changed_cells) >= self.MAX_CHANGED_CHUNKS:
+            self._changed_cells = []
+            self._changed_overflow = True
+            return
+        self._changed_cells.append(cells)
+
+    def take_changed_cells(self):
+        """
+        Возвращает клетки (y * width + x), где пища появилась или исчезла
+        с прошлого вызова, и очищает журнал. None - журнал переполнен,
+        нужна полная перестройка.
+        """
+        if self._changed_overflow:
+            self._changed_overflow = False
+            return None
+        changed = self._changed_cells
+        self._changed_cells = []
+        if not changed:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(changed)
+
+    def fill_nutrition(self, value: float) -> None:
+        self.columns['nutrition'][:self.count] = value
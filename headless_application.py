@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# Запуск симуляции без окна: только World.update()/update_map() в плотном цикле,
+# периодические сохранения и вывод статистики. pygame и рендерер не импортируются -
+# так долгие эволюции гоняются на серверах без SDL.
+#
+#   python nnevol.py --headless --ticks 100000 --map maps/map06.csv --seed 1 \
+#       --checkpoint-every 10000 --stats-every 1000 --stats-csv saves/run1.csv
+#
+# Продолжить прерванный прогон с последнего чекпоинта:
+#   python nnevol.py --headless --resume --checkpoint-name run1 --checkpoint-every 10000
+
+
+import sys
+import csv
+import time
+import argparse
+import nn
+from world_generator import WorldGenerator
+from simparams import sp
+from service.logger.logger import logme
+from service.world_persistence.world_persistence import world_persistence
+from service.rng.rng import rng
+from service.jit_warmup.jit_warmup import warmup, format_report
+from service.performance_monitor.performance_monitor import TickProfiler
+from service.checkpoint.checkpoint import CheckpointScheduler
+
+
+# Колонки строки статистики (и CSV-файла)
+STATS_COLUMNS = ['tick', 'population', 'food', 'mean_energy', 'max_generation', 'ticks_per_sec', 'creature_ticks_per_sec']
+
+
+class HeadlessApplication():
+
+	def __init__(self, argv=None):
+		self.args = HeadlessApplication.parse_args(sys.argv[1:] if argv is None else argv)
+		args = self.args
+		self.quit_flag = False
+
+		# Все случайные числа симуляции - из потоков rng; без --seed зерно случайное, но печатается
+		rng.seed(args.seed)
+		print(f"Зерно: {rng.seed_value}")
+		if args.nn:
+			nn.set_default_backend(args.nn)
+		backend_groups = nn.parse_backend_groups(args.nn_groups)
+		# История для графиков GUI без окна не нужна, а events_log без ограничений растет на долгих прогонах
+		logme.set_enabled(args.log)
+
+		backends = list(dict.fromkeys([nn.get_default_backend()] + list(backend_groups or {})))
+		print(format_report(warmup(backends)))
+
+		if args.map:
+			self.world = WorldGenerator.generate_world_fromCSV(
+				file_path=args.map,
+				random_wall_count=args.walls,
+				food_count=sp.food_amount,
+				creatures_count=args.creatures,
+				border_walls=True,
+				backend_groups=backend_groups,
+			)
+		else:
+			self.world = WorldGenerator.generate_world(
+				width=args.width,
+				height=args.height,
+				wall_count=args.walls,
+				food_count=sp.food_amount,
+				creatures_count=args.creatures,
+				border_walls=True,
+				backend_groups=backend_groups,
+			)
+
+		# Продолжение с последнего чекпоинта: мир, зерно и потоки rng берутся из сохранения
+		if args.resume:
+			stem = CheckpointScheduler.latest(args.checkpoint_name)
+			if stem is None:
+				print(f"Чекпоинтов '{args.checkpoint_name}' нет - начинаем новый прогон")
+			elif world_persistence.load_world(self.world, stem):
+				print(f"Продолжение с тика {self.world.tick}: {stem}")
+
+		self.checkpoints = CheckpointScheduler(
+			args.checkpoint_name,
+			every_ticks=args.checkpoint_every,
+			every_seconds=args.checkpoint_seconds,
+			keep_last=args.checkpoint_keep,
+			keep_every=args.checkpoint_keep_every,
+			delta=args.checkpoint_delta,
+			full_every=args.checkpoint_full_every,
+		)
+
+		# Пофазный профайлер тика (--profile / --profile-csv); выключенный почти ничего не стоит
+		self.profiler = TickProfiler(window=max(args.stats_every, 1), enabled=args.profile or bool(args.profile_csv))
+		self.world.profiler = self.profiler
+		if args.profile_csv:
+			self.profiler.open_csv(args.profile_csv, every=args.stats_every or 1000)
+
+		self._stats_file = None
+		self._stats_writer = None
+		self._last_stats_time = None
+		self._last_stats_tick = 0
+		self._creature_ticks = 0
+
+	@staticmethod
+	def parse_args(argv):
+		parser = argparse.ArgumentParser(prog='nnevol.py --headless', description="Симуляция без окна (без pygame).")
+		parser.add_argument('--headless', action='store_true', help="запуск без окна (этот режим)")
+		parser.add_argument('--ticks', type=int, default=0, help="сколько тиков считать (0 - пока не прервут)")
+		parser.add_argument('--map', metavar='PATH', help="карта мира из CSV-файла")
+		parser.add_argument('--seed', type=int, help="зерно случайных чисел для воспроизводимого прогона")
+		parser.add_argument('--width', type=int, default=100)
+		parser.add_argument('--height', type=int, default=50)
+		parser.add_argument('--walls', type=int, default=350, help="число случайных стен")
+		parser.add_argument('--creatures', type=int, default=500, help="начальная популяция")
+		parser.add_argument('--nn', choices=nn.available_backends(), help="бэкенд нейросети для новых существ")
+		parser.add_argument('--nn-groups', metavar='NAME:SHARE,...', help="группы существ с разными бэкендами, например ff:1,rnn:1")
+		parser.add_argument('--checkpoint-every', type=int, default=0, metavar='N', help="сохранять мир каждые N тиков (0 - не сохранять)")
+		parser.add_argument('--checkpoint-seconds', type=float, default=0, metavar='S', help="сохранять мир каждые S секунд (0 - не по времени)")
+		parser.add_argument('--checkpoint-name', default='headless', help="базовое имя файлов сохранений в saves/")
+		parser.add_argument('--checkpoint-keep', type=int, default=5, metavar='N', help="хранить N последних сохранений (0 - все)")
+		parser.add_argument('--checkpoint-keep-every', type=int, default=0, metavar='K', help="дополнительно хранить каждое K-е сохранение")
+		parser.add_argument('--checkpoint-delta', action='store_true', help="между полными сохранениями писать дельты (веса только новорожденных)")
+		parser.add_argument('--checkpoint-full-every', type=int, default=10, metavar='K', help="с --checkpoint-delta каждое K-е сохранение полное")
+		parser.add_argument('--resume', action='store_true', help="продолжить с последнего сохранения --checkpoint-name")
+		parser.add_argument('--stats-every', type=int, default=1000, metavar='N', help="печатать статистику каждые N тиков (0 - не печатать)")
+		parser.add_argument('--stats-csv', metavar='PATH', help="дописывать статистику в CSV-файл")
+		parser.add_argument('--log', action='store_true', help="вести историю logme (как в GUI)")
+		parser.add_argument('--profile', action='store_true', help="печатать пофазные тайминги тика вместе со статистикой")
+		parser.add_argument('--profile-csv', metavar='PATH', help="дописывать пофазные тайминги тика в CSV-файл (каждые --stats-every тиков)")
+		return parser.parse_args(argv)
+
+	def run(self):
+		args = self.args
+		world = self.world
+		print(f"/ Headless: {world.width}x{world.height}, существ: {len(world.creatures)}, тиков: {args.ticks or '∞'} /")
+
+		if args.stats_csv:
+			self._stats_file = open(args.stats_csv, 'a', newline='')
+			self._stats_writer = csv.writer(self._stats_file)
+			if self._stats_file.tell() == 0:
+				self._stats_writer.writerow(STATS_COLUMNS)
+		self._last_stats_time = time.perf_counter()
+		self._last_stats_tick = world.tick
+		start_tick = world.tick
+
+		try:
+			while not self.quit_flag:
+				if args.ticks and world.tick - start_tick >= args.ticks:
+					break
+				self._creature_ticks += len(world.creatures)
+				world.update()
+				world.update_map()
+				if self.checkpoints.maybe_checkpoint(world) is not None:
+					self._checkpoint_started()
+				self.profiler.lap('checkpoint')
+				if logme.is_enabled():
+					logme.write_stats(world.creatures)
+					logme.write_population_size(len(world.creatures))
+				self.profiler.lap('logging')
+				self.profiler.end_tick()
+
+				if args.stats_every and world.tick % args.stats_every == 0:
+					self.write_stats()
+				if len(world.creatures) == 0:
+					print(f"Популяция вымерла на тике {world.tick}")
+					break
+		except KeyboardInterrupt:
+			print(f"\nПрервано на тике {world.tick}")
+		finally:
+			# Последнее состояние сохраняем, если сохранения включены и оно еще не записано
+			if self.checkpoints.enabled and world.tick != self.checkpoints.last_tick:
+				if self.checkpoints.checkpoint(world) is not None:
+					self._checkpoint_started()
+			self.checkpoints.close()
+			if self._stats_file is not None:
+				self._stats_file.close()
+			self.profiler.close_csv()
+
+		print("/ Terminated. /")
+
+	def terminate(self):
+		self.quit_flag = True
+
+	def collect_stats(self) -> dict:
+		world = self.world
+		pool = world.pool
+		slots = pool.slots()
+		now = time.perf_counter()
+		elapsed = max(now - self._last_stats_time, 1e-9)
+		ticks = world.tick - self._last_stats_tick
+		stats = {
+			'tick': world.tick,
+			'population': len(slots),
+			'food': len(world.foods),
+			'mean_energy': float(pool.energy[slots].mean()) if len(slots) else 0.0,
+			'max_generation': int(pool.generation[slots].max()) if len(slots) else 0,
+			'ticks_per_sec': ticks / elapsed,
+			'creature_ticks_per_sec': self._creature_ticks / elapsed,
+		}
+		self._last_stats_time = now
+		self._last_stats_tick = world.tick
+		self._creature_ticks = 0
+		return stats
+
+	def write_stats(self):
+		stats = self.collect_stats()
+		print(
+			f"tick {stats['tick']:>8d} | существ {stats['population']:>5d} | пищи {stats['food']:>5d} | "
+			f"энергия {stats['mean_energy']:.3f} | поколение {stats['max_generation']:>4d} | "
+			f"{stats['ticks_per_sec']:7.1f} тик/с | {stats['creature_ticks_per_sec']:9.0f} существо·тик/с"
+		)
+		if self._stats_writer is not None:
+			self._stats_writer.writerow([stats[name] for name in STATS_COLUMNS])
+			self._stats_file.flush()
+		if self.args.profile:
+			print("\n".join(self.profiler.format_table()))
+
+	def _checkpoint_started(self):
+		print(f"Сохранение: {self.checkpoints.job.path.name}")
+		# Время снимка не входит в скорость симуляции в статистике; файл пишется в фоне
+		if self._last_stats_time is not None:
+			self._last_stats_time += self.checkpoints.last_snapshot_seconds
@@ -1,21 +1,94 @@
 # -*- coding: utf-8 -*-
-# Единая точка переключения нейросети.
-# Меняй NN_BACKEND здесь — больше нигде ничего менять не надо.
+# Реестр бэкендов нейросетей.
+#
+# Бэкенд - модуль с классом NeuralNetwork; ключ реестра - NeuralNetwork.__type__,
+# тот же, что пишется в сохранения (serialize()['__type__']).
+# Модули импортируются лениво при первом обращении, поэтому несколько бэкендов
+# могут жить в одном процессе одновременно, а необязательные зависимости (torch)
+# нужны только тому, кто выбрал такой бэкенд.
 #
 # Доступные варианты:
 #   'ff'         — nn/my_handmade_ff.py  (feedforward, numba)
 #   'rnn'        — nn/rnn.py             (RNN, кастомный)
 #   'torch_rnn'  — nn/nn_torch_rnn.py   (RNN, PyTorch)
+#
+# Бэкенд по умолчанию (для новых случайных существ) выбирается на запуск:
+# set_default_backend('rnn') или ключом командной строки -nn rnn.
+# Потомки наследуют бэкенд родителя, загруженные существа - бэкенд из сохранения.
+
+import importlib
+
+BACKEND_MODULES = {
+    'ff': 'nn.my_handmade_ff',
+    'rnn': 'nn.rnn',
+    'torch_rnn': 'nn.nn_torch_rnn',
+}
+DEFAULT_BACKEND = 'ff'
+
+_backend_classes = {}
+_default_backend = DEFAULT_BACKEND
+
+
+def register_backend(name: str, module_path: str) -> None:
+    """Добавляет (или подменяет) бэкенд: name -> модуль с классом NeuralNetwork."""
+    BACKEND_MODULES[name] = module_path
+    _backend_classes.pop(name, None)
+
+
+def available_backends() -> list:
+    return list(BACKEND_MODULES)
+
+
+def get_backend(name: str = None):
+    """Класс NeuralNetwork бэкенда name (по умолчанию - текущего бэкенда по умолчанию)."""
+    if name is None:
+        name = _default_backend
+    network_class = _backend_classes.get(name)
+    if network_class is None:
+        if name not in BACKEND_MODULES:
+            raise ValueError(f"Unknown NN backend: '{name}'. Choose one of: {', '.join(BACKEND_MODULES)}.")
+        network_class = importlib.import_module(BACKEND_MODULES[name]).NeuralNetwork
+        _backend_classes[name] = network_class
+    return network_class
+
+
+def set_default_backend(name: str) -> None:
+    """Меняет бэкенд для новых случайных существ. Модуль импортируется сразу - ошибка видна на старте."""
+    global _default_backend
+    get_backend(name)
+    _default_backend = name
+
+
+def get_default_backend() -> str:
+    return _default_backend
+
+
+def backend_of(network) -> str:
+    """Имя бэкенда сети (ее __type__)."""
+    return type(network).__type__
+
+
+def parse_backend_groups(spec: str):
+    """Группы существ по бэкендам из строки запуска: 'ff:3,rnn:1' -> {'ff': 3.0, 'rnn': 1.0}; доля по умолчанию 1."""
+    if not spec:
+        return None
+    groups = {}
+    for item in spec.split(','):
+        name, _, share = item.strip().partition(':')
+        get_backend(name) # неизвестный бэкенд - ошибка сразу на старте
+        groups[name] = float(share) if share else 1.0
+    return groups
+
 
-NN_BACKEND = 'ff'  # Выбираем бэкенд нейросети: 'ff', 'rnn', или 'torch_rnn'
+def __getattr__(name):
+    # Совместимость со старым кодом: from nn import NeuralNetwork, NN_BACKEND
+    if name == 'NeuralNetwork':
+        return get_backend()
+    if name == 'NN_BACKEND':
+        return _default_backend
+    raise AttributeError(f"module 'nn' has no attribute '{name}'")
 
-if NN_BACKEND == 'ff':
-    from nn.my_handmade_ff import NeuralNetwork
-elif NN_BACKEND == 'rnn':
-    from nn.rnn import NeuralNetwork
-elif NN_BACKEND == 'torch_rnn':
-    from nn.nn_torch_rnn import NeuralNetwork
-else:
-    raise ImportError(f"Unknown NN_BACKEND: '{NN_BACKEND}'. Choose 'ff', 'rnn', or 'torch_rnn'.")
 
-__all__ = ['NeuralNetwork', 'NN_BACKEND']
+__all__ = ['BACKEND_MODULES', 'DEFAULT_BACKEND', 'register_backend', 'available_backends',
+           'get_backend', 'set_default_backend', 'get_default_backend', 'backend_of',
+           'parse_backend_groups']
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Постоянное хранилище весов нейросетей всех существ (float32, по слотам пула)."""
+
+import numpy as np
+
+
+class GenomeBank:
+    """
+    Веса нейросетей одного бэкенда, сложенные в непрерывные float32-тензоры.
+
+    - arrays[name] — массив формы (capacity, *shape) для каждого параметра
+      из NeuralNetwork.GENOME (имя -> форма)
+    - строка массива = слот существа в CreaturePool
+    - пока сеть привязана к банку, ее атрибуты (nn.w1 и т.д.) — это представления
+      строк банка: мутации на месте сразу видны ядру инференса, а само ядро
+      работает прямо с тензорами банка по номерам строк, без копирования каждый тик
+    - при отвязке (смерть существа) сеть получает собственные копии весов,
+      чтобы строку можно было отдать новорожденному
+    - state[name] — необучаемое состояние сети (например, скрытые состояния RNN):
+      хранится в банке рядом с весами по тем же строкам, но не мутирует и
+      не делится между копиями
+    - bound[row] — строка занята сетью (векторная маска: по ней мир делит слоты
+      между бэкендами, не обходя существ)
+    """
+
+    def __init__(self, genome: dict, capacity: int, state: dict = None):
+        self.genome = genome
+        self.state = state or {}
+        self.capacity = 0
+        self.arrays = {}
+        self.owners = []
+        self.bound = np.zeros(0, dtype=bool)
+        self.grow(capacity)
+
+    # Прямой доступ к тензорам: bank.w1, bank.b1 и т.д.
+    def __getattr__(self, name):
+        arrays = self.__dict__.get('arrays')
+        if arrays is not None and name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def grow(self, new_capacity: int) -> None:
+        """Увеличивает емкость банка. Привязанные сети переводятся на новые массивы."""
+        old_capacity = self.capacity
+        for name, shape in list(self.genome.items()) + list(self.state.items()):
+            array = np.zeros((new_capacity,) + tuple(shape), dtype=np.float32)
+            if old_capacity:
+                array[:old_capacity] = self.arrays[name]
+            self.arrays[name] = array
+        self.owners.extend([None] * (new_capacity - old_capacity))
+        bound = np.zeros(new_capacity, dtype=bool)
+        bound[:old_capacity] = self.bound
+        self.bound = bound
+        self.capacity = new_capacity
+        for row, nn in enumerate(self.owners):
+            if nn is not None:
+                self._attach(row, nn)
+
+    def _attach(self, row: int, nn) -> None:
+        for name in self.arrays:
+            setattr(nn, name, self.arrays[name][row])
+        nn._bank = self
+        nn._row = row
+
+    def bind(self, row: int, nn, source_row: int = None) -> None:
+        """
+        Копирует веса сети в строку row и превращает атрибуты сети в представления этой строки.
+        source_row - веса берутся из другой строки банка (потомок родителя из того же пула):
+        одно копирование строки в строку, у самой сети (blank()) весов может и не быть.
+        """
+        if nn._bank is not None:
+            raise ValueError("Neural network is already bound to a genome bank row")
+        if self.owners[row] is not None:
+            self.unbind(row)
+        for name in self.genome:
+            self.arrays[name][row] = getattr(nn, name) if source_row is None else self.arrays[name][source_row]
+        for name in self.state:
+            self.arrays[name][row] = getattr(nn, name)
+        self.owners[row] = nn
+        self.bound[row] = True
+        self._attach(row, nn)
+
+    def unbind(self, row: int) -> None:
+        """Освобождает строку: сеть получает собственные копии своих весов."""
+        nn = self.owners[row]
+        if nn is None:
+            return
+        for name in self.arrays:
+            setattr(nn, name, self.arrays[name][row].copy())
+        nn._bank = None
+        nn._row = -1
+        self.owners[row] = None
+        self.bound[row] = False
+
+    def mutate_rows(self, rows, mutation_probability: float, mutation_strength: float, rng) -> None:
+        """
+        Пакетная мутация сетей в строках rows (например, всех новорожденных за тик).
+        Та же мутация, что NeuralNetwork.mutate - каждый вес с вероятностью
+        mutation_probability получает добавку из [-mutation_strength, mutation_strength] -
+        но одним векторным проходом по каждому тензору, со случайными числами
+        из генератора rng (np.random.Generator).
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0 or mutation_probability <= 0:
+            return
+        strength = np.float32(mutation_strength)
+        for name in self.genome:
+            array = self.arrays[name]
+            params = array[rows]
+            mask = rng.random(params.shape, dtype=np.float32) < mutation_probability
+            noise = strength * (2 * rng.random(params.shape, dtype=np.float32) - 1)
+            params += noise * mask
+            array[rows] = params
+
+    @staticmethod
+    def rows_of(creatures):
+        """
+        Если сети всех существ лежат в одном банке - возвращает (bank, rows),
+        где rows - номера их строк в порядке существ. Иначе (None, None).
+        Запасной путь для сетей вне пула: мир передает бэкендам банк и слоты сам.
+        """
+        bank = None
+        rows = np.empty(len(creatures), dtype=np.int64)
+        for index, cr in enumerate(creatures):
+            nn_bank = cr.nn._bank
+            if nn_bank is None or (bank is not None and nn_bank is not bank):
+                return None, None
+            bank = nn_bank
+            rows[index] = cr.nn._row
+        return bank, rows
+
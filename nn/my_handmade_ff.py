@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import math  # подключить бибилиотеку математических функций. Обращение через math.XXX
-import random  # подключить бибилиотеку случайных чисел Обращение через random.XXX
 import numpy as np
 from numba import jit, prange
 from typing import Tuple
+from nn import threads
+from nn.genome_bank import GenomeBank
+from service.rng.rng import rng
 
 
 # Конфигурация - жестко зашито 
@@ -15,18 +17,41 @@ OUTPUT_SIZE = 3
 
 
 class NeuralNetwork:  # класс нейронной сети
+    # Имя бэкенда: ключ в реестре nn и тип сети в сохранениях
+    __type__ = 'ff'
+
+    # Режим инференса: True - существа считаются параллельно на нескольких ядрах
+    # (число потоков - nn.threads.set_threads), False - последовательно на одном ядре.
+    # Последовательный режим нужен для тестов детерминизма и замеров.
+    # Сети существ независимы, поэтому оба режима дают одинаковые выходы.
+    parallel = True
+
+    # Параметры сети и их формы - по ним строится GenomeBank
+    GENOME = {
+        'w1': (INPUT_SIZE, HIDDEN1_SIZE),
+        'b1': (HIDDEN1_SIZE,),
+        'w2': (HIDDEN1_SIZE, HIDDEN2_SIZE),
+        'b2': (HIDDEN2_SIZE,),
+        'w3': (HIDDEN2_SIZE, OUTPUT_SIZE),
+        'b3': (OUTPUT_SIZE,),
+    }
+    # Банк весов и номер строки в нем, если сеть привязана к банку (существо живет в мире)
+    _bank = None
+    _row = -1
+
     def __init__(self):
-        # Инициализация как раньше
+        # Инициализация как раньше; случайные веса - из потока 'genomes' сервиса rng
+        genomes = rng.stream('genomes')
         limit1 = np.sqrt(6.0 / (INPUT_SIZE + HIDDEN1_SIZE))
-        self.w1 = np.random.uniform(-limit1, limit1, (INPUT_SIZE, HIDDEN1_SIZE)).astype(np.float32)
+        self.w1 = genomes.uniform(-limit1, limit1, (INPUT_SIZE, HIDDEN1_SIZE)).astype(np.float32)
         self.b1 = np.zeros(HIDDEN1_SIZE, dtype=np.float32)
         
         limit2 = np.sqrt(6.0 / (HIDDEN1_SIZE + HIDDEN2_SIZE))
-        self.w2 = np.random.uniform(-limit2, limit2, (HIDDEN1_SIZE, HIDDEN2_SIZE)).astype(np.float32)
+        self.w2 = genomes.uniform(-limit2, limit2, (HIDDEN1_SIZE, HIDDEN2_SIZE)).astype(np.float32)
         self.b2 = np.zeros(HIDDEN2_SIZE, dtype=np.float32)
         
         limit3 = np.sqrt(6.0 / (HIDDEN2_SIZE + OUTPUT_SIZE))
-        self.w3 = np.random.uniform(-limit3, limit3, (HIDDEN2_SIZE, OUTPUT_SIZE)).astype(np.float32)
+        self.w3 = genomes.uniform(-limit3, limit3, (HIDDEN2_SIZE, OUTPUT_SIZE)).astype(np.float32)
         self.b3 = np.zeros(OUTPUT_SIZE, dtype=np.float32)
     
 
@@ -41,20 +66,23 @@ class NeuralNetwork:  # класс нейронной сети
 
 
 
+    @classmethod
+    def blank(cls):
+        # Сеть без случайной инициализации - веса тут же заполнит copy() или deserialize()
+        return cls.__new__(cls)
+
     @staticmethod
     def copy(original_nn):
-        new_nn = NeuralNetwork()
-        new_nn.w1 = original_nn.w1.copy()
-        new_nn.b1 = original_nn.b1.copy()
-        new_nn.w2 = original_nn.w2.copy()
-        new_nn.b2 = original_nn.b2.copy()
-        new_nn.w3 = original_nn.w3.copy()
-        new_nn.b3 = original_nn.b3.copy()
+        # Копия без случайной инициализации: веса копируются один раз.
+        # Потомков существ мира пул копирует сразу строкой банка (CreaturePool.add(..., genome_from=...))
+        new_nn = NeuralNetwork.blank()
+        for name in NeuralNetwork.GENOME:
+            setattr(new_nn, name, getattr(original_nn, name).copy())
         return new_nn
 
     def serialize(self) -> dict:
         return {
-            '__type__': 'ff',
+            '__type__': self.__type__,
             'w1': self.w1.tolist(),
             'b1': self.b1.tolist(),
             'w2': self.w2.tolist(),
@@ -84,17 +112,18 @@ class NeuralNetwork:  # класс нейронной сети
         """
         # Список всех параметров сети, которые нужно мутировать
         params = [self.w1, self.b1, self.w2, self.b2, self.w3, self.b3]
+        mutation_rng = rng.stream('mutation')
         
         for param in params:
             if mutation_probability > 0:
                 # Создаем маску: 1 с вероятностью mutation_probability, иначе 0
-                mask = (np.random.rand(*param.shape) < mutation_probability).astype(np.float32)
+                mask = (mutation_rng.random(param.shape) < mutation_probability).astype(np.float32)
                 
                 # Создаем случайные изменения
                 # Можно использовать разные распределения:
                 
                 # 1. Равномерное распределение в диапазоне [-mutation_strength, mutation_strength]
-                random_changes = mutation_strength * (2 * np.random.rand(*param.shape).astype(np.float32) - 1)
+                random_changes = mutation_strength * (2 * mutation_rng.random(param.shape, dtype=np.float32) - 1)
                 
                 # 2. Или нормальное распределение (часто лучше для мутации)
                 # random_changes = mutation_strength * np.random.randn(*param.shape).astype(np.float32)
@@ -107,20 +136,25 @@ class NeuralNetwork:  # класс нейронной сети
 
 
     @staticmethod
-    def prepare_calc(creatures):
-        # creatures_nns = NeuralNetwork.prepare_calc(self.creatures)
-		# эта функция склеивает все сетки в векторизованные массивы: l1_weights, l2_weights, l1_bias, l2_bias)
-		# , но на выход она выдает обычный python кортеж (или если не получится, то список), 
-		# содержащий эти самые numpy ndarray: l1_weights, l2_weights, l1_bias, l2_bias ...
-        
+    def prepare_calc(creatures, bank=None, rows=None):
+        # Возвращает кортеж (rows, w1, b1, w2, b2, w3, b3) для make_all_decisions:
+        # веса всех сетей сложены в тензоры [N, ...], rows[i] - строка i-го существа в этих тензорах.
+        # Если сети существ живут в GenomeBank (существа в мире), отдаем тензоры банка как есть -
+        # без выделения памяти и копирования. Мир сам передает банк и строки (слоты пула),
+        # иначе ищем их по сетям. Сети вне банка (эксперименты, тесты) - склеиваем копии весов.
+        if bank is None:
+            bank, rows = GenomeBank.rows_of(creatures)
+        if bank is not None:
+            return rows, bank.w1, bank.b1, bank.w2, bank.b2, bank.w3, bank.b3
+
         n_creatures = len(creatures)
 
-        w1 = np.zeros((n_creatures, INPUT_SIZE, HIDDEN1_SIZE), dtype='float') 
-        b1 = np.zeros((n_creatures, HIDDEN1_SIZE), dtype='float')
-        w2 = np.zeros((n_creatures, HIDDEN1_SIZE, HIDDEN2_SIZE), dtype='float')
-        b2 = np.zeros((n_creatures, HIDDEN2_SIZE), dtype='float')
-        w3 = np.zeros((n_creatures, HIDDEN2_SIZE, OUTPUT_SIZE), dtype='float')
-        b3 = np.zeros((n_creatures, OUTPUT_SIZE), dtype='float')
+        w1 = np.zeros((n_creatures, INPUT_SIZE, HIDDEN1_SIZE), dtype=np.float32)
+        b1 = np.zeros((n_creatures, HIDDEN1_SIZE), dtype=np.float32)
+        w2 = np.zeros((n_creatures, HIDDEN1_SIZE, HIDDEN2_SIZE), dtype=np.float32)
+        b2 = np.zeros((n_creatures, HIDDEN2_SIZE), dtype=np.float32)
+        w3 = np.zeros((n_creatures, HIDDEN2_SIZE, OUTPUT_SIZE), dtype=np.float32)
+        b3 = np.zeros((n_creatures, OUTPUT_SIZE), dtype=np.float32)
 
         for index, cr in enumerate(creatures):
             w1[index] = cr.nn.w1
@@ -130,7 +164,7 @@ class NeuralNetwork:  # класс нейронной сети
             w3[index] = cr.nn.w3
             b3[index] = cr.nn.b3
         
-        return w1, b1, w2, b2, w3, b3
+        return np.arange(n_creatures, dtype=np.int64), w1, b1, w2, b2, w3, b3
 
 
     @staticmethod
@@ -139,27 +173,40 @@ class NeuralNetwork:  # класс нейронной сети
         Эта функция просто пасует данные в быструю функцию, 
         разбирая List (или кортеж) на элементы
         """
-        return NeuralNetwork.fast_calc_all_outs(
+        if NeuralNetwork.parallel:
+            kernel = NeuralNetwork.fast_calc_all_outs
+        else:
+            kernel = NeuralNetwork.fast_calc_all_outs_serial
+        # Веса во float32 - входы тоже приводим к float32, чтобы ядро не смешивало типы
+        if all_visions_normalized.dtype != np.float32:
+            all_visions_normalized = all_visions_normalized.astype(np.float32)
+        return kernel(
             all_visions_normalized, 
             creatures_nns[0], 
             creatures_nns[1], 
             creatures_nns[2], 
             creatures_nns[3],
             creatures_nns[4], 
-            creatures_nns[5]
+            creatures_nns[5],
+            creatures_nns[6]
             )
 
     
+    # Явная сигнатура ядра для прекомпиляции (service/jit_warmup): входы и тензоры GenomeBank во float32
+    KERNEL_SIGNATURE = ('(float32[:, ::1], int64[::1], float32[:, :, ::1], float32[:, ::1], '
+                        'float32[:, :, ::1], float32[:, ::1], float32[:, :, ::1], float32[:, ::1])')
+
     @staticmethod
-    @jit(nopython=True, fastmath=True)
-    def fast_calc_all_outs(all_inputs: np.ndarray,
+    @jit(nopython=True, fastmath=True, parallel=True, cache=True)
+    def fast_calc_all_outs(all_inputs: np.ndarray, rows: np.ndarray,
                         all_w1: np.ndarray, all_b1: np.ndarray,
                         all_w2: np.ndarray, all_b2: np.ndarray,
                         all_w3: np.ndarray, all_b3: np.ndarray) -> np.ndarray:
         """
         Прямой проход для нескольких существ ОДНОВРЕМЕННО
-        all_inputs: [n_creatures, 45] входы всех существ
-        all_w1: [n_creatures, 50, 45] и т.д.
+        all_inputs: [n_creatures, 50] входы всех существ
+        rows: [n_creatures] строка каждого существа в тензорах весов
+        all_w1: [n_rows, 50, 50] и т.д. (n_rows >= n_creatures, например емкость GenomeBank)
         возвращает: [n_creatures, 3] решения всех существ
         """
         n_nets = all_inputs.shape[0]
@@ -168,12 +215,13 @@ class NeuralNetwork:  # класс нейронной сети
         # Параллельно обрабатываем всех существ
         for i in prange(n_nets):
             x = all_inputs[i]
-            w1 = all_w1[i]
-            b1 = all_b1[i]
-            w2 = all_w2[i]
-            b2 = all_b2[i]
-            w3 = all_w3[i]
-            b3 = all_b3[i]
+            row = rows[i]
+            w1 = all_w1[row]
+            b1 = all_b1[row]
+            w2 = all_w2[row]
+            b2 = all_b2[row]
+            w3 = all_w3[row]
+            b3 = all_b3[row]
             
             # Первый слой
             z1 = np.zeros(HIDDEN1_SIZE, dtype=np.float32)
@@ -204,6 +252,9 @@ class NeuralNetwork:  # класс нейронной сети
                 
         return outputs
 
+    # То же ядро без parallel=True: prange работает как обычный range на одном ядре
+    fast_calc_all_outs_serial = staticmethod(threads.serial_kernel(fast_calc_all_outs.__func__))
+
 
 
 
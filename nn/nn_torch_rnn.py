@@ -1,155 +1,179 @@
 # -*- coding: utf-8 -*-
+# RNN-бэкенд на PyTorch с настоящим пакетным инференсом.
+#
+# Архитектура та же, что у nn/rnn.py (Elman RNN, два рекуррентных слоя), и тот же контракт:
+# prepare_calc / make_all_decisions / serialize / deserialize / copy / mutate.
+# Веса каждой сети - numpy float32, поэтому сети живут в GenomeBank пула так же, как ff и rnn.
+# torch.from_numpy оборачивает тензоры банка без копирования, и весь тик считается
+# одним torch.bmm на каждое произведение слоя сразу для всех существ.
+# Копирование и мутация - срезы тех же тензоров (строки банка).
+
+import numpy as np
 import torch
-import torch.nn as nn
-import copy
-import random
-from torch.nn.utils import parameters_to_vector
 
-NETCONF = [46,50,10,3]
-NetConf = NETCONF
+from nn import threads
+from nn.genome_bank import GenomeBank
+from service.rng.rng import rng
+
+
+# Конфигурация - такая же, как у ff и rnn
+INPUT_SIZE = 50
+HIDDEN1_SIZE = 50
+HIDDEN2_SIZE = 10
+OUTPUT_SIZE = 3
+
+
+class NeuralNetwork:
+    # Имя бэкенда: ключ в реестре nn и тип сети в сохранениях
+    __type__ = 'torch_rnn'
+
+    # Обучаемые параметры и их формы - по ним строится GenomeBank
+    GENOME = {
+        'w1_x': (INPUT_SIZE, HIDDEN1_SIZE),
+        'w1_h': (HIDDEN1_SIZE, HIDDEN1_SIZE),
+        'b1': (HIDDEN1_SIZE,),
+        'w2_x': (HIDDEN1_SIZE, HIDDEN2_SIZE),
+        'w2_h': (HIDDEN2_SIZE, HIDDEN2_SIZE),
+        'b2': (HIDDEN2_SIZE,),
+        'w3': (HIDDEN2_SIZE, OUTPUT_SIZE),
+        'b3': (OUTPUT_SIZE,),
+    }
+    # Скрытые состояния - память существа, хранятся в банке рядом с весами
+    STATE = {
+        'h1_state': (HIDDEN1_SIZE,),
+        'h2_state': (HIDDEN2_SIZE,),
+    }
+    _bank = None
+    _row = -1
 
-
-class NeuralNetwork(nn.Module):
     def __init__(self):
-        # NetConf = [31,10,10,2]
-        input_size = NetConf[0]
-        # for l in NetConf[1:-1]:
-        #    hidden[]=.............................................................
-        hidden_size = NetConf[1]
-        output_size = NetConf[3]
-        self.hidden = torch.zeros(1, NetConf[1])
-
-        super().__init__()
-        self.hidden_size = hidden_size
-        self.i2h = nn.Linear(input_size + self.hidden_size, self.hidden_size)
-        self.h2o = nn.Linear(self.hidden_size, output_size)
-        #self.i2o = nn.Linear(input_size + hidden_size, output_size)
-        self.softmax = nn.Sigmoid()
-
-    def forward(self, input):
-        if type(input) == list:
-            #print("LIST LIST LIST")
-            # input = torch.FloatTensor(input)
-            input = torch.tensor(input)
-            input = input[None, :]
-            input.shape
-        #print (input.size())
-        #print (self.hidden.size())
-        #print ("self.hiddenself.hiddenself.hiddenself.hiddenself.hidden")
-        #print (self.hidden)
-
-
-
-
-        # 2024-01-26 Пробуем без обучения скрытого слоя - он будет всегда нулевой, потом посмотрим как сойдется.
-        # Сейчас пока сетка - считай прямого распространения.
-        self.hidden = torch.zeros(1, 50)
-
-
-
-
-        combined = torch.cat((input, self.hidden), 1)
-        self.hidden = torch.sigmoid(self.i2h(combined))
-        output = self.h2o(self.hidden)
-        #output = self.i2o(combined)
-        output = self.softmax(output)
-        return output
-
-    def calc(self, input):
-        res1 = self.forward(input)
-        res2 = res1.tolist()[0]
-        #print (res2)
-        return res2
-
-    def initHidden(self):
-        print("Clear hidden")
-        self.hidden = torch.zeros(1, self.hidden_size)
-        return self.hidden
-
-    def mutate(self, mut_prob, mut_strength):
-        # print("MUTATION")
-        for param in self.parameters():
-            # Тут хитрые вычисления Создается тензон размерности с исходный тензор, 
-            # он заполняется случайными значениями и сравнивается меньше ли он вероятности мутации, если True
-            # то True.int() = 1
-            # Иначе False.int() = 0
-            # ебучая магия
-            param.data += mut_strength * torch.randn_like(param) * (torch.rand(size=param.data.size()) < mut_prob).int()
-
-    # def __deepcopy__(self, memo):
-    #     cls = self.__class__ # Extract the class of the object
-    #     result = cls.__new__(cls) # Create a new instance of the object based on extracted class
-    #     #memo[id(self)] = result
-    #     #for k, v in self.__dict__.items():
-    #     #    setattr(result, k, copy.deepcopy(v, memo)) # Copy over attributes by copying directly or in case of complex objects like lists for exaample calling the `__deepcopy()__` method defined by them. Thus recursively copying the whole tree of objects.
-    #     result.load_state_dict(copy.deepcopy(memo.state_dict()))
-    #     return result
-
-
-    def debug_print(self):
-        print("%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%")
-        # print(self._inputs)
-        # print(". . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . ")
-        # print(self.hidden)
-        # print(". . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . ")
-        # print(self)
-        print(". . . . . . . . . . . . . .  ВСЕ ВЕСА:. . . . . . . . . . . . . . . . . . . . . . ")
-        for name, param in self.named_parameters():
-            print(name, param.data)
-        # print(". . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . . ")
-        # print(self._outs)
-        print("%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%")
-        for layer in self.children():
-            print("- - - ")
-            for param in layer.parameters():
-                print(param)
-        # for name, param in self.named_parameters():
-        #     print(name, param.data)
-
-
-
-    def weights_matrix(self):
-        # self.debug_print()
-        matrix_layers = []
-        # fake_neuron = [-0.9, -0.8, -0.7, -0.6, -0.5, -0.4, -0.3, -0.2, -0.1, 0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
-        # matrix_layers.append([fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron])
-        # matrix_layers.append([fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron])
-        # matrix_layers.append([fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron, fake_neuron])
-        # for param in self.parameters():
-        #for param in self.parameters():
-        for name, param in self.named_parameters():
-            # i2h.weight
-            # i2h.bias
-            # h2o.weight
-            # h2o.bias
-            if name[4:]=="weight":
-                matrix_layers.append(param.tolist())
-        # print ("################# matrix_layers #######################")
-        # print(matrix_layers)
-        # print ("######################################################")
-        return matrix_layers
-
+        genomes = rng.stream('genomes') # случайные веса - из потока 'genomes' сервиса rng
+        limit1 = np.sqrt(6.0 / (INPUT_SIZE + HIDDEN1_SIZE))
+        self.w1_x = genomes.uniform(-limit1, limit1, (INPUT_SIZE, HIDDEN1_SIZE)).astype(np.float32)
+        self.w1_h = genomes.uniform(-limit1, limit1, (HIDDEN1_SIZE, HIDDEN1_SIZE)).astype(np.float32)
+        self.b1 = np.zeros(HIDDEN1_SIZE, dtype=np.float32)
+
+        limit2 = np.sqrt(6.0 / (HIDDEN1_SIZE + HIDDEN2_SIZE))
+        self.w2_x = genomes.uniform(-limit2, limit2, (HIDDEN1_SIZE, HIDDEN2_SIZE)).astype(np.float32)
+        self.w2_h = genomes.uniform(-limit2, limit2, (HIDDEN2_SIZE, HIDDEN2_SIZE)).astype(np.float32)
+        self.b2 = np.zeros(HIDDEN2_SIZE, dtype=np.float32)
+
+        limit3 = np.sqrt(6.0 / (HIDDEN2_SIZE + OUTPUT_SIZE))
+        self.w3 = genomes.uniform(-limit3, limit3, (HIDDEN2_SIZE, OUTPUT_SIZE)).astype(np.float32)
+        self.b3 = np.zeros(OUTPUT_SIZE, dtype=np.float32)
+
+        self.h1_state = np.zeros(HIDDEN1_SIZE, dtype=np.float32)
+        self.h2_state = np.zeros(HIDDEN2_SIZE, dtype=np.float32)
+
+    @classmethod
+    def blank(cls):
+        # Сеть без случайной инициализации - веса заполнит copy() или deserialize()
+        nn = cls.__new__(cls)
+        nn.h1_state = np.zeros(HIDDEN1_SIZE, dtype=np.float32)
+        nn.h2_state = np.zeros(HIDDEN2_SIZE, dtype=np.float32)
+        return nn
+
+    def get_states(self) -> list:
+        return [self.h1_state, self.h2_state]
+
+    def set_states(self, states: list) -> None:
+        self.h1_state[:] = states[0]
+        self.h2_state[:] = states[1]
+
+    def print_nn_parameters(self):
+        for name in list(self.GENOME) + list(self.STATE):
+            print(f"{name}:", getattr(self, name))
 
+    @staticmethod
+    def copy(original_nn):
+        # Копия без случайной инициализации: веса копируются один раз (потомков мира - строкой банка)
+        new_nn = NeuralNetwork.blank()
+        for name in NeuralNetwork.GENOME:
+            setattr(new_nn, name, getattr(original_nn, name).copy())
+        return new_nn
+
+    def serialize(self) -> dict:
+        data = {'__type__': self.__type__}
+        for name in list(self.GENOME) + list(self.STATE):
+            data[name] = getattr(self, name).tolist()
+        return data
+
+    def deserialize(self, data: dict) -> None:
+        for name in list(self.GENOME) + list(self.STATE):
+            setattr(self, name, np.array(data[name], dtype=np.float32))
+
+    def mutate(self, mutation_probability: float, mutation_strength: float) -> None:
+        # Мутация на месте через тензоры, разделяющие память с массивами сети
+        if mutation_probability <= 0:
+            return
+        # Случайные числа - из потока 'mutation' сервиса rng (как у остальных бэкендов), а не из генератора torch
+        mutation_rng = rng.stream('mutation')
+        for name in self.GENOME:
+            param = torch.from_numpy(getattr(self, name))
+            mask = torch.from_numpy(mutation_rng.random(param.shape) < mutation_probability)
+            param += mutation_strength * (2 * torch.from_numpy(mutation_rng.random(param.shape, dtype=np.float32)) - 1) * mask
 
     @staticmethod
-    def fast_calc_all_outs(all_visions, creatures_nns):
-        # Это заглушка для
-        all_outs = [] # all_outs[] = [angle_delta, speed_delta, bite]
-
-        for index,out in enumerate(creatures_nns):
-            angle_delta = 0.0
-            speed_delta = 0.3
-            bite = 0.0
-            
-            if (all_visions[index][7] > 250) and (all_visions[index][22] < 50) and (all_visions[index][37] < 50):
-                angle_delta = 0.01*(random.random()-0.5)
-            else:
-                angle_delta = 1*(random.random()-0.5)
-            all_outs.append([
-                angle_delta, 
-                speed_delta, 
-                bite
-                ])
-                    
-        return all_outs
+    def prepare_calc(creatures, bank=None, rows=None) -> tuple:
+        # Возвращает (rows, w1_x, w1_h, b1, w2_x, w2_h, b2, w3, b3, h1, h2) - как nn/rnn.py.
+        # Для существ мира это тензоры GenomeBank без копирования (банк и строки передает мир).
+        if bank is None:
+            bank, rows = GenomeBank.rows_of(creatures)
+        if bank is not None:
+            return (rows, bank.w1_x, bank.w1_h, bank.b1, bank.w2_x, bank.w2_h,
+                    bank.b2, bank.w3, bank.b3, bank.h1_state, bank.h2_state)
+
+        names = list(NeuralNetwork.GENOME) + list(NeuralNetwork.STATE)
+        stacked = [np.stack([getattr(cr.nn, name) for cr in creatures]).astype(np.float32) if creatures
+                   else np.zeros((0,) + (NeuralNetwork.GENOME.get(name) or NeuralNetwork.STATE[name]), dtype=np.float32)
+                   for name in names]
+        return (np.arange(len(creatures), dtype=np.int64), *stacked)
 
+    @staticmethod
+    def make_all_decisions(all_inputs: np.ndarray, creatures, creatures_nns: tuple) -> np.ndarray:
+        n = all_inputs.shape[0]
+        if n == 0:
+            return np.zeros((0, OUTPUT_SIZE), dtype=np.float32)
+        if torch.get_num_threads() != threads.get_threads():
+            torch.set_num_threads(threads.get_threads())
+
+        rows_np, w1_x, w1_h, b1, w2_x, w2_h, b2, w3, b3, h1, h2 = creatures_nns
+        rows = torch.from_numpy(np.ascontiguousarray(rows_np, dtype=np.int64))
+        # Считаем только строки группы: пустые строки банка (слоты умерших) и строки
+        # других бэкендов в bmm не попадают. Строки подряд с нуля (стопка копий) - срез
+        # без копирования, иначе - выборка весов группы по rows.
+        dense = rows_np[0] == 0 and rows_np[-1] == n - 1 and bool(np.all(np.diff(rows_np) == 1))
+
+        def take(array):
+            return torch.from_numpy(array[:n]) if dense else torch.from_numpy(array)[rows]
+
+        t_w1_x, t_w1_h, t_b1 = take(w1_x), take(w1_h), take(b1)
+        t_w2_x, t_w2_h, t_b2 = take(w2_x), take(w2_h), take(b2)
+        t_w3, t_b3 = take(w3), take(b3)
+        t_h1, t_h2 = take(h1), take(h2)
+
+        x = torch.from_numpy(np.ascontiguousarray(all_inputs, dtype=np.float32)).unsqueeze(1)
+
+        with torch.no_grad():
+            # Слой 1: h1 = tanh(x @ W1_x + h1 @ W1_h + b1)
+            new_h1 = torch.tanh(
+                torch.bmm(x, t_w1_x) + torch.bmm(t_h1.unsqueeze(1), t_w1_h) + t_b1.unsqueeze(1)
+            )
+            # Слой 2: h2 = tanh(h1 @ W2_x + h2 @ W2_h + b2)
+            new_h2 = torch.tanh(
+                torch.bmm(new_h1, t_w2_x) + torch.bmm(t_h2.unsqueeze(1), t_w2_h) + t_b2.unsqueeze(1)
+            )
+            # Выход: clamp(tanh(h2 @ W3 + b3), -1, 1)
+            outputs = torch.clamp(torch.tanh(torch.bmm(new_h2, t_w3) + t_b3.unsqueeze(1)), -1.0, 1.0)
+
+            # Новые состояния - обратно по строкам существ, прямо в память банка
+            torch.from_numpy(h1)[rows] = new_h1[:, 0]
+            torch.from_numpy(h2)[rows] = new_h2[:, 0]
+
+        # Сети вне банка (стопка копий) получают свои новые состояния обратно
+        if creatures[0].nn._bank is None:
+            for i, cr in enumerate(creatures):
+                cr.nn.h1_state[:] = h1[rows_np[i]]
+                cr.nn.h2_state[:] = h2[rows_np[i]]
+
+        return outputs[:, 0].numpy()
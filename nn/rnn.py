@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import math
 import numpy as np
+from numba import jit, prange
+from nn import threads
+from nn.genome_bank import GenomeBank
+from service.rng.rng import rng
 
 
 # Config must match FF network
@@ -13,19 +18,45 @@ OUTPUT_SIZE = 3
 class NeuralNetwork:
     """Elman RNN with two recurrent hidden layers."""
 
+    # Backend name: key in the nn registry and network type in saves.
+    __type__ = 'rnn'
+
+    # Trainable parameters and their shapes, used to build the GenomeBank.
+    GENOME = {
+        'w1_x': (INPUT_SIZE, HIDDEN1_SIZE),
+        'w1_h': (HIDDEN1_SIZE, HIDDEN1_SIZE),
+        'b1': (HIDDEN1_SIZE,),
+        'w2_x': (HIDDEN1_SIZE, HIDDEN2_SIZE),
+        'w2_h': (HIDDEN2_SIZE, HIDDEN2_SIZE),
+        'b2': (HIDDEN2_SIZE,),
+        'w3': (HIDDEN2_SIZE, OUTPUT_SIZE),
+        'b3': (OUTPUT_SIZE,),
+    }
+    # Recurrent state, stored in the GenomeBank next to the weights (not mutated, not shared).
+    STATE = {
+        'h1_state': (HIDDEN1_SIZE,),
+        'h2_state': (HIDDEN2_SIZE,),
+    }
+    # Parallel (prange over creatures) or serial inference, same switch as the ff backend.
+    parallel = True
+    # Bank and row holding the weights while the creature lives in a world.
+    _bank = None
+    _row = -1
+
     def __init__(self):
+        genomes = rng.stream('genomes')  # random init comes from the seeded 'genomes' stream
         limit1 = np.sqrt(6.0 / (INPUT_SIZE + HIDDEN1_SIZE))
-        self.w1_x = np.random.uniform(-limit1, limit1, (INPUT_SIZE, HIDDEN1_SIZE)).astype(np.float32)
-        self.w1_h = np.random.uniform(-limit1, limit1, (HIDDEN1_SIZE, HIDDEN1_SIZE)).astype(np.float32)
+        self.w1_x = genomes.uniform(-limit1, limit1, (INPUT_SIZE, HIDDEN1_SIZE)).astype(np.float32)
+        self.w1_h = genomes.uniform(-limit1, limit1, (HIDDEN1_SIZE, HIDDEN1_SIZE)).astype(np.float32)
         self.b1 = np.zeros(HIDDEN1_SIZE, dtype=np.float32)
 
         limit2 = np.sqrt(6.0 / (HIDDEN1_SIZE + HIDDEN2_SIZE))
-        self.w2_x = np.random.uniform(-limit2, limit2, (HIDDEN1_SIZE, HIDDEN2_SIZE)).astype(np.float32)
-        self.w2_h = np.random.uniform(-limit2, limit2, (HIDDEN2_SIZE, HIDDEN2_SIZE)).astype(np.float32)
+        self.w2_x = genomes.uniform(-limit2, limit2, (HIDDEN1_SIZE, HIDDEN2_SIZE)).astype(np.float32)
+        self.w2_h = genomes.uniform(-limit2, limit2, (HIDDEN2_SIZE, HIDDEN2_SIZE)).astype(np.float32)
         self.b2 = np.zeros(HIDDEN2_SIZE, dtype=np.float32)
 
         limit3 = np.sqrt(6.0 / (HIDDEN2_SIZE + OUTPUT_SIZE))
-        self.w3 = np.random.uniform(-limit3, limit3, (HIDDEN2_SIZE, OUTPUT_SIZE)).astype(np.float32)
+        self.w3 = genomes.uniform(-limit3, limit3, (HIDDEN2_SIZE, OUTPUT_SIZE)).astype(np.float32)
         self.b3 = np.zeros(OUTPUT_SIZE, dtype=np.float32)
 
         # Hidden states are per-creature memory.
@@ -36,8 +67,9 @@ class NeuralNetwork:
         return [self.h1_state, self.h2_state]
 
     def set_states(self, states: list) -> None:
-        self.h1_state = states[0]
-        self.h2_state = states[1]
+        # Copy in place: while bound to a bank the states are views of its rows.
+        self.h1_state[:] = states[0]
+        self.h2_state[:] = states[1]
 
     def print_nn_parameters(self):
         print("w1_x:", self.w1_x)
@@ -51,23 +83,27 @@ class NeuralNetwork:
         print("h1_state:", self.h1_state)
         print("h2_state:", self.h2_state)
 
+    @classmethod
+    def blank(cls):
+        # Network without random initialization; copy()/deserialize() fill the weights.
+        nn = cls.__new__(cls)
+        nn.h1_state = np.zeros(HIDDEN1_SIZE, dtype=np.float32)
+        nn.h2_state = np.zeros(HIDDEN2_SIZE, dtype=np.float32)
+        return nn
+
     @staticmethod
     def copy(original_nn):
-        new_nn = NeuralNetwork()
-        new_nn.w1_x = original_nn.w1_x.copy()
-        new_nn.w1_h = original_nn.w1_h.copy()
-        new_nn.b1 = original_nn.b1.copy()
-        new_nn.w2_x = original_nn.w2_x.copy()
-        new_nn.w2_h = original_nn.w2_h.copy()
-        new_nn.b2 = original_nn.b2.copy()
-        new_nn.w3 = original_nn.w3.copy()
-        new_nn.b3 = original_nn.b3.copy()
+        # No random init: the weights are copied once. Children of world creatures get
+        # their weights as a bank row copy instead (CreaturePool.add(..., genome_from=...)).
+        new_nn = NeuralNetwork.blank()
+        for name in NeuralNetwork.GENOME:
+            setattr(new_nn, name, getattr(original_nn, name).copy())
         # Keep newborn states zeroed.
         return new_nn
 
     def serialize(self) -> dict:
         return {
-            '__type__': 'rnn',
+            '__type__': self.__type__,
             'w1_x': self.w1_x.tolist(),
             'w1_h': self.w1_h.tolist(),
             'b1': self.b1.tolist(),
@@ -94,16 +130,27 @@ class NeuralNetwork:
 
     def mutate(self, mutation_probability: float, mutation_strength: float) -> None:
         params = [self.w1_x, self.w1_h, self.b1, self.w2_x, self.w2_h, self.b2, self.w3, self.b3]
+        mutation_rng = rng.stream('mutation')
         for param in params:
             if mutation_probability > 0:
-                mask = (np.random.rand(*param.shape) < mutation_probability).astype(np.float32)
-                random_changes = mutation_strength * (2 * np.random.rand(*param.shape).astype(np.float32) - 1)
+                mask = (mutation_rng.random(param.shape) < mutation_probability).astype(np.float32)
+                random_changes = mutation_strength * (2 * mutation_rng.random(param.shape, dtype=np.float32) - 1)
                 param += random_changes * mask
 
     @staticmethod
-    def prepare_calc(creatures) -> tuple:
-        n = len(creatures)
+    def prepare_calc(creatures, bank=None, rows=None) -> tuple:
+        # Returns (rows, w1_x, w1_h, b1, w2_x, w2_h, b2, w3, b3, h1, h2).
+        # All tensors are [N, ...] and rows[i] is creature i's row in them.
+        # Creatures living in a world share a GenomeBank: its weight and state tensors
+        # are used as is, and the kernel updates h1/h2 in place in the bank.
+        # The world passes the bank and the rows (pool slots); otherwise they are looked up.
+        if bank is None:
+            bank, rows = GenomeBank.rows_of(creatures)
+        if bank is not None:
+            return (rows, bank.w1_x, bank.w1_h, bank.b1, bank.w2_x, bank.w2_h,
+                    bank.b2, bank.w3, bank.b3, bank.h1_state, bank.h2_state)
 
+        n = len(creatures)
         w1_x = np.empty((n, INPUT_SIZE, HIDDEN1_SIZE), dtype=np.float32)
         w1_h = np.empty((n, HIDDEN1_SIZE, HIDDEN1_SIZE), dtype=np.float32)
         b1 = np.empty((n, HIDDEN1_SIZE), dtype=np.float32)
@@ -128,7 +175,7 @@ class NeuralNetwork:
             h1[i] = nn.h1_state
             h2[i] = nn.h2_state
 
-        return w1_x, w1_h, b1, w2_x, w2_h, b2, w3, b3, h1, h2
+        return np.arange(n, dtype=np.int64), w1_x, w1_h, b1, w2_x, w2_h, b2, w3, b3, h1, h2
 
     @staticmethod
     def make_all_decisions(all_inputs: np.ndarray, creatures, creatures_nns: tuple) -> np.ndarray:
@@ -139,31 +186,95 @@ class NeuralNetwork:
         if n == 0:
             return np.zeros((0, OUTPUT_SIZE), dtype=np.float32)
 
-        w1_x, w1_h, b1, w2_x, w2_h, b2, w3, b3, h1, h2 = creatures_nns
-
-        # Layer 1: h1_new = tanh(x @ W1_x + h1_prev @ W1_h + b1)
-        new_h1 = np.tanh(
-            np.einsum("ni,nij->nj", all_inputs, w1_x)
-            + np.einsum("ni,nij->nj", h1, w1_h)
-            + b1
-        ).astype(np.float32)
-
-        # Layer 2: h2_new = tanh(h1_new @ W2_x + h2_prev @ W2_h + b2)
-        new_h2 = np.tanh(
-            np.einsum("ni,nij->nj", new_h1, w2_x)
-            + np.einsum("ni,nij->nj", h2, w2_h)
-            + b2
-        ).astype(np.float32)
-
-        # Output: out = tanh(h2_new @ W3 + b3), then clamp to [-1, 1]
-        outputs = np.clip(
-            np.tanh(np.einsum("ni,nij->nj", new_h2, w3) + b3),
-            -1.0,
-            1.0,
-        ).astype(np.float32)
+        if NeuralNetwork.parallel:
+            kernel = NeuralNetwork.fast_calc_all_outs
+        else:
+            kernel = NeuralNetwork.fast_calc_all_outs_serial
+        outputs = kernel(all_inputs, *creatures_nns)
 
-        for i, cr in enumerate(creatures):
-            cr.nn.h1_state = new_h1[i]
-            cr.nn.h2_state = new_h2[i]
+        # Stacked copies (networks outside a bank): hand the new states back to each network.
+        rows, h1, h2 = creatures_nns[0], creatures_nns[9], creatures_nns[10]
+        if n and creatures[0].nn._bank is None:
+            for i, cr in enumerate(creatures):
+                cr.nn.h1_state[:] = h1[rows[i]]
+                cr.nn.h2_state[:] = h2[rows[i]]
 
         return outputs
+
+    # Explicit kernel signature for precompilation (service/jit_warmup): float32 inputs, bank tensors and states.
+    KERNEL_SIGNATURE = ('(float32[:, ::1], int64[::1], float32[:, :, ::1], float32[:, :, ::1], float32[:, ::1], '
+                        'float32[:, :, ::1], float32[:, :, ::1], float32[:, ::1], float32[:, :, ::1], float32[:, ::1], '
+                        'float32[:, ::1], float32[:, ::1])')
+
+    @staticmethod
+    @jit(nopython=True, fastmath=True, parallel=True, cache=True)
+    def fast_calc_all_outs(all_inputs, rows, all_w1_x, all_w1_h, all_b1, all_w2_x, all_w2_h, all_b2,
+                           all_w3, all_b3, all_h1, all_h2):
+        """
+        One recurrent step for all creatures at once.
+        h1 = tanh(x @ W1_x + h1 @ W1_h + b1)
+        h2 = tanh(h1 @ W2_x + h2 @ W2_h + b2)
+        out = clamp(tanh(h2 @ W3 + b3), -1, 1)
+        all_h1/all_h2 rows are updated in place; returns [n_creatures, 3].
+        """
+        n_nets = all_inputs.shape[0]
+        outputs = np.zeros((n_nets, OUTPUT_SIZE), dtype=np.float32)
+
+        for i in prange(n_nets):
+            row = rows[i]
+            x = all_inputs[i]
+            w1_x = all_w1_x[row]
+            w1_h = all_w1_h[row]
+            b1 = all_b1[row]
+            w2_x = all_w2_x[row]
+            w2_h = all_w2_h[row]
+            b2 = all_b2[row]
+            w3 = all_w3[row]
+            b3 = all_b3[row]
+            h1 = all_h1[row]
+            h2 = all_h2[row]
+
+            # Layer 1 reads the previous h1, so build the new state aside first.
+            # Loops run k-outer / j-inner so every weight row is read contiguously.
+            new_h1 = b1.copy()
+            for k in range(INPUT_SIZE):
+                xk = x[k]
+                for j in range(HIDDEN1_SIZE):
+                    new_h1[j] += xk * w1_x[k, j]
+            for k in range(HIDDEN1_SIZE):
+                hk = h1[k]
+                for j in range(HIDDEN1_SIZE):
+                    new_h1[j] += hk * w1_h[k, j]
+            for j in range(HIDDEN1_SIZE):
+                new_h1[j] = math.tanh(new_h1[j])
+
+            new_h2 = b2.copy()
+            for k in range(HIDDEN1_SIZE):
+                hk = new_h1[k]
+                for j in range(HIDDEN2_SIZE):
+                    new_h2[j] += hk * w2_x[k, j]
+            for k in range(HIDDEN2_SIZE):
+                hk = h2[k]
+                for j in range(HIDDEN2_SIZE):
+                    new_h2[j] += hk * w2_h[k, j]
+            for j in range(HIDDEN2_SIZE):
+                new_h2[j] = math.tanh(new_h2[j])
+
+            h1[:] = new_h1
+            h2[:] = new_h2
+
+            for j in range(OUTPUT_SIZE):
+                sum_val = b3[j]
+                for k in range(HIDDEN2_SIZE):
+                    sum_val += new_h2[k] * w3[k, j]
+                out = math.tanh(sum_val)
+                if out > 1.0:
+                    out = 1.0
+                elif out < -1.0:
+                    out = -1.0
+                outputs[i, j] = out
+
+        return outputs
+
+    # Same kernel without parallel=True: prange runs as a plain range on one core.
+    fast_calc_all_outs_serial = staticmethod(threads.serial_kernel(fast_calc_all_outs.__func__))
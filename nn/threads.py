@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Число потоков numba для параллельных ядер (инференс нейросетей, зрение, движение).
+# Настройка глобальная для процесса: numba.set_num_threads действует на все prange-ядра.
+
+import types
+from numba import config, get_num_threads, jit, set_num_threads
+
+
+def max_threads() -> int:
+    """Сколько потоков numba может использовать (NUMBA_NUM_THREADS, по умолчанию - число ядер)."""
+    return config.NUMBA_NUM_THREADS
+
+
+def get_threads() -> int:
+    return get_num_threads()
+
+
+def set_threads(num_threads) -> int:
+    """
+    Устанавливает число потоков для параллельных ядер.
+    None или 0 - все доступные ядра. Значение ограничивается диапазоном 1..max_threads().
+    Возвращает фактически установленное число потоков.
+    """
+    if not num_threads:
+        num_threads = max_threads()
+    num_threads = max(1, min(int(num_threads), max_threads()))
+    set_num_threads(num_threads)
+    return num_threads
+
+
+def serial_kernel(kernel):
+    """
+    Последовательная копия parallel-ядра: то же тело, но prange работает как обычный range.
+    Функция копируется под своим именем (<имя>_serial), чтобы у копии был собственный
+    дисковый кэш numba - иначе кэш parallel-ядра и последовательной копии смешался бы.
+    """
+    func = kernel.py_func
+    serial = types.FunctionType(func.__code__, func.__globals__, func.__name__ + '_serial',
+                                func.__defaults__, func.__closure__)
+    serial.__qualname__ = func.__qualname__ + '_serial'
+    return jit(nopython=True, fastmath=True, cache=True)(serial)
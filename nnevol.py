@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from application import Application
+import sys
 
 if __name__ == "__main__":
-	app = Application()
+	if '--headless' in sys.argv[1:]:
+		# Без окна: pygame и рендерер не импортируются
+		from headless_application import HeadlessApplication
+		app = HeadlessApplication()
+	else:
+		from application import Application
+		app = Application()
 	app.run()
-
-
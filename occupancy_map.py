@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Инкрементальная карта занятости клеток (стены, пища, существа)."""
+
+import numpy as np
+
+
+class OccupancyMap:
+    """
+    Поддерживает World.map без полной перестройки каждый тик.
+
+    - creature_counts[y, x] — сколько существ стоит в клетке
+      (в одной клетке может оказаться несколько существ)
+    - _slot_cells[slot] — клетка (y * width + x), в которой слот был отмечен
+      при прошлом обновлении, или -1
+    - пища берется из индекса клеток FoodStore, а изменившиеся клетки пищи
+      FoodStore сам копит между обновлениями (take_changed_cells)
+
+    Перезаписываются только клетки, где что-то изменилось: стоимость
+    обслуживания карты зависит от числа перемещений/рождений/смертей
+    и съеденной пищи, а не от общего количества пищи.
+    Приоритет значений тот же, что у полной перестройки: существо (3) > пища (2) > стена/пусто.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.creature_counts = np.zeros((height, width), dtype=np.int32)
+        self._slot_cells = np.full(0, -1, dtype=np.int64)
+        self._sources = None # (map, walls_map, food_store), для которых карта актуальна
+
+    def _current_cells(self, pool) -> np.ndarray:
+        """Клетки всех слотов пула: y * width + x для живых, -1 для свободных."""
+        cells = np.full(pool.capacity, -1, dtype=np.int64)
+        slots = pool.slots()
+        cells[slots] = pool.y[slots].astype(np.int64) * self.width + pool.x[slots].astype(np.int64)
+        return cells
+
+    def _is_stale(self, world) -> bool:
+        # Карту, стены или хранилище пищи заменили целиком (генерация, загрузка мира)
+        if self._sources is None:
+            return True
+        map_, walls_map, food_store = self._sources
+        return map_ is not world.map or walls_map is not world.walls_map or food_store is not world.food_store
+
+    @staticmethod
+    def compose(walls_map, food_grid, creature_counts) -> np.ndarray:
+        """Полная карта из слоев - эталон для инкрементального обновления."""
+        full = walls_map.copy()
+        full[food_grid >= 0] = 2
+        full[creature_counts > 0] = 3
+        return full
+
+    def rebuild(self, world) -> None:
+        """Полная перестройка: счетчики существ и карта считаются заново."""
+        self.height, self.width = world.map.shape # Размер мира мог смениться при загрузке
+        cells = self._current_cells(world.pool)
+        alive_cells = cells[cells >= 0]
+        self.creature_counts = np.bincount(
+            alive_cells, minlength=self.width * self.height
+        ).astype(np.int32).reshape(self.height, self.width)
+        self._slot_cells = cells
+        np.copyto(world.map, self.compose(world.walls_map, world.food_grid, self.creature_counts))
+        world.food_store.take_changed_cells() # Все изменения пищи уже учтены
+        self._sources = (world.map, world.walls_map, world.food_store)
+
+    def update(self, world) -> None:
+        """Инкрементальное обновление: перезаписываются только изменившиеся клетки."""
+        if self._is_stale(world):
+            self.rebuild(world)
+            return
+        food_cells = world.food_store.take_changed_cells()
+        if food_cells is None:
+            # FoodStore переполнил журнал изменений - дешевле перестроить все
+            self.rebuild(world)
+            return
+
+        cells = self._current_cells(world.pool)
+        old_cells = self._slot_cells
+        if len(old_cells) < len(cells):
+            old_cells = np.concatenate((old_cells, np.full(len(cells) - len(old_cells), -1, dtype=np.int64)))
+
+        # Слоты, у которых клетка изменилась: переместились, умерли или родились
+        moved = np.flatnonzero(cells != old_cells)
+        left = old_cells[moved]
+        left = left[left >= 0]
+        entered = cells[moved]
+        entered = entered[entered >= 0]
+
+        counts = self.creature_counts.ravel()
+        np.subtract.at(counts, left, 1)
+        np.add.at(counts, entered, 1)
+        self._slot_cells = cells
+
+        dirty = np.unique(np.concatenate((left, entered, food_cells)))
+        if len(dirty):
+            world_map = world.map.ravel()
+            walls = world.walls_map.ravel()
+            food_grid = world.food_grid.ravel()
+            world_map[dirty] = np.where(
+                counts[dirty] > 0, 3,
+                np.where(food_grid[dirty] >= 0, 2, walls[dirty])
+            )
+
+    def is_consistent(self, world) -> bool:
+        """Сверяет инкрементальную карту с полной перестройкой (для отладки)."""
+        cells = self._current_cells(world.pool)
+        alive_cells = cells[cells >= 0]
+        counts = np.bincount(alive_cells, minlength=self.width * self.height).reshape(self.height, self.width)
+        if not np.array_equal(counts, self.creature_counts):
+            return False
+        return np.array_equal(world.map, self.compose(world.walls_map, world.food_grid, counts))
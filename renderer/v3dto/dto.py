@@ -161,6 +161,7 @@ class DebugDataDTO:
     raycast_dots: Optional[np.ndarray] = None  # Точки raycasts для visualization
     all_visions: Optional[np.ndarray] = None   # Вся информация о виденном
     all_outs: Optional[np.ndarray] = None      # Выходы нейросетей
+    phase_timings: Optional[list] = None       # Строки таблицы пофазных таймингов тика (если включен показ)
     
     def is_empty(self) -> bool:
         """Проверить, пусто ли множество отладочных данных."""
@@ -270,6 +271,9 @@ class RenderStateDTO:
     current_state: str = 'main'  # 'main', 'popup_simparams', 'creatures_list', и т.д.
     tick: int = 0
 
+    # Строка статуса фонового сохранения мира (None - нечего показывать)
+    save_status: Optional[str] = None
+
     
     @property
     def population_count(self) -> int:
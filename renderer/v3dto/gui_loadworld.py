@@ -98,11 +98,13 @@ class PopupLoadWorldModal:
         # Ширина столбцов (в пикселях)
         self.col_widths = {
             'id': 30,
-            'name': 240,
+            'name': 170,
             'modified_at': 130,
-            'creatures_count': 90,
-            'max_generation': 80,
+            'creatures_count': 80,
+            'max_generation': 60,
+            'tick': 80,
             'map_size': 80,
+            'backend': 60,
         }
     
     @property
@@ -208,14 +210,16 @@ class PopupLoadWorldModal:
         col_y = y
         col_x = x
         
-        headers = ['ID', 'Name', 'Modified At', 'Creatures', 'Max Gen', 'Map Size']
+        headers = ['ID', 'Name', 'Modified At', 'Creatures', 'Max Gen', 'Tick', 'Map Size', 'NN']
         widths = [
             self.col_widths['id'],
             self.col_widths['name'],
             self.col_widths['modified_at'],
             self.col_widths['creatures_count'],
             self.col_widths['max_generation'],
+            self.col_widths['tick'],
             self.col_widths['map_size'],
+            self.col_widths['backend'],
         ]
         
         for header, width in zip(headers, widths):
@@ -259,22 +263,29 @@ class PopupLoadWorldModal:
         
         # Форматируем значения для таблицы
         id_str = str(slot_id)
-        name_str = str(slot_info.get('name', 'Unknown'))[:35]
+        name_str = str(slot_info.get('name', 'Unknown'))[:20]
+        if slot_info.get('kind') == 'delta':
+            name_str = name_str[:19] + '*' # дельта-чекпоинт
         modified_at_str = str(slot_info.get('modified_at', 'N/A'))
         creatures_val = slot_info.get('creatures_count')
         creatures_str = str(creatures_val) if creatures_val is not None else 'N/A'
         generation_val = slot_info.get('max_generation')
         generation_str = str(generation_val) if generation_val is not None else 'N/A'
+        tick_val = slot_info.get('tick')
+        tick_str = str(tick_val) if tick_val is not None else 'N/A'
         map_size_str = str(slot_info.get('map_size', 'N/A'))
+        backend_str = str(slot_info.get('backend') or 'N/A')[:7]
         
-        values = [id_str, name_str, modified_at_str, creatures_str, generation_str, map_size_str]
+        values = [id_str, name_str, modified_at_str, creatures_str, generation_str, tick_str, map_size_str, backend_str]
         widths = [
             self.col_widths['id'],
             self.col_widths['name'],
             self.col_widths['modified_at'],
             self.col_widths['creatures_count'],
             self.col_widths['max_generation'],
+            self.col_widths['tick'],
             self.col_widths['map_size'],
+            self.col_widths['backend'],
         ]
         
         # Отрисовка каждого столбца
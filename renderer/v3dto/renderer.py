@@ -15,6 +15,7 @@ Renderer v3dto - версия с изоляцией данных через DTO.
 ✓ Слабая связанность
 """
 
+import time
 import pygame
 from typing import Dict, Optional, Callable
 import numpy as np
@@ -67,6 +68,9 @@ class Renderer:
     FONT_SIZE = 16
     FONT_PATH = './tests/Ac437_Siemens_PC-D.ttf'
 
+    # Сколько секунд после окончания фонового сохранения показывать его итог
+    SAVE_STATUS_SECONDS = 5.0
+
     def __init__(self, world, app):
         """
         Инициализация Renderer.
@@ -435,7 +439,13 @@ class Renderer:
         ВАЖНО: Это преобразование должно быть быстрым, т.к. вызывается каждый фрейм!
         """
         creatures_dto = [self._prepare_creature_dto(c) for c in self.world.creatures]
-        foods_dto = [self._prepare_food_dto(f) for f in self.world.foods]
+        # Пищу собираем прямо из колонок FoodStore, не создавая представления Food
+        store = self.world.food_store
+        n_foods = store.count
+        foods_dto = [
+            FoodDTO(x=x, y=y, energy=energy)
+            for x, y, energy in zip(store.x[:n_foods].tolist(), store.y[:n_foods].tolist(), store.nutrition[:n_foods].tolist())
+        ]
 
         # Соберем данные по освещенности для графика день/ночь, используя быструю из World.dayLighting(tick)
         times = np.arange(self.world.tick-1500, self.world.tick+1500, 10)
@@ -457,7 +467,15 @@ class Renderer:
             raycast_dots=debug.get("raycast_dots"),
             all_visions=debug.get("all_visions"),
             all_outs=debug.get("all_outs"),
+            phase_timings=self._prepare_phase_timings(),
         )
+
+    def _prepare_phase_timings(self) -> Optional[list]:
+        """Таблица пофазных таймингов тика для показа поверх карты (клавиша P)."""
+        monitor = getattr(self.app, 'performance_monitor', None)
+        if monitor is None or not monitor.show_on_screen:
+            return None
+        return monitor.profiler.format_table()
     
     def _prepare_simulation_params_dto(self) -> SimulationParamsDTO:
         """Собрать параметры симуляции в SimulationParamsDTO."""
@@ -540,7 +558,7 @@ class Renderer:
         Получить список слотов сохранения из сервиса.
         
         Полностью делегирует работу с файловой системой в WorldPersistenceService.
-        Метаданные читаются из имени файла (без распаковки архивов).
+        Метаданные берутся из индекса слотов (без распаковки архивов).
         """
         from service.world_persistence.world_persistence import world_persistence
         
@@ -556,6 +574,10 @@ class Renderer:
                 'creatures_count': slot_info['creatures_count'],
                 'max_generation': slot_info['max_generation'],
                 'map_size': slot_info['map_size'],
+                'tick': slot_info['tick'],
+                'backend': slot_info['backend'],
+                'kind': slot_info['kind'],
+                'file_size_kb': slot_info['file_size_kb'],
             })
         
         return result
@@ -578,8 +600,18 @@ class Renderer:
             selected_creature=selected_creature_dto,
             current_state=self.current_state,
             tick=self.world.tick,
+            save_status=self._prepare_save_status(),
         )
 
+    def _prepare_save_status(self) -> Optional[str]:
+        """Статус фонового сохранения: прогресс записи, затем итог в течение SAVE_STATUS_SECONDS."""
+        job = getattr(self.app, 'save_job', None)
+        if job is None:
+            return None
+        if job.finished and time.monotonic() - job.finished_at > self.SAVE_STATUS_SECONDS:
+            return None
+        return job.describe()
+
     # ============================================================================
     # ОБРАБОТКА СОБЫТИЙ
     # ============================================================================
@@ -654,6 +686,12 @@ class Renderer:
         elif event.key == pygame.K_f:
             self.set_state('main_fast_nolog')
             return False
+
+        elif event.key == pygame.K_p:
+            # Показ пофазных таймингов тика поверх карты
+            monitor = self.app.performance_monitor
+            monitor.show_on_screen = not monitor.show_on_screen
+            return False
         
         elif event.key == pygame.K_TAB:
             # Проверяем, нажата ли клавиша Shift
@@ -939,6 +977,14 @@ class Renderer:
         
         # Отрисовка истории энергии
         self.selected_creature_history.draw(self.screen, render_state)
+
+        # Пофазные тайминги тика (клавиша P)
+        if render_state.debug.phase_timings is not None:
+            self._draw_phase_timings(render_state.debug.phase_timings)
+
+        # Статус фонового сохранения мира
+        if render_state.save_status is not None:
+            self._draw_save_status(render_state.save_status)
         
         
     
@@ -1011,6 +1057,23 @@ class Renderer:
 
 
     
+    def _draw_phase_timings(self, lines: list) -> None:
+        """Таблица пофазных таймингов тика на полупрозрачной подложке в левом верхнем углу."""
+        line_height = self.FONT_SIZE + 2
+        panel = pygame.Surface((460, len(lines) * line_height + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 200))
+        for i, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, self.COLORS['text']), (5, 5 + i * line_height))
+        self.screen.blit(panel, (10, 10))
+
+    def _draw_save_status(self, status: str) -> None:
+        """Строка статуса фонового сохранения на подложке в левом нижнем углу."""
+        text_surface = self.font.render(status, True, self.COLORS['text'])
+        panel = pygame.Surface((text_surface.get_width() + 10, self.FONT_SIZE + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 200))
+        panel.blit(text_surface, (5, 4))
+        self.screen.blit(panel, (10, self.SCREEN_HEIGHT - panel.get_height() - 10))
+
     def _draw_debug_info(self, render_state: RenderStateDTO) -> None:
         """Вспомогательный метод для отрисовки отладочной информации."""
         info_lines = [
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# Автосохранение: периодические чекпоинты мира по тикам и/или по времени с ротацией файлов.
+#
+# Чекпоинт - обычное сохранение world_persistence с именем '<name>_<номер>_t<тик>'.
+# Пишется в фоне (save_world_async): в цикле симуляции тратится только снимок мира,
+# запись атомарная (временный файл + os.replace). Пока предыдущий чекпоинт пишется,
+# новый не начинается, а доля времени на снимки ограничена max_overhead - автосохранение
+# не искажает замеры скорости симуляции.
+#
+# Ротация: хранятся последние keep_last чекпоинтов и каждый keep_every-й по номеру
+# (редкие опорные точки долгой эволюции). Остальные удаляются.
+#
+# delta=True: между полными чекпоинтами пишутся дельты - веса только новорожденных,
+# остальное состояние целиком (см. WorldPersistenceService.snapshot). Каждый full_every-й
+# чекпоинт полный, так цепочка, которую надо накладывать при загрузке, не растет.
+# Ротация не удаляет родителей оставленных дельт; world_persistence.compact_save(stem)
+# превращает дельту в самостоятельное полное сохранение.
+#
+#   scheduler = CheckpointScheduler('autosave', every_ticks=10000, keep_last=5, keep_every=10)
+#   stem = CheckpointScheduler.latest('autosave')  # продолжить с последнего чекпоинта
+#   ...
+#   scheduler.maybe_checkpoint(world)  # каждый тик
+#   scheduler.close()                  # дождаться записи и почистить старые
+
+import re
+import time
+from typing import Optional
+from service.world_persistence.world_persistence import world_persistence
+
+
+class CheckpointScheduler:
+
+    def __init__(self, name: str = 'autosave', every_ticks: int = 0, every_seconds: float = 0.0,
+                 keep_last: int = 5, keep_every: int = 0, max_overhead: float = 0.01,
+                 delta: bool = False, full_every: int = 10):
+        """
+        Args:
+            name: базовое имя чекпоинтов в saves/
+            every_ticks: чекпоинт каждые N тиков (0 - не по тикам)
+            every_seconds: чекпоинт каждые S секунд (0 - не по времени)
+            keep_last: сколько последних чекпоинтов хранить (0 - хранить все)
+            keep_every: дополнительно хранить каждый K-й чекпоинт по номеру (0 - не хранить)
+            max_overhead: наибольшая доля времени цикла на снимки мира
+            delta: между полными чекпоинтами писать дельты
+            full_every: каждый какой чекпоинт полный при delta=True
+        """
+        self.name = name
+        self.every_ticks = every_ticks
+        self.every_seconds = every_seconds
+        self.keep_last = keep_last
+        self.keep_every = keep_every
+        self.max_overhead = max_overhead
+        self.delta = delta
+        self.full_every = full_every
+
+        self.job = None                  # последний SaveJob
+        self.snapshot_seconds = 0.0      # суммарное время снимков в цикле симуляции
+        self.last_snapshot_seconds = 0.0
+        self.last_tick = None            # тик последнего чекпоинта (или начала отсчета)
+        self._last_time = time.monotonic()
+        self._rotated = True
+        self._parent = None              # последний чекпоинт - родитель следующей дельты
+        # Нумерация продолжается после уже лежащих в saves/ чекпоинтов с этим именем
+        existing = self._existing()
+        self._next_number = existing[-1][0] + 1 if existing else 1
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.every_ticks or self.every_seconds)
+
+    def maybe_checkpoint(self, world):
+        """
+        Вызывается каждый тик. Делает чекпоинт, если подошел срок по тикам или по времени.
+
+        Returns:
+            SaveJob начатого чекпоинта или None
+        """
+        if not self.enabled:
+            return None
+        if self.last_tick is None:
+            self.last_tick = world.tick
+        if self.job is not None and not self.job.finished:
+            return None # не ставим чекпоинты в очередь: снимков в цикле не больше, чем успевает диск
+        if self.job is not None and self.job.status == self.job.FAILED:
+            self._parent = None # родитель не записан - следующий чекпоинт полный
+        if not self._rotated:
+            self.rotate()
+        # По тикам - на кратных every_ticks тиках (или на первом тике после пропущенной границы)
+        due = (self.every_ticks and world.tick // self.every_ticks > self.last_tick // self.every_ticks) or \
+              (self.every_seconds and time.monotonic() - self._last_time >= self.every_seconds)
+        if not due:
+            return None
+        # Снимок занимает last_snapshot_seconds - следующий не раньше, чем через last / max_overhead
+        if self.max_overhead > 0 and time.monotonic() - self._last_time < self.last_snapshot_seconds / self.max_overhead:
+            return None
+        return self.checkpoint(world)
+
+    def checkpoint(self, world):
+        """Чекпоинт сейчас (вне расписания). Возвращает SaveJob или None при ошибке снимка."""
+        parent = self._parent
+        if not self.delta or parent is None or parent['depth'] + 1 >= self.full_every:
+            parent = None
+        start = time.perf_counter()
+        job = world_persistence.save_world_async(world, f"{self.name}_{self._next_number:06d}_t{world.tick}", parent=parent)
+        self.last_snapshot_seconds = time.perf_counter() - start
+        self.snapshot_seconds += self.last_snapshot_seconds
+        self.last_tick = world.tick
+        self._last_time = time.monotonic()
+        if job is not None:
+            self.job = job
+            self._next_number += 1
+            self._rotated = False
+            if self.delta:
+                stem = job.path.name[:-len(world_persistence.SAVE_EXT)]
+                self._parent = {
+                    'stem': stem,
+                    'ids': world.pool.id[world.pool.slots()].copy(),
+                    'base': stem if parent is None else parent['base'],
+                    'depth': 0 if parent is None else parent['depth'] + 1,
+                }
+        return job
+
+    def close(self) -> None:
+        """Дождаться записи последнего чекпоинта и удалить лишние."""
+        if self.job is not None:
+            self.job.wait()
+        self.rotate()
+
+    def rotate(self) -> list:
+        """Удаляет чекпоинты сверх keep_last последних и каждого keep_every-го. Возвращает удаленные пути."""
+        self._rotated = True
+        if self.keep_last <= 0:
+            return []
+        existing = self._existing()
+        keep = {number for number, _, _ in existing[-self.keep_last:]}
+        if self.keep_every > 0:
+            keep |= {number for number, _, _ in existing if number % self.keep_every == 0}
+        keep |= self._ancestors(existing, keep)
+        removed = []
+        for number, _, path in existing:
+            if number not in keep:
+                path.unlink(missing_ok=True)
+                removed.append(path)
+        return removed
+
+    @staticmethod
+    def _ancestors(existing: list, numbers: set) -> set:
+        """Номера сохранений, на которые опираются дельты из numbers (вся цепочка до полного)."""
+        paths = {number: path for number, _, path in existing}
+        numbers_by_stem = {path.name[:-len(world_persistence.SAVE_EXT)]: number for number, _, path in existing}
+        ancestors = set()
+        for number in numbers:
+            while True:
+                try:
+                    header = world_persistence.read_header(paths[number])
+                except Exception:
+                    break
+                number = numbers_by_stem.get(header.get('parent'))
+                if header.get('kind') != 'delta' or number is None or number in ancestors:
+                    break
+                ancestors.add(number)
+        return ancestors
+
+    def _existing(self) -> list:
+        return self.list_checkpoints(self.name)
+
+    @staticmethod
+    def list_checkpoints(name: str) -> list:
+        """Чекпоинты с именем name в saves/: [(номер, тик, путь)] по возрастанию номера."""
+        pattern = re.compile(rf'^{re.escape(name)}_(\d+)_t(\d+)__')
+        checkpoints = []
+        for path in world_persistence.SAVES_DIR.glob(f"{name}_*{world_persistence.SAVE_EXT}"):
+            match = pattern.match(path.name)
+            if match:
+                checkpoints.append((int(match.group(1)), int(match.group(2)), path))
+        checkpoints.sort(key=lambda item: item[0])
+        return checkpoints
+
+    @classmethod
+    def latest(cls, name: str) -> Optional[str]:
+        """Stem последнего чекпоинта с именем name (для world_persistence.load_world) или None."""
+        checkpoints = cls.list_checkpoints(name)
+        if not checkpoints:
+            return None
+        return checkpoints[-1][2].name[:-len(world_persistence.SAVE_EXT)]
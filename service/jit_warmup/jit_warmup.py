@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Прекомпиляция горячих numba-ядер тика с дисковым кэшем и отчет о времени старта."""
+
+import time
+
+
+def hot_kernels(backends=None, vision_mode: str = 'dda') -> list:
+    """
+    Горячие ядра тика: список (имя, ядро numba, явная сигнатура).
+    backends - имена бэкендов нейросетей (по умолчанию - текущий бэкенд по умолчанию);
+    бэкенды без numba-ядра (torch) пропускаются.
+    """
+    import nn
+    from world import World
+
+    vision_kernel = World.fast_get_all_visions_darken_with_distance if vision_mode == 'march' else World.fast_get_all_visions_dda
+    kernels = [
+        (f"World.{vision_kernel.py_func.__name__}", vision_kernel, World.VISION_SIGNATURE),
+        ("World.fast_apply_all_outs", World.fast_apply_all_outs, World.APPLY_OUTS_SIGNATURE),
+    ]
+    for name in backends or [nn.get_default_backend()]:
+        network_class = nn.get_backend(name)
+        signature = getattr(network_class, 'KERNEL_SIGNATURE', None)
+        if signature is None:
+            continue
+        kernel = network_class.fast_calc_all_outs if network_class.parallel else network_class.fast_calc_all_outs_serial
+        kernels.append((f"{name}.{kernel.py_func.__name__}", kernel, signature))
+    return kernels
+
+
+def warmup(backends=None, vision_mode: str = 'dda') -> dict:
+    """
+    Компилирует горячие ядра по их явным сигнатурам до первого тика.
+    Ядра объявлены с cache=True: при повторном запуске машинный код грузится
+    из дискового кэша numba (__pycache__ рядом с модулем или NUMBA_CACHE_DIR),
+    и компиляция не повторяется.
+
+    Возвращает отчет: {'total_seconds', 'cold', 'kernels': [{'name', 'seconds', 'source'}]},
+    где source - 'compiled' (холодный старт), 'disk' (из кэша) или 'memory' (уже в процессе).
+    """
+    report = {'kernels': [], 'total_seconds': 0.0, 'cold': False}
+    start = time.perf_counter()
+    for name, kernel, signature in hot_kernels(backends, vision_mode):
+        overloads_before = len(kernel.overloads)
+        hits_before = sum(kernel.stats.cache_hits.values())
+        kernel_start = time.perf_counter()
+        kernel.compile(signature)
+        seconds = time.perf_counter() - kernel_start
+        if len(kernel.overloads) == overloads_before:
+            source = 'memory'
+        elif sum(kernel.stats.cache_hits.values()) > hits_before:
+            source = 'disk'
+        else:
+            source = 'compiled'
+            report['cold'] = True
+        report['kernels'].append({'name': name, 'seconds': seconds, 'source': source})
+    report['total_seconds'] = time.perf_counter() - start
+    return report
+
+
+def format_report(report: dict, verbose: bool = False) -> str:
+    compiled = sum(1 for kernel in report['kernels'] if kernel['source'] == 'compiled')
+    if report['cold']:
+        status = f"холодный старт, скомпилировано ядер: {compiled} из {len(report['kernels'])}"
+    else:
+        status = "теплый старт, ядра из кэша"
+    lines = [f"JIT прогрев: {report['total_seconds']:.2f} с ({status})"]
+    if verbose:
+        for kernel in report['kernels']:
+            lines.append(f"  {kernel['name']:<55s} {kernel['seconds']:7.3f} с  {kernel['source']}")
+    return "\n".join(lines)
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 """Performance monitoring utility for tracking simulation ticks."""
 
+import csv
 import time
 import sys
 from collections import deque
+import numpy as np
 from service.logger.logger import logme
 from service.debugger.debugger import debug
 
@@ -52,6 +54,157 @@ def get_full_size(obj, seen=None, exclude_attr_names=None):
 
     return size
 
+# Фазы тика в порядке выполнения. Первые - внутри World.update()/update_map(),
+# checkpoint, logging и render - в цикле приложения.
+PHASES = [
+    'perception',         # зрение (raycast)
+    'input_assembly',     # сборка входов сетей
+    'prepare_calc',       # подготовка весов сетей (prepare_calc бэкендов)
+    'inference',          # инференс сетей
+    'movement',           # применение выходов: поворот, скорость, перемещение
+    'bite',               # укусы
+    'zone_penalty',       # урон в зонах
+    'metabolism',         # траты энергии, здоровье, старение (CreaturePool.update)
+    'population_control', # смерти и рождения
+    'food',               # старение, удаление и добавление пищи
+    'update_map',         # инкрементальное обновление карты
+    'checkpoint',         # снимок мира для автосохранения (запись идет в фоне)
+    'logging',            # logme
+    'render',             # отрисовка и события окна
+]
+
+
+class TickProfiler:
+    """
+    Per-phase tick timings with rolling statistics.
+
+    World.update() calls begin_tick(); after each phase the code calls lap(phase),
+    which adds the time since the previous mark to that phase of the current tick;
+    end_tick() commits the tick into rolling windows of the last `window` ticks.
+    lap() outside an open tick is ignored, and a disabled profiler only costs
+    one attribute check per call.
+    """
+
+    def __init__(self, window: int = 300, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self.phase_times = {name: deque(maxlen=window) for name in PHASES}
+        self.tick_times = deque(maxlen=window)
+        self.tick_creatures = deque(maxlen=window)
+        self.ticks = 0
+        self._current = None # фазы открытого тика: имя -> секунды
+        self._tick_start = 0.0
+        self._last = 0.0
+        self._creatures = 0
+        self._csv_file = None
+        self._csv_writer = None
+        self._csv_every = 0
+
+    def begin_tick(self, creatures_count: int = 0) -> None:
+        if not self.enabled:
+            return
+        if self._current is not None:
+            self.end_tick()
+        self._current = {}
+        self._creatures = creatures_count
+        self._tick_start = self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        current = self._current
+        if current is None:
+            return
+        now = time.perf_counter()
+        current[phase] = current.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def end_tick(self) -> None:
+        current = self._current
+        if current is None:
+            return
+        self.tick_times.append(time.perf_counter() - self._tick_start)
+        self.tick_creatures.append(self._creatures)
+        for name in current:
+            if name not in self.phase_times:
+                # Новая фаза: прошлые тики считаем нулями, чтобы окна были одной длины
+                self.phase_times[name] = deque([0.0] * (len(self.tick_times) - 1), maxlen=self.window)
+        for name, times in self.phase_times.items():
+            times.append(current.get(name, 0.0))
+        self._current = None
+        self.ticks += 1
+        if self._csv_writer is not None and self.ticks % self._csv_every == 0:
+            self._write_csv_row()
+
+    def reset(self) -> None:
+        for times in self.phase_times.values():
+            times.clear()
+        self.tick_times.clear()
+        self.tick_creatures.clear()
+        self._current = None
+
+    def summary(self) -> dict:
+        """
+        Rolling statistics over the last `window` ticks:
+        {'ticks', 'ticks_per_sec', 'creature_ticks_per_sec',
+         'phases': {phase: {'mean_ms', 'p95_ms', 'share'}}}
+        """
+        total = sum(self.tick_times)
+        result = {
+            'ticks': len(self.tick_times),
+            'ticks_per_sec': len(self.tick_times) / total if total > 0 else 0.0,
+            'creature_ticks_per_sec': sum(self.tick_creatures) / total if total > 0 else 0.0,
+            'phases': {},
+        }
+        for name, times in self.phase_times.items():
+            if not times:
+                continue
+            values = np.fromiter(times, dtype=np.float64, count=len(times))
+            result['phases'][name] = {
+                'mean_ms': float(values.mean()) * 1000.0,
+                'p95_ms': float(np.percentile(values, 95)) * 1000.0,
+                'share': float(values.sum()) / total if total > 0 else 0.0,
+            }
+        return result
+
+    def format_table(self) -> list:
+        """Summary as text lines (console and on-screen sinks)."""
+        summary = self.summary()
+        lines = [
+            f"{summary['ticks_per_sec']:.1f} ticks/s, {summary['creature_ticks_per_sec']:.0f} creature*ticks/s "
+            f"(last {summary['ticks']} ticks)",
+            f"{'phase':<20s}{'mean ms':>9s}{'p95 ms':>9s}{'share':>7s}",
+        ]
+        for name, stats in summary['phases'].items():
+            lines.append(f"{name:<20s}{stats['mean_ms']:9.3f}{stats['p95_ms']:9.3f}{stats['share'] * 100:6.1f}%")
+        return lines
+
+    def open_csv(self, path: str, every: int = 100) -> None:
+        """CSV sink: every `every` ticks appends a row with the rolling statistics."""
+        self.close_csv()
+        self._csv_file = open(path, 'a', newline='')
+        self._csv_writer = csv.writer(self._csv_file)
+        self._csv_every = max(1, every)
+        if self._csv_file.tell() == 0:
+            header = ['ticks', 'ticks_per_sec', 'creature_ticks_per_sec']
+            for name in PHASES:
+                header += [f"{name}_mean_ms", f"{name}_p95_ms"]
+            self._csv_writer.writerow(header)
+
+    def close_csv(self) -> None:
+        if self._csv_file is not None:
+            self._csv_file.close()
+        self._csv_file = None
+        self._csv_writer = None
+
+    def _write_csv_row(self) -> None:
+        summary = self.summary()
+        row = [self.ticks, round(summary['ticks_per_sec'], 3), round(summary['creature_ticks_per_sec'], 1)]
+        for name in PHASES:
+            stats = summary['phases'].get(name, {'mean_ms': 0.0, 'p95_ms': 0.0})
+            row += [round(stats['mean_ms'], 4), round(stats['p95_ms'], 4)]
+        self._csv_writer.writerow(row)
+        self._csv_file.flush()
+
+
 class PerformanceMonitor:
     """Monitors simulation performance and prints tick count periodically."""
     
@@ -66,6 +219,10 @@ class PerformanceMonitor:
         self.interval = interval
         self.last_print_time = time.time()
         self.last60sec = deque(maxlen=12) # хранит время тиков за последние 60 секунд. 20 записей с интервалом в 5 секунд.
+        # Пофазные тайминги тика: приложение отдает профайлер миру (world.profiler)
+        self.profiler = TickProfiler()
+        self.print_phases = False # печатать таблицу фаз в консоль каждые interval секунд
+        self.show_on_screen = False # показывать таблицу фаз поверх карты
     
     def tick(self, tick_number: int) -> None:
         """
@@ -80,6 +237,9 @@ class PerformanceMonitor:
         if elapsed >= self.interval:
             self.last_print_time = current_time
             self.last60sec.append(tick_number)
+            if self.print_phases:
+                print(f"Tick: {tick_number}")
+                print("\n".join(self.profiler.format_table()))
             # print(f"Tick: {tick_number}. ticks in last 60 sec: {self.last60sec[-1] - self.last60sec[0] if len(self.last60sec) > 1 else 0}")
             # print("Memory usage:")
             # print(f"       Application: {get_full_size(self.app):,} bytes")
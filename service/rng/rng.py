@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Сервис случайных чисел: один зерно мира -> независимые потоки np.random.Generator по подсистемам.
+#
+# Каждая подсистема берет свой поток: rng.stream('mutation'), rng.stream('food') и т.д.
+# Поток подсистемы выводится из зерна мира и имени подсистемы (SeedSequence со spawn_key),
+# поэтому добавление вызовов в одной подсистеме не сдвигает последовательности в других,
+# а один и тот же seed дает одну и ту же траекторию мира бит в бит.
+# Потоки - обычные np.random.Generator: для векторного кода берем пачкой
+# (rng.stream('zone_penalty').random(len(slots))), а не по одному числу в цикле.
+#
+# Состояние всех потоков (get_state/set_state) пишется в сохранения - загруженный мир
+# продолжает ту же траекторию, что и мир, который сохраняли.
+
+import random
+import zlib
+import numpy as np
+
+
+class RngService:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            self._streams = {}
+            self.seed()
+            self._initialized = True
+
+    def seed(self, seed: int = None) -> int:
+        """
+        Задает зерно мира и сбрасывает все потоки. seed=None - случайное зерно из энтропии ОС,
+        оно запоминается (seed_value), чтобы прогон можно было повторить.
+        Глобальные random/np.random тоже засеваются - для кода вне потоков (эксперименты, скрипты).
+        """
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % (2 ** 63))
+        self.seed_value = int(seed)
+        self._streams.clear()
+        random.seed(self.seed_value)
+        np.random.seed(self.seed_value % (2 ** 32))
+        return self.seed_value
+
+    def _seed_sequence(self, name: str) -> np.random.SeedSequence:
+        # crc32 имени, а не hash(): hash строк меняется от запуска к запуску
+        return np.random.SeedSequence(self.seed_value, spawn_key=(zlib.crc32(name.encode('utf-8')),))
+
+    def stream(self, name: str) -> np.random.Generator:
+        """Поток подсистемы name. Ссылку на поток не кэшируйте между вызовами seed()/set_state()."""
+        generator = self._streams.get(name)
+        if generator is None:
+            generator = np.random.Generator(np.random.PCG64(self._seed_sequence(name)))
+            self._streams[name] = generator
+        return generator
+
+    def spawn(self, name: str, count: int) -> list:
+        """
+        count независимых генераторов для параллельных частей подсистемы name
+        (например, по одному на поток numba или на чанк существ). Зависят только от зерна,
+        имени и номера части - результат не зависит от порядка выполнения частей.
+        """
+        return [np.random.Generator(np.random.PCG64(child)) for child in self._seed_sequence(name).spawn(count)]
+
+    def get_state(self) -> dict:
+        """Зерно и состояние всех созданных потоков (JSON-совместимо) - для сохранений."""
+        return {
+            'seed': self.seed_value,
+            'streams': {name: generator.bit_generator.state for name, generator in self._streams.items()},
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Восстанавливает зерно и потоки из get_state(). Потоки, которых не было в сохранении, начинаются с начала."""
+        self.seed(state['seed'])
+        for name, bit_state in state.get('streams', {}).items():
+            self.stream(name).bit_generator.state = bit_state
+
+
+# Глобальный инстанс
+rng = RngService()
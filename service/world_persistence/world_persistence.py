@@ -1,22 +1,44 @@
 # -*- coding: utf-8 -*-
-"""World persistence service - сохранение и загрузка состояния мира через JSON.GZ"""
+"""World persistence service - сохранение и загрузка состояния мира (.world.npz, старые .world.gz)"""
 
 import json
 import gzip
+import os
 import re
-import random
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 import numpy as np
 from simparams import sp
+from food_store import FoodStore
+from zones_map import ZonesMap
+from nn.genome_bank import GenomeBank
+from service.rng.rng import rng
 from datetime import datetime
 
 
 class WorldPersistenceService:
-    """Singleton для сохранения/загрузки мира в JSON.GZ формате"""
+    """
+    Singleton для сохранения/загрузки мира.
+
+    Сохраняет в бинарный формат .world.npz: zip с JSON-заголовком и массивами numpy
+    (карты, колонки пула, сложенные тензоры весов). Старые сохранения .world.gz
+    (JSON со вложенными списками) по-прежнему читаются.
+    """
     
     _instance = None
     SAVES_DIR = Path("./saves")
+    SAVE_EXT = '.world.npz'
+    LEGACY_EXT = '.world.gz'
+    SAVE_EXTS = (SAVE_EXT, LEGACY_EXT)
+    FORMAT_NAME = 'nnevol-world'
+    SLOT_INDEX_NAME = '.slots_index.json'
+    SLOT_INDEX_VERSION = 1
+    FORMAT_VERSION = 1
+    DELTA_FORMAT_VERSION = 2 # дельта-сохранения (kind='delta'); полные остаются v1
     
     def __new__(cls):
         if cls._instance is None:
@@ -28,72 +50,161 @@ class WorldPersistenceService:
         if self._initialized:
             return
         self.SAVES_DIR.mkdir(exist_ok=True)
+        # Уровень сжатия zip (0 - без сжатия, 9 - максимальное). Основной объем - веса float32,
+        # deflate сжимает их лишь на ~10% ценой в 20 раз более долгого сохранения, поэтому по умолчанию 0
+        self.compress_level = 0
+        # Фоновые сохранения (save_world_async): рабочий поток создается при первом сохранении
+        self._executor = None
+        self._pending_stems = set()
+        # Имена пишущихся сохранений: рабочий поток убирает имя, пока основной подбирает новое
+        self._pending_lock = threading.Lock()
+        # Индекс слотов (см. get_save_slots): сохранения обновляют его из рабочего потока
+        self._slot_index_lock = threading.Lock()
         self._initialized = True
     
-    def save_world(self, world, filename: str) -> bool:
+    def save_world(self, world, filename: str, compress_level: int = None) -> bool:
         """
-        Сохраняет мир в JSON.GZ файл
+        Сохраняет мир в бинарный файл .world.npz (см. FORMAT_VERSION)
         
         Args:
             world: World объект
             filename: Имя файла (без расширения)
+            compress_level: Уровень сжатия 0-9 (0 - без сжатия); по умолчанию self.compress_level
             
         Returns:
             True если успешно, False если ошибка
         """
         try:
-            # Вычисляем метаинформацию
-            max_generation = max(
-                (c.generation for c in world.creatures),
-                default=0
-            )
-            created_at = datetime.now().isoformat()
-
             # Определяем итоговое имя файла (с encoded-суффиксом, без коллизий)
             stem = self._resolve_save_stem(filename, world)
-            save_path = self.SAVES_DIR / f"{stem}.world.gz"
-
-            # Подготавливаем данные о мире
-            world_data = {
-                'metadata': {
-                    'width': world.width,
-                    'height': world.height,
-                    'tick': world.tick,
-                    'creatures_count': len(world.creatures),
-                    'max_generation': int(max_generation),
-                    'created_at': created_at,
-                },
-                'walls_map': world.walls_map.tolist(),
-                'zones_map': world.zones_map.zones_map.tolist(),
-                'creatures': self._serialize_creatures(world.creatures),
-                'foods': self._serialize_foods(world.foods),
-                'simparams': self._serialize_simparams(),
-            }
-            
-            # Преобразуем в JSON и сжимаем
-            json_str = json.dumps(world_data, indent=2)
-            json_bytes = json_str.encode('utf-8')
-            compressed_data = gzip.compress(json_bytes, compresslevel=9)
-            
-            # Сохраняем в файл
-            with open(save_path, 'wb') as f:
-                f.write(compressed_data)
+            save_path = self.SAVES_DIR / f"{stem}{self.SAVE_EXT}"
+
+            snapshot = self.snapshot(world)
+            self._write_snapshot(save_path, snapshot, self.compress_level if compress_level is None else compress_level)
+            self._index_slot(save_path, snapshot['header'])
+            self._print_saved(save_path, snapshot)
+            return True
             
-            file_size_kb = save_path.stat().st_size / 1024
-            creatures_count = len(world.creatures)
-            foods_count = len(world.foods)
+        except Exception as e:
+            print(f"✗ Ошибка при сохранении мира: {e}")
+            return False
+
+    def save_world_async(self, world, filename: str, compress_level: int = None, parent: dict = None) -> Optional['SaveJob']:
+        """
+        Сохраняет мир в фоне: в вызывающем потоке снимается снимок мира (копии массивов),
+        кодирование, сжатие и атомарная запись файла идут в рабочем потоке.
+        Симуляцию можно продолжать сразу после возврата - файл будет содержать мир на момент вызова.
+        
+        Args:
+            world: World объект
+            filename: Имя файла (без расширения)
+            compress_level: Уровень сжатия 0-9; по умолчанию self.compress_level
+            parent: предыдущее сохранение - писать дельту относительно него (см. snapshot)
             
-            print(f"✓ Мир сохранен: {save_path}")
-            print(f"  Существ: {creatures_count}, Еды: {foods_count}, Размер: {file_size_kb:.1f} KB")
+        Returns:
+            SaveJob для опроса прогресса (status, progress), None если снимок снять не удалось
+        """
+        try:
+            stem = self._resolve_save_stem(filename, world)
+            save_path = self.SAVES_DIR / f"{stem}{self.SAVE_EXT}"
+            snapshot = self.snapshot(world, parent)
+        except Exception as e:
+            print(f"✗ Ошибка при сохранении мира: {e}")
+            return None
+
+        job = SaveJob(save_path, snapshot['header']['metadata']['tick'])
+        level = self.compress_level if compress_level is None else compress_level
+        # Имя занято до конца записи, чтобы следующее сохранение с тем же именем не выбрало тот же файл
+        with self._pending_lock:
+            self._pending_stems.add(stem)
+        if self._executor is None:
+            # Один рабочий поток: задания пишутся по очереди, при выходе из процесса запись дописывается
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='world-save')
+        job.future = self._executor.submit(self._run_save_job, job, snapshot, level, stem)
+        return job
+
+    def _run_save_job(self, job: 'SaveJob', snapshot: dict, compress_level: int, stem: str) -> bool:
+        start = time.perf_counter()
+        job.status = SaveJob.WRITING
+        try:
+            self._write_snapshot(job.path, snapshot, compress_level, progress=job._set_progress)
+            self._index_slot(job.path, snapshot['header'])
+            job.status = SaveJob.DONE
+            self._print_saved(job.path, snapshot)
             return True
-            
         except Exception as e:
+            job.error = str(e)
+            job.status = SaveJob.FAILED
             print(f"✗ Ошибка при сохранении мира: {e}")
             return False
+        finally:
+            job.seconds = time.perf_counter() - start
+            job.finished_at = time.monotonic()
+            with self._pending_lock:
+                self._pending_stems.discard(stem)
+
+    def compact_save(self, filename: str) -> bool:
+        """
+        Превращает дельта-сохранение в полное: цепочка родителей накладывается и результат
+        атомарно записывается на место дельты. После этого родители ей больше не нужны.
+        
+        Args:
+            filename: Имя файла (без расширения)
+            
+        Returns:
+            True если успешно (или сохранение уже полное), False если ошибка
+        """
+        try:
+            load_path = self._find_save_path(filename)
+            if load_path is None or not load_path.name.endswith(self.SAVE_EXT):
+                print(f"✗ Файл не найден: {self.SAVES_DIR / filename}{self.SAVE_EXT}")
+                return False
+            if self.read_header(load_path).get('kind', 'full') == 'full':
+                return True
+
+            raw = self._read_raw(load_path)
+            header = {key: value for key, value in raw['header'].items() if key not in ('parent', 'base', 'depth')}
+            header['kind'] = 'full'
+            header['version'] = self.FORMAT_VERSION
+            header['networks'] = [{key: value for key, value in entry.items() if key != 'partial'} for entry in header['networks']]
+            arrays = {'walls_map': raw['walls_map'], 'zones_map': raw['zones_map']}
+            arrays.update({f'creatures/{name}': column for name, column in raw['columns'].items()})
+            arrays['creatures/birth_ages'] = raw['birth_ages']
+            arrays['creatures/birth_ages_len'] = raw['birth_ages_len']
+            arrays['creatures/backend'] = raw['backend_index']
+            texts = {}
+            for entry, data in zip(header['networks'], raw['networks']):
+                if entry['tensors']:
+                    arrays.update({f"nn/{entry['backend']}/{name}": data[name] for name in entry['tensors']})
+                else:
+                    texts[f"nn/{entry['backend']}.json"] = data
+            arrays.update({f'foods/{name}': column for name, column in raw['foods'].items()})
+
+            self._write_snapshot(load_path, {'header': header, 'arrays': arrays, 'texts': texts}, self.compress_level)
+            self._index_slot(load_path, header)
+            print(f"✓ Сохранение уплотнено: {load_path}")
+            return True
+
+        except Exception as e:
+            print(f"✗ Ошибка при уплотнении сохранения: {e}")
+            return False
+
+    def wait_saves(self) -> None:
+        """Дождаться окончания всех фоновых сохранений."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @staticmethod
+    def _print_saved(save_path: Path, snapshot: dict) -> None:
+        metadata = snapshot['header']['metadata']
+        file_size_kb = save_path.stat().st_size / 1024
+        print(f"✓ Мир сохранен: {save_path}")
+        print(f"  Существ: {metadata['creatures_count']}, Еды: {len(snapshot['arrays']['foods/x'])}, Размер: {file_size_kb:.1f} KB")
     
     def load_world(self, world, filename: str) -> bool:
         """
-        Загружает состояние мира из JSON.GZ файла
+        Загружает состояние мира из файла сохранения (.world.npz или старого .world.gz)
         
         Args:
             world: World объект для применения загруженных данных
@@ -103,32 +214,26 @@ class WorldPersistenceService:
             True если успешно, False если ошибка
         """
         try:
-            load_path = self.SAVES_DIR / f"{filename}.world.gz"
+            load_path = self._find_save_path(filename)
             
-            if not load_path.exists():
-                print(f"✗ Файл не найден: {load_path}")
+            if load_path is None:
+                print(f"✗ Файл не найден: {self.SAVES_DIR / filename}{self.SAVE_EXT}")
                 return False
             
-            # Читаем и распаковываем файл
-            with open(load_path, 'rb') as f:
-                compressed_data = f.read()
-            
-            json_bytes = gzip.decompress(compressed_data)
-            json_str = json_bytes.decode('utf-8')
-            world_data = json.loads(json_str)
+            save = self._read_save(load_path)
             
             # Применяем загруженные данные в world
-            width = world_data['metadata']['width']
-            height = world_data['metadata']['height']
+            width = save['metadata']['width']
+            height = save['metadata']['height']
             world.width = width
             world.height = height
-            world.tick = world_data['metadata']['tick']
+            world.tick = save['metadata']['tick']
 
             # Пересоздаём карту под загруженный размер
             world.map = np.zeros((height, width), dtype='int')
 
             # Загружаем walls_map и проверяем shape
-            walls_map = np.array(world_data['walls_map'], dtype='int')
+            walls_map = save['walls_map']
             if walls_map.shape != (height, width):
                 raise ValueError(
                     f"walls_map shape {walls_map.shape} не соответствует размерам мира ({height}, {width})"
@@ -136,8 +241,12 @@ class WorldPersistenceService:
             world.walls_map = walls_map
 
             # Восстанавливаем zones_map и перестраиваем кэши зон
-            if 'zones_map' in world_data:
-                zones_arr = np.array(world_data['zones_map'], dtype='int')
+            zones_arr = save['zones_map']
+            if zones_arr is None:
+                # Старые сохранения без зон: зоны строятся по стенам, как у сгенерированного мира
+                world.zones_map = ZonesMap(width, height)
+                world.zones_map.generate_lefthalf_zone(walls_map)
+            else:
                 if zones_arr.shape != (height, width):
                     raise ValueError(
                         f"zones_map shape {zones_arr.shape} не соответствует размерам мира ({height}, {width})"
@@ -147,12 +256,16 @@ class WorldPersistenceService:
                 world.zones_map.zones_map = zones_arr
                 world.zones_map._build_pixel_caches()
 
-            world.creatures = self._deserialize_creatures(world_data['creatures'])
-            world.foods = self._deserialize_foods(world_data['foods'])
+            world.creatures = save['creatures']()
+            world.food_store = FoodStore.from_columns(width, height, save['foods'])
 
             # Восстанавливаем параметры симуляции (если они сохранены)
-            if 'simparams' in world_data:
-                self._restore_simparams(world_data['simparams'])
+            if save['simparams'] is not None:
+                self._restore_simparams(save['simparams'])
+
+            # Потоки случайных чисел - с того места, где их сохранили (в старых сохранениях их нет)
+            if save['rng'] is not None:
+                rng.set_state(save['rng'])
 
             # Пересчитываем карту после загрузки
             world.update_map()
@@ -182,23 +295,13 @@ class WorldPersistenceService:
         try:
             from creature import Creature
 
-            load_path = self.SAVES_DIR / f"{filename}.world.gz"
+            load_path = self._find_save_path(filename)
 
-            if not load_path.exists():
-                print(f"✗ Файл не найден: {load_path}")
+            if load_path is None:
+                print(f"✗ Файл не найден: {self.SAVES_DIR / filename}{self.SAVE_EXT}")
                 return False
 
-            with open(load_path, 'rb') as f:
-                compressed_data = f.read()
-
-            json_bytes = gzip.decompress(compressed_data)
-            json_str = json_bytes.decode('utf-8')
-            world_data = json.loads(json_str)
-
-            loaded_creatures = self._deserialize_creatures(
-                world_data.get('creatures', []),
-                update_id_counter=False,
-            )
+            loaded_creatures = self._read_save(load_path)['creatures'](update_id_counter=False)
 
             requested_count = len(loaded_creatures)
             existing_creature_positions = {
@@ -221,7 +324,7 @@ class WorldPersistenceService:
                         continue
                     free_cells.append((x, y))
 
-            random.shuffle(free_cells)
+            rng.stream('persistence').shuffle(free_cells)
 
             existing_max_id = max((c.id for c in world.creatures), default=0)
             next_id = max(existing_max_id, Creature._id_counter)
@@ -237,7 +340,7 @@ class WorldPersistenceService:
                 creature.id = next_id
                 creature.x = x
                 creature.y = y
-                world.creatures.append(creature)
+                world.add_creature(creature)
                 added_count += 1
 
             Creature._id_counter = max(Creature._id_counter, next_id)
@@ -254,51 +357,362 @@ class WorldPersistenceService:
         except Exception as e:
             print(f"✗ Ошибка при загрузке существ из мира: {e}")
             return False
-    
-    def _serialize_creatures(self, creatures) -> list:
-        """Конвертирует creatures в сохраняемый формат (list of dicts)"""
-        data = []
-        for creature in creatures:
-            creature_data = {
-                'id': int(creature.id),
-                'generation': int(creature.generation),
-                'x': float(creature.x),
-                'y': float(creature.y),
-                'energy': float(creature.energy),
-                'health': float(creature.health),
-                'age': int(creature.age),
-                'speed': int(creature.speed),
-                'angle': float(creature.angle),
-                'bite_effort': float(creature.bite_effort),
-                'vision_distance': int(creature.vision_distance),
-                'bite_range': float(creature.bite_range),
-                'birth_ages': [int(age) for age in creature.birth_ages],
-                'input_hurting': float(creature.input_hurting),
-                'input_starving': float(creature.input_starving),
-                'input_wayblocked': float(creature.input_wayblocked),
-                'input_bite_success': float(creature.input_bite_success),
-                'nn': self._serialize_nn(creature.nn),
-            }
-            data.append(creature_data)
-        return data
-    
-    def _serialize_nn(self, nn) -> dict:
-        """Конвертирует NeuralNetwork в сохраняемый формат"""
-        return nn.serialize()
-    
-    def _serialize_foods(self, foods) -> list:
-        """Конвертирует foods в сохраняемый формат"""
-        data = []
-        for food in foods:
-            food_data = {
-                'x': int(food.x),
-                'y': int(food.y),
-                'nutrition': float(food.nutrition),
-                'food_age': int(food.food_age),
+
+    # ============================================================================
+    # BINARY FORMAT (.world.npz)
+    # ============================================================================
+    #
+    # zip-контейнер: header.json + массивы .npy (np.load(path) тоже его откроет)
+    #   header.json              версия формата, metadata, simparams, rng, список бэкендов сетей
+    #   walls_map.npy            int8 (height, width)
+    #   zones_map.npy            int8 (height, width)
+    #   creatures/<поле>.npy     колонки CreaturePool в порядке существ (POOL_COLUMNS)
+    #   creatures/birth_ages.npy      возрасты размножения всех существ подряд
+    #   creatures/birth_ages_len.npy  сколько возрастов у каждого существа
+    #   creatures/backend.npy    номер бэкенда сети существа в header['networks']
+    #   nn/<бэкенд>/<тензор>.npy сложенные веса и состояния (GENOME + STATE) существ бэкенда
+    #   nn/<бэкенд>.json         serialize() сетей бэкенда без GENOME (банка весов)
+    #   foods/<поле>.npy         колонки FoodStore (FOOD_COLUMNS)
+    #
+    # Дельта (kind='delta', версия DELTA_FORMAT_VERSION) - то же без карт; в header parent (stem
+    # предыдущего сохранения), base (полное сохранение цепочки) и depth. Отличия:
+    #   creatures/dead_ids.npy   id существ родителя, умерших с тех пор
+    #   nn/<бэкенд>/new_ids.npy  id существ, чьи веса (GENOME, header['networks'][i]['partial']) лежат в дельте;
+    #                            веса остальных - у родителя. STATE - целиком, как в полном сохранении
+
+    def snapshot(self, world, parent: dict = None) -> dict:
+        """
+        Согласованный снимок мира для записи: заголовок и копии всех массивов сохранения.
+        Снимок не ссылается на живые массивы мира - его можно писать в другом потоке,
+        пока симуляция идет дальше.
+
+        С parent снимок - дельта относительно предыдущего сохранения: веса (GENOME) только
+        у существ, которых не было в parent, без карт. Скалярное состояние, состояния сетей (STATE)
+        и пища пишутся целиком - за тик они меняются почти у всех.
+
+        Args:
+            world: World объект
+            parent: {'stem': stem сохранения-родителя, 'ids': id существ в нем, 'base': stem полного сохранения цепочки, 'depth': номер дельты в цепочке родителя (0 - полное)}
+        
+        Returns:
+            {'header': dict, 'arrays': {имя: ndarray}, 'texts': {имя: JSON-совместимые данные}}
+        """
+        from creature_pool import POOL_COLUMNS
+        from food_store import FOOD_COLUMNS
+
+        pool = world.pool
+        slots = pool.slots()
+        creatures = world.creatures
+        max_generation = int(pool.generation[slots].max()) if len(slots) else 0
+
+        # Сети по бэкендам: индексы существ каждого класса сети в порядке существ
+        groups = {}
+        for index, creature in enumerate(creatures):
+            groups.setdefault(type(creature.nn), []).append(index)
+        backend_index = np.zeros(len(creatures), dtype=np.int16)
+        networks = []
+        for number, (network_class, indices) in enumerate(groups.items()):
+            backend_index[indices] = number
+            networks.append({
+                'backend': network_class.__type__,
+                'count': len(indices),
+                'tensors': list(getattr(network_class, 'GENOME', None) or {}) + list(getattr(network_class, 'STATE', None) or {}),
+            })
+
+        header = {
+            'format': self.FORMAT_NAME,
+            'version': self.FORMAT_VERSION if parent is None else self.DELTA_FORMAT_VERSION,
+            'kind': 'full' if parent is None else 'delta',
+            'metadata': {
+                'width': world.width,
+                'height': world.height,
+                'tick': world.tick,
+                'creatures_count': len(creatures),
+                'max_generation': max_generation,
+                'created_at': datetime.now().isoformat(),
+                'seed': rng.seed_value,
+            },
+            'simparams': self._serialize_simparams(),
+            # Зерно и состояние потоков rng: загруженный мир продолжит ту же траекторию
+            'rng': rng.get_state(),
+            'networks': networks,
+        }
+
+        # Индексация по slots/rows и astype возвращают копии; срезы - нет, их копируем явно
+        arrays = {}
+        if parent is None:
+            # Стены и зоны не меняются по ходу симуляции - в дельты не пишутся
+            arrays['walls_map'] = world.walls_map.astype(np.int8)
+            arrays['zones_map'] = world.zones_map.zones_map.astype(np.int8)
+        for name in POOL_COLUMNS:
+            arrays[f'creatures/{name}'] = pool.columns[name][slots]
+        ids = arrays['creatures/id']
+        is_new = np.ones(len(ids), dtype=bool)
+        if parent is not None:
+            header['parent'] = parent['stem']
+            header['base'] = parent['base']
+            header['depth'] = parent['depth'] + 1
+            is_new = ~np.isin(ids, parent['ids'])
+            arrays['creatures/dead_ids'] = np.setdiff1d(parent['ids'], ids)
+        birth_ages = [creature.birth_ages for creature in creatures]
+        arrays['creatures/birth_ages'] = np.array([age for ages in birth_ages for age in ages], dtype=np.int32)
+        arrays['creatures/birth_ages_len'] = np.array([len(ages) for ages in birth_ages], dtype=np.int32)
+        arrays['creatures/backend'] = backend_index
+
+        texts = {}
+        for number, (network_class, indices) in enumerate(groups.items()):
+            backend = network_class.__type__
+            group = [creatures[i] for i in indices]
+            tensors = list(getattr(network_class, 'GENOME', None) or {}) + list(getattr(network_class, 'STATE', None) or {})
+            if not tensors:
+                texts[f'nn/{backend}.json'] = [creature.nn.serialize() for creature in group]
+                continue
+            # Веса существ не меняются после рождения: в дельту - только веса новых существ
+            genome = set(getattr(network_class, 'GENOME', None) or {})
+            shapes = {**(getattr(network_class, 'GENOME', None) or {}), **(getattr(network_class, 'STATE', None) or {})}
+            take = np.arange(len(group))
+            if parent is not None:
+                take = np.flatnonzero(is_new[indices])
+                arrays[f'nn/{backend}/new_ids'] = ids[indices][take]
+                networks[number]['partial'] = sorted(genome)
+            # Живые сети лежат в GenomeBank - берем строки банка одним срезом
+            bank, rows = GenomeBank.rows_of(group)
+            for name in tensors:
+                pick = take if name in genome else np.arange(len(group))
+                if bank is not None:
+                    stacked = bank.arrays[name][rows[pick]]
+                elif len(pick):
+                    stacked = np.stack([getattr(group[i].nn, name) for i in pick]).astype(np.float32)
+                else:
+                    stacked = np.zeros((0,) + tuple(shapes[name]), dtype=np.float32)
+                arrays[f'nn/{backend}/{name}'] = stacked
+
+        store = world.food_store
+        for name in FOOD_COLUMNS:
+            arrays[f'foods/{name}'] = store.columns[name][:store.count].copy()
+
+        return {'header': header, 'arrays': arrays, 'texts': texts}
+
+    def _write_snapshot(self, save_path: Path, snapshot: dict, compress_level: int, progress=None) -> None:
+        """
+        Пишет снимок в zip-контейнер save_path. Пишется во временный файл рядом,
+        который затем атомарно подменяет save_path - прерванная запись не оставляет битого сохранения.
+        progress(доля) вызывается после каждого массива.
+        """
+        if compress_level > 0:
+            compression, level = zipfile.ZIP_DEFLATED, min(compress_level, 9)
+        else:
+            compression, level = zipfile.ZIP_STORED, None
+        arrays = snapshot['arrays']
+        total_bytes = max(sum(array.nbytes for array in arrays.values()), 1)
+        written_bytes = 0
+        tmp_path = save_path.with_name(f"{save_path.name}.tmp")
+        try:
+            with zipfile.ZipFile(tmp_path, 'w', compression=compression, compresslevel=level) as archive:
+                archive.writestr('header.json', json.dumps(snapshot['header'], indent=2))
+                for name, array in arrays.items():
+                    self._write_array(archive, name, array)
+                    written_bytes += array.nbytes
+                    if progress is not None:
+                        progress(written_bytes / total_bytes)
+                for name, data in snapshot['texts'].items():
+                    archive.writestr(name, json.dumps(data))
+            os.replace(tmp_path, save_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        if progress is not None:
+            progress(1.0)
+
+    @staticmethod
+    def _write_array(archive, name: str, array: np.ndarray) -> None:
+        with archive.open(f'{name}.npy', 'w', force_zip64=True) as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+    @staticmethod
+    def _read_array(archive, name: str) -> np.ndarray:
+        with archive.open(f'{name}.npy') as f:
+            return np.lib.format.read_array(f, allow_pickle=False)
+
+    def _read_save(self, load_path: Path) -> dict:
+        """
+        Читает сохранение любого формата в общий вид:
+        metadata, walls_map, zones_map (или None), foods (колонки FOOD_COLUMNS),
+        simparams и rng (или None), creatures - функция (update_id_counter=True) -> список Creature.
+        """
+        if load_path.name.endswith(self.LEGACY_EXT):
+            return self._read_legacy_save(load_path)
+
+        raw = self._read_raw(load_path)
+        header = raw['header']
+        save = {
+            'metadata': header['metadata'],
+            'walls_map': raw['walls_map'].astype('int'),
+            'zones_map': raw['zones_map'].astype('int'),
+            'foods': raw['foods'],
+            'simparams': header.get('simparams'),
+            'rng': header.get('rng'),
+        }
+
+        def creatures(update_id_counter: bool = True) -> list:
+            return self._creatures_from_columns(raw['columns'], raw['birth_ages'], raw['birth_ages_len'], raw['backend_index'],
+                                                header['networks'], raw['networks'], update_id_counter)
+        save['creatures'] = creatures
+        return save
+
+    def read_header(self, load_path: Path) -> dict:
+        """Только header.json бинарного сохранения (без чтения массивов)."""
+        with zipfile.ZipFile(load_path, 'r') as archive:
+            return json.loads(archive.read('header.json'))
+
+    def _read_raw(self, load_path: Path) -> dict:
+        """
+        Массивы бинарного сохранения как есть: header, columns, birth_ages, birth_ages_len,
+        backend_index, networks, walls_map, zones_map, foods. Дельта читается вместе со всей
+        цепочкой родителей и накладывается на них - результат такой же, как у полного сохранения.
+        """
+        from creature_pool import POOL_COLUMNS
+        from food_store import FOOD_COLUMNS
+
+        with zipfile.ZipFile(load_path, 'r') as archive:
+            header = json.loads(archive.read('header.json'))
+            if header.get('format') != self.FORMAT_NAME or header.get('version', 0) > self.DELTA_FORMAT_VERSION:
+                raise ValueError(f"Неподдерживаемый формат сохранения: {header.get('format')} v{header.get('version')}")
+            names = set(archive.namelist())
+            raw = {
+                'header': header,
+                'columns': {
+                    name: self._read_array(archive, f'creatures/{name}')
+                    for name in POOL_COLUMNS if f'creatures/{name}.npy' in names
+                },
+                'birth_ages': self._read_array(archive, 'creatures/birth_ages'),
+                'birth_ages_len': self._read_array(archive, 'creatures/birth_ages_len'),
+                'backend_index': self._read_array(archive, 'creatures/backend'),
+                'networks': [],
+                'foods': {name: self._read_array(archive, f'foods/{name}') for name in FOOD_COLUMNS},
             }
-            data.append(food_data)
-        return data
-    
+            for entry in header['networks']:
+                backend = entry['backend']
+                if entry['tensors']:
+                    data = {name: self._read_array(archive, f'nn/{backend}/{name}') for name in entry['tensors']}
+                    if entry.get('partial'):
+                        data['new_ids'] = self._read_array(archive, f'nn/{backend}/new_ids')
+                    raw['networks'].append(data)
+                else:
+                    raw['networks'].append(json.loads(archive.read(f'nn/{backend}.json')))
+            if header.get('kind', 'full') == 'full':
+                raw['walls_map'] = self._read_array(archive, 'walls_map')
+                raw['zones_map'] = self._read_array(archive, 'zones_map')
+                return raw
+
+        parent_path = self._find_save_path(header['parent'])
+        if parent_path is None or not parent_path.name.endswith(self.SAVE_EXT):
+            raise FileNotFoundError(f"Нет сохранения-родителя дельты {load_path.name}: {header['parent']}")
+        return self._apply_delta(self._read_raw(parent_path), raw)
+
+    @staticmethod
+    def _apply_delta(parent: dict, delta: dict) -> dict:
+        """Накладывает дельту на массивы родителя: веса старых существ берутся у родителя по id."""
+        parent_entries = parent['header']['networks']
+        parent_ids = parent['columns']['id']
+        ids = delta['columns']['id']
+        for number, entry in enumerate(delta['header']['networks']):
+            if not entry.get('partial'):
+                continue
+            data = delta['networks'][number]
+            new_ids = data.pop('new_ids')
+            group_ids = ids[delta['backend_index'] == number]
+            is_new = np.isin(group_ids, new_ids)
+            old_ids = group_ids[~is_new]
+
+            # Строки старых существ в тензорах того же бэкенда у родителя
+            parent_number = next((i for i, e in enumerate(parent_entries) if e['backend'] == entry['backend']), None)
+            if parent_number is None:
+                if len(old_ids):
+                    raise ValueError(f"В родителе дельты нет сетей {entry['backend']}")
+                continue
+            group_parent_ids = parent_ids[parent['backend_index'] == parent_number]
+            found = np.zeros(0, dtype=np.int64)
+            if len(old_ids):
+                order = np.argsort(group_parent_ids)
+                positions = np.searchsorted(group_parent_ids, old_ids, sorter=order)
+                found = order[np.minimum(positions, len(order) - 1)] if len(order) else found
+                if len(found) != len(old_ids) or not np.array_equal(group_parent_ids[found], old_ids):
+                    raise ValueError(f"Цепочка сохранений повреждена: у родителя нет весов существ {entry['backend']}")
+
+            for name in entry['partial']:
+                new_rows = data[name]
+                full = np.empty((len(group_ids),) + new_rows.shape[1:], dtype=new_rows.dtype)
+                full[is_new] = new_rows
+                full[~is_new] = parent['networks'][parent_number][name][found]
+                data[name] = full
+
+        delta['walls_map'] = parent['walls_map']
+        delta['zones_map'] = parent['zones_map']
+        return delta
+
+    def _creatures_from_columns(self, columns, birth_ages, birth_ages_len, backend_index,
+                                network_entries, networks, update_id_counter: bool) -> list:
+        """Существа из колонок бинарного сохранения: веса сетей - строки сложенных тензоров, без разбора поэлементно."""
+        from creature import Creature
+        from nn import get_backend
+
+        count = len(backend_index)
+        # Сети: строка j тензоров бэкенда - j-е существо этого бэкенда в порядке существ
+        nets = [None] * count
+        for number, (entry, data) in enumerate(zip(network_entries, networks)):
+            network_class = get_backend(entry['backend'])
+            for j, index in enumerate(np.flatnonzero(backend_index == number)):
+                network = network_class.blank()
+                if entry['tensors']:
+                    for name, stacked in data.items():
+                        setattr(network, name, stacked[j])
+                else:
+                    network.deserialize(data[j])
+                nets[index] = network
+
+        values = {name: column.tolist() for name, column in columns.items()}
+        ages = birth_ages.tolist()
+        offsets = np.concatenate(([0], np.cumsum(birth_ages_len))).tolist()
+        creatures = []
+        for i in range(count):
+            creature = Creature(values['x'][i], values['y'][i], nn=nets[i])
+            for name, column in values.items():
+                setattr(creature, name, column[i])
+            creature.birth_ages = ages[offsets[i]:offsets[i + 1]]
+            creatures.append(creature)
+
+        # Обновляем счётчик ID для новых существ (только для полного восстановления мира)
+        if creatures and update_id_counter:
+            Creature._id_counter = max(c.id for c in creatures)
+        return creatures
+
+    # ============================================================================
+    # LEGACY FORMAT (.world.gz, JSON)
+    # ============================================================================
+
+    def _read_legacy_save(self, load_path: Path) -> dict:
+        """Старое сохранение: JSON.GZ со вложенными списками."""
+        from food_store import FOOD_COLUMNS
+
+        with open(load_path, 'rb') as f:
+            world_data = json.loads(gzip.decompress(f.read()).decode('utf-8'))
+
+        food_list = world_data['foods']
+        return {
+            'metadata': world_data['metadata'],
+            'walls_map': np.array(world_data['walls_map'], dtype='int'),
+            'zones_map': np.array(world_data['zones_map'], dtype='int') if 'zones_map' in world_data else None,
+            'foods': {
+                # В самых старых сохранениях у пищи нет food_age
+                name: np.array([food.get(name, 0) for food in food_list], dtype=dtype)
+                for name, dtype in FOOD_COLUMNS.items()
+            },
+            'simparams': world_data.get('simparams'),
+            'rng': world_data.get('rng'),
+            'creatures': lambda update_id_counter=True: self._deserialize_creatures(world_data.get('creatures', []), update_id_counter),
+        }
+
     def _serialize_simparams(self) -> dict:
         """Сохраняет текущие параметры симуляции для справки"""
         params = {}
@@ -349,18 +763,17 @@ class WorldPersistenceService:
     def _deserialize_creatures(self, creature_data_list, update_id_counter: bool = True) -> list:
         """Восстанавливает creatures из сохранённых данных"""
         from creature import Creature
-        from nn import NeuralNetwork
         
         creatures = []
         for creature_data in creature_data_list:
-            # Создаём базовое существо
-            creature = Creature(creature_data['x'], creature_data['y'])
+            # Создаём базовое существо сразу с восстановленной нейросетью
+            creature = Creature(creature_data['x'], creature_data['y'], nn=self._deserialize_nn(creature_data['nn']))
             
-            # Восстанавливаем все атрибуты
+            # Восстанавливаем все атрибуты (полей здоровья и сигналов в самых старых сохранениях нет)
             creature.id = creature_data['id']
             creature.generation = creature_data['generation']
             creature.energy = creature_data['energy']
-            creature.health = creature_data['health']
+            creature.health = creature_data.get('health', 1.0)
             creature.age = creature_data['age']
             creature.speed = creature_data['speed']
             creature.angle = creature_data['angle']
@@ -368,13 +781,10 @@ class WorldPersistenceService:
             creature.vision_distance = creature_data['vision_distance']
             creature.bite_range = creature_data['bite_range']
             creature.birth_ages = creature_data['birth_ages']
-            creature.input_hurting = creature_data['input_hurting']
-            creature.input_starving = creature_data['input_starving']
-            creature.input_wayblocked = creature_data['input_wayblocked']
-            creature.input_bite_success = creature_data['input_bite_success']
-            
-            # Восстанавливаем веса нейросети
-            creature.nn = self._deserialize_nn(creature_data['nn'])
+            creature.input_hurting = creature_data.get('input_hurting', 0.0)
+            creature.input_starving = creature_data.get('input_starving', 0.0)
+            creature.input_wayblocked = creature_data.get('input_wayblocked', 0.0)
+            creature.input_bite_success = creature_data.get('input_bite_success', 0.0)
             
             creatures.append(creature)
         
@@ -386,31 +796,13 @@ class WorldPersistenceService:
     
     def _deserialize_nn(self, nn_data):
         """Восстанавливает NeuralNetwork из сохранённых данных"""
-        from nn import NeuralNetwork, NN_BACKEND
-        saved_type = nn_data.get('__type__')
-        if saved_type is not None and saved_type != NN_BACKEND:
-            raise ValueError(
-                f"Несовместимый тип нейросети: сохранялка создана с '{saved_type}', "
-                f"а сейчас активен '{NN_BACKEND}'. "
-                f"Измени NN_BACKEND в nn/__init__.py на '{saved_type}' и перезапусти."
-            )
-        nn = NeuralNetwork()
+        from nn import get_backend, get_default_backend
+        # Бэкенд берется из сохранения (старые сохранения без типа - бэкенд по умолчанию)
+        network_class = get_backend(nn_data.get('__type__') or get_default_backend())
+        nn = network_class.blank() # без случайной инициализации - веса сразу перезапишутся
         nn.deserialize(nn_data)
         return nn
     
-    def _deserialize_foods(self, food_data_list) -> list:
-        """Восстанавливает foods из сохранённых данных"""
-        from food import Food
-        
-        foods = []
-        for food_data in food_data_list:
-            food = Food(food_data['x'], food_data['y'])
-            food.nutrition = food_data['nutrition']
-            food.food_age = food_data['food_age']
-            foods.append(food)
-        
-        return foods
-
     # ============================================================================
     # FILENAME ENCODING HELPERS
     # ============================================================================
@@ -424,18 +816,41 @@ class WorldPersistenceService:
     def _resolve_save_stem(self, base: str, world) -> str:
         """
         Возвращает stem без расширения, не конфликтующий с существующими файлами.
-        Если 'base__*.world.gz' уже существует, пробует 'base01__...', 'base02__...' и т.д.
+        Если 'base__*' (любого формата) уже существует, пробует 'base01__...', 'base02__...' и т.д.
         """
         stem = self._build_encoded_stem(base, world)
-        if not list(self.SAVES_DIR.glob(f"{base}__*.world.gz")):
+        if not self._base_exists(base):
             return stem
         for i in range(1, 100):
             candidate_base = f"{base}{i:02d}"
-            if not list(self.SAVES_DIR.glob(f"{candidate_base}__*.world.gz")):
+            if not self._base_exists(candidate_base):
                 return self._build_encoded_stem(candidate_base, world)
         # крайний случай — перезаписываем base99
         return self._build_encoded_stem(f"{base}99", world)
 
+    def _base_exists(self, base: str) -> bool:
+        with self._pending_lock:
+            pending = any(stem.startswith(f"{base}__") for stem in self._pending_stems)
+        if pending:
+            return True
+        return any(any(self.SAVES_DIR.glob(f"{base}__*{ext}")) for ext in self.SAVE_EXTS)
+
+    def _find_save_path(self, filename: str) -> Optional[Path]:
+        """Путь к сохранению по stem: сначала .world.npz, затем старый .world.gz. None - файла нет."""
+        for ext in self.SAVE_EXTS:
+            path = self.SAVES_DIR / f"{filename}{ext}"
+            if path.exists():
+                return path
+        return None
+
+    @classmethod
+    def _split_save_name(cls, name: str):
+        """'foo__c1_g2_3x4.world.npz' -> ('foo__c1_g2_3x4', '.world.npz'); не сохранение - (None, None)."""
+        for ext in cls.SAVE_EXTS:
+            if name.endswith(ext):
+                return name[:-len(ext)], ext
+        return None, None
+
     @staticmethod
     def _parse_filename_metadata(stem: str):
         """
@@ -458,18 +873,25 @@ class WorldPersistenceService:
         """
         Получить список слотов сохранения из папки ./saves.
 
-        Метаданные читаются ТОЛЬКО из имени файла и stat() файловой системы —
-        без распаковки архивов.
+        Метаданные берутся из индекса слотов - файла SLOT_INDEX_NAME рядом с сохранениями.
+        Запись индекса действительна, пока у файла те же mtime и размер; иначе (и для новых
+        файлов) метаданные читаются заново: у .world.npz - только header.json, старый .world.gz
+        распаковывается один раз. Сохранения сами обновляют индекс, так что обычно
+        список собирается без открытия архивов - сотни чекпоинтов листаются сразу.
 
         Returns:
             Список dict:
             [{
                 'filename': 'foo__c450_g125_512x256',  # полный stem для load_world()
                 'name':     'foo',                      # чистое имя для отображения
+                'format':   'npz',                      # 'npz' или 'legacy' (.world.gz)
+                'kind':     'full',                     # 'full' или 'delta' (дельта-чекпоинт)
                 'modified_at': '2026-04-09 14:30',
                 'creatures_count': 450,   # int или None
                 'max_generation':  125,   # int или None
                 'map_size': '512x256',    # str или 'N/A'
+                'tick': 120000,           # int или None
+                'backend': 'ff',          # бэкенды сетей через '+', или None
                 'file_size_kb': 45.3,
             }, ...]
         """
@@ -478,29 +900,157 @@ class WorldPersistenceService:
         if not self.SAVES_DIR.exists():
             return slots
 
-        try:
-            for file_path in sorted(self.SAVES_DIR.glob('*.world.gz')):
-                stem = file_path.name[:-9]  # убираем '.world.gz'
-                display_name, creatures_count, max_gen, map_w, map_h = \
-                    self._parse_filename_metadata(stem)
-
-                stat = file_path.stat()
-                modified_at = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
-                map_size = f"{map_w}x{map_h}" if map_w is not None else 'N/A'
-
-                slots.append({
-                    'filename': stem,
-                    'name': display_name,
-                    'modified_at': modified_at,
-                    'creatures_count': creatures_count,
-                    'max_generation': max_gen,
-                    'map_size': map_size,
-                    'file_size_kb': round(stat.st_size / 1024, 1),
-                })
-        except Exception as e:
-            print(f"✗ Ошибка при сканировании папки сохранений: {e}")
+        with self._slot_index_lock:
+            index = self._load_slot_index()
+            entries = index['slots']
+            changed = False
+            seen = set()
+            try:
+                for file_path in sorted(self.SAVES_DIR.iterdir()):
+                    stem, ext = self._split_save_name(file_path.name)
+                    if stem is None:
+                        continue
+                    seen.add(file_path.name)
+                    stat = file_path.stat()
+                    entry = entries.get(file_path.name)
+                    if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                        try:
+                            entry = self._slot_entry(file_path, stem, ext, stat)
+                        except Exception as e:
+                            print(f"✗ Не удалось прочитать сохранение {file_path.name}: {e}")
+                            entry = self._slot_entry(file_path, stem, ext, stat, header={})
+                        entries[file_path.name] = entry
+                        changed = True
+                    slots.append({key: value for key, value in entry.items() if key not in ('mtime_ns', 'size')})
+            except Exception as e:
+                print(f"✗ Ошибка при сканировании папки сохранений: {e}")
+
+            # Удаленные файлы (ротация чекпоинтов, ручное удаление) - из индекса
+            for name in set(entries) - seen:
+                del entries[name]
+                changed = True
+            if changed:
+                self._store_slot_index(index)
 
         return slots
-        
+
+    # ============================================================================
+    # ИНДЕКС СЛОТОВ
+    # ============================================================================
+
+    def _slot_index_path(self) -> Path:
+        return self.SAVES_DIR / self.SLOT_INDEX_NAME
+
+    def _load_slot_index(self) -> dict:
+        """Индекс слотов с диска; битый или другой версии - пустой (пересоберется)."""
+        try:
+            index = json.loads(self._slot_index_path().read_text(encoding='utf-8'))
+            if index.get('version') == self.SLOT_INDEX_VERSION and isinstance(index.get('slots'), dict):
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'version': self.SLOT_INDEX_VERSION, 'slots': {}}
+
+    def _store_slot_index(self, index: dict) -> None:
+        """Атомарная запись индекса: временный файл + os.replace."""
+        path = self._slot_index_path()
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(index, indent=1), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"✗ Не удалось записать индекс слотов: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _index_slot(self, save_path: Path, header: dict) -> None:
+        """Обновить запись индекса сразу после записи сохранения - без повторного чтения файла."""
+        stem, ext = self._split_save_name(save_path.name)
+        with self._slot_index_lock:
+            index = self._load_slot_index()
+            index['slots'][save_path.name] = self._slot_entry(save_path, stem, ext, save_path.stat(), header=header)
+            self._store_slot_index(index)
+
+    def _slot_entry(self, file_path: Path, stem: str, ext: str, stat, header: dict = None) -> dict:
+        """
+        Запись индекса для файла сохранения. header - заголовок бинарного сохранения;
+        без него заголовок читается из файла (у старого .world.gz - распаковкой всего файла).
+        """
+        if header is None:
+            header = self.read_header(file_path) if ext == self.SAVE_EXT else self._read_legacy_header(file_path)
+        display_name, creatures_count, max_gen, map_w, map_h = self._parse_filename_metadata(stem)
+        metadata = header.get('metadata', {})
+        width = metadata.get('width', map_w)
+        height = metadata.get('height', map_h)
+        backends = [entry['backend'] for entry in header.get('networks', [])]
+        return {
+            'filename': stem,
+            'name': display_name,
+            'format': 'npz' if ext == self.SAVE_EXT else 'legacy',
+            'kind': header.get('kind', 'full'),
+            'modified_at': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M'),
+            'creatures_count': metadata.get('creatures_count', creatures_count),
+            'max_generation': metadata.get('max_generation', max_gen),
+            'map_size': f"{width}x{height}" if width is not None else 'N/A',
+            'tick': metadata.get('tick'),
+            'backend': '+'.join(backends) if backends else None,
+            'file_size_kb': round(stat.st_size / 1024, 1),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+        }
+
+    def _read_legacy_header(self, load_path: Path) -> dict:
+        """Заголовок в виде бинарного для старого .world.gz: metadata и бэкенды сетей."""
+        with open(load_path, 'rb') as f:
+            world_data = json.loads(gzip.decompress(f.read()).decode('utf-8'))
+        from nn import get_default_backend
+        backends = dict.fromkeys(
+            creature.get('nn', {}).get('__type__') or get_default_backend()
+            for creature in world_data.get('creatures', [])
+        )
+        return {'metadata': world_data.get('metadata', {}), 'networks': [{'backend': name} for name in backends]}
+
+class SaveJob:
+    """
+    Фоновое сохранение мира (см. WorldPersistenceService.save_world_async).
+    Поля пишет рабочий поток, читать их можно из любого потока (GUI опрашивает каждый кадр).
+    """
+
+    PENDING = 'pending'
+    WRITING = 'writing'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, path: Path, tick: int):
+        self.path = path
+        self.tick = tick          # тик мира в снимке
+        self.status = self.PENDING
+        self.progress = 0.0       # доля записанных байт массивов, 0..1
+        self.error = None
+        self.seconds = None       # время записи в рабочем потоке
+        self.finished_at = None   # time.monotonic() окончания записи
+        self.future = None
+
+    def _set_progress(self, value: float) -> None:
+        self.progress = value
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Дождаться окончания записи. True - файл записан."""
+        if self.future is not None:
+            self.future.result(timeout)
+        return self.status == self.DONE
+
+    def describe(self) -> str:
+        """Строка статуса для GUI."""
+        if self.status == self.FAILED:
+            return f"SAVE FAILED: {self.error}"
+        if self.status == self.DONE:
+            return f"SAVED {self.path.name} ({self.seconds:.2f} s)"
+        return f"SAVING {self.path.name} {self.progress * 100:3.0f}%"
+
+
 # Singleton instance
 world_persistence = WorldPersistenceService()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Тест фонового сохранения: снимок мира не зависит от дальнейших тиков, запись атомарная, прогресс доходит до 1"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import contextlib
+import io
+import tempfile
+from pathlib import Path
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from service.rng.rng import rng
+from service.world_persistence.world_persistence import world_persistence, SaveJob
+from world_generator import WorldGenerator
+
+
+def world_state(world) -> np.ndarray:
+    pool = world.pool
+    slots = pool.slots()
+    return np.column_stack((pool.x[slots], pool.y[slots], pool.angle[slots], pool.energy[slots]))
+
+
+def make_world(seed: int):
+    rng.seed(seed)
+    return WorldGenerator.generate_world(width=80, height=60, wall_count=60, food_count=1500, creatures_count=80, border_walls=True)
+
+
+def run_ticks(world, ticks: int):
+    for _ in range(ticks):
+        world.update()
+        world.update_map()
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    world_persistence.SAVES_DIR = Path(tmp)
+    try:
+        # -------------------------------------------------------------------
+        print("1. Снимок не ссылается на живые массивы мира...")
+        world = make_world(5)
+        run_ticks(world, 5)
+        snapshot = world_persistence.snapshot(world)
+        frozen = {name: array.copy() for name, array in snapshot['arrays'].items()}
+        run_ticks(world, 10)
+        changed = [name for name, array in snapshot['arrays'].items() if not np.array_equal(array, frozen[name])]
+        check(not changed, "тики после снимка не меняют его массивы", f"изменились: {changed}")
+
+        # -------------------------------------------------------------------
+        print("2. Фоновое сохранение, пока мир продолжает тикать...")
+        expected = world_state(world)
+        expected_tick = world.tick
+        with contextlib.redirect_stdout(io.StringIO()):
+            job = world_persistence.save_world_async(world, 'async')
+            run_ticks(world, 10) # мир меняется во время записи
+            ok = job.wait(timeout=60)
+        check(ok and job.status == SaveJob.DONE, f"запись завершена за {job.seconds:.3f} с", f"статус {job.status}: {job.error}")
+        check(job.progress == 1.0, "прогресс дошел до 1", f"прогресс {job.progress}")
+        check(job.tick == expected_tick, "в задании тик снимка", f"{job.tick} != {expected_tick}")
+        check(job.describe().startswith('SAVED'), f"статус для GUI: {job.describe()}", job.describe())
+
+        loaded = make_world(6)
+        with contextlib.redirect_stdout(io.StringIO()):
+            check(world_persistence.load_world(loaded, job.path.name[:-len(world_persistence.SAVE_EXT)]), "файл загружается", "файл не загрузился")
+        check(loaded.tick == expected_tick, "загружен тик момента вызова", f"{loaded.tick} != {expected_tick}")
+        check(np.array_equal(world_state(loaded), expected), "в файле мир на момент вызова", "в файл попало состояние после вызова")
+
+        # -------------------------------------------------------------------
+        print("3. Атомарная запись и имена...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            jobs = [world_persistence.save_world_async(world, 'twice') for _ in range(2)]
+            world_persistence.wait_saves()
+        check(jobs[0].path != jobs[1].path, "два сохранения подряд не делят один файл", f"оба в {jobs[0].path.name}")
+        check(not list(Path(tmp).glob('*.tmp')), "временных файлов не осталось", "остались *.tmp")
+        names = {slot['filename'] for slot in world_persistence.get_save_slots()}
+        check({job.path.name[:-len(world_persistence.SAVE_EXT)] for job in jobs} <= names, "сохранения видны в списке слотов", f"слоты: {names}")
+
+        # -------------------------------------------------------------------
+        print("4. Ошибка записи попадает в задание...")
+        world_persistence.SAVES_DIR = Path(tmp) / 'missing'
+        with contextlib.redirect_stdout(io.StringIO()):
+            job = world_persistence.save_world_async(world, 'broken')
+            ok = job.wait(timeout=60)
+        check(not ok and job.status == SaveJob.FAILED and job.error, f"статус failed: {job.error}", f"статус {job.status}")
+        check(not job.path.exists(), "битый файл не создан", "файл создан")
+    finally:
+        world_persistence.wait_saves()
+        del world_persistence.SAVES_DIR
+
+print()
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
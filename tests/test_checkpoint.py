@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Тест автосохранения: расписание по тикам и времени, ротация, продолжение прогона, дельта-чекпоинты"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import contextlib
+import io
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from service.rng.rng import rng
+from service.world_persistence.world_persistence import world_persistence
+from service.checkpoint.checkpoint import CheckpointScheduler
+from world_generator import WorldGenerator
+from nn.genome_bank import GenomeBank
+from headless_application import HeadlessApplication
+
+ARGS = ['--headless', '--width', '80', '--height', '60', '--walls', '20',
+        '--creatures', '60', '--seed', '11', '--stats-every', '0']
+
+
+def world_state(world) -> np.ndarray:
+    pool = world.pool
+    slots = pool.slots()
+    return np.column_stack((pool.x[slots], pool.y[slots], pool.angle[slots], pool.energy[slots]))
+
+
+def genomes(world) -> dict:
+    bank, rows = GenomeBank.rows_of(world.creatures)
+    return {name: array[rows] for name, array in bank.arrays.items()}
+
+
+def run_headless(extra_args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = HeadlessApplication(ARGS + extra_args)
+        app.run()
+    return app
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    world_persistence.SAVES_DIR = Path(tmp)
+    try:
+        # -------------------------------------------------------------------
+        print("1. Чекпоинты по тикам и ротация...")
+        rng.seed(3)
+        world = WorldGenerator.generate_world(width=80, height=60, wall_count=20, food_count=500, creatures_count=40, border_walls=True)
+        scheduler = CheckpointScheduler('rot', every_ticks=5, keep_last=2, keep_every=3, max_overhead=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(40):
+                world.update()
+                world.update_map()
+                job = scheduler.maybe_checkpoint(world)
+                if job is not None:
+                    job.wait()
+            scheduler.close()
+        checkpoints = CheckpointScheduler.list_checkpoints('rot')
+        check([number for number, _, _ in checkpoints] == [3, 6, 7, 8], "остались 2 последних и каждый 3-й", str([c[0] for c in checkpoints]))
+        check([tick for _, tick, _ in checkpoints] == [15, 30, 35, 40], "чекпоинты каждые 5 тиков", str([c[1] for c in checkpoints]))
+        check(not list(Path(tmp).glob('*.tmp')), "временных файлов нет", "остались *.tmp")
+        check(CheckpointScheduler('rot')._next_number == 9, "нумерация продолжается после существующих", "нумерация сбилась")
+
+        # -------------------------------------------------------------------
+        print("2. Чекпоинты по времени и ограничение доли снимков...")
+        scheduler = CheckpointScheduler('clock', every_seconds=0.05, keep_last=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            early = scheduler.maybe_checkpoint(world)
+            time.sleep(0.06)
+            job = scheduler.maybe_checkpoint(world)
+            written = job is not None and job.wait()
+            scheduler.last_snapshot_seconds = 1.0 # снимок "стоил" секунду - при max_overhead 1% следующий не раньше чем через 100 с
+            time.sleep(0.06)
+            throttled = scheduler.maybe_checkpoint(world)
+        check(early is None, "срок не подошел - снимка нет", "снимок раньше срока")
+        check(written, "через every_seconds - чекпоинт", "чекпоинт по времени не сделан")
+        check(throttled is None, "доля времени на снимки ограничена", "снимок сверх max_overhead")
+
+        # -------------------------------------------------------------------
+        print("3. Продолжение прогона с последнего чекпоинта...")
+        straight = run_headless(['--ticks', '60'])
+        run_headless(['--ticks', '40', '--checkpoint-every', '20', '--checkpoint-name', 'run'])
+        check(CheckpointScheduler.latest('run').startswith('run_000002_t40__'), f"последний чекпоинт: {CheckpointScheduler.latest('run')}", "нет чекпоинта на тике 40")
+        resumed = run_headless(['--ticks', '20', '--checkpoint-every', '20', '--checkpoint-name', 'run', '--resume', '--seed', '99'])
+        check(resumed.world.tick == 60, "продолжено с тика 40 до 60", f"тик {resumed.world.tick}")
+        check(np.array_equal(world_state(resumed.world), world_state(straight.world)), "продолженный прогон совпадает с непрерывным", "траектория после продолжения разошлась")
+        check(CheckpointScheduler.latest('run').startswith('run_000003_t60__'), "новый чекпоинт продолжает нумерацию", CheckpointScheduler.latest('run'))
+
+        # -------------------------------------------------------------------
+        print("4. Дельта-чекпоинты...")
+        rng.seed(4)
+        world = WorldGenerator.generate_world(width=80, height=60, wall_count=20, food_count=1500, creatures_count=60, border_walls=True)
+        scheduler = CheckpointScheduler('delta', every_ticks=10, keep_last=1, delta=True, full_every=3, max_overhead=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(50):
+                if world.tick == 42:
+                    for creature in world.creatures[:5]: # рождения до последней дельты
+                        creature.birth_ages = [int(creature.age) + 1]
+                world.update()
+                world.update_map()
+                job = scheduler.maybe_checkpoint(world)
+                if job is not None:
+                    job.wait()
+            scheduler.close()
+        kinds = {number: world_persistence.read_header(path)['kind'] for number, _, path in CheckpointScheduler.list_checkpoints('delta')}
+        # 1 full, 2-3 delta, 4 full, 5 delta; хранится последний (5) и его родитель (4)
+        check(kinds == {4: 'full', 5: 'delta'}, "ротация оставила последнюю дельту и ее полного родителя", str(kinds))
+        sizes = {number: path.stat().st_size for number, _, path in CheckpointScheduler.list_checkpoints('delta')}
+        check(sizes[5] < sizes[4] / 3, f"дельта {sizes[5] // 1024} KB против полного {sizes[4] // 1024} KB", f"дельта не меньше полного: {sizes}")
+
+        stem = CheckpointScheduler.latest('delta')
+        delta_path = world_persistence._find_save_path(stem)
+        backend = world_persistence.read_header(delta_path)['networks'][0]['backend']
+        with zipfile.ZipFile(delta_path) as archive:
+            new_ids = world_persistence._read_array(archive, f'nn/{backend}/new_ids')
+        check(0 < len(new_ids) < len(world.creatures), f"в дельте веса {len(new_ids)} новорожденных из {len(world.creatures)}", f"новорожденных в дельте: {len(new_ids)}")
+        loaded = WorldGenerator.generate_world(width=80, height=60, wall_count=20, food_count=100, creatures_count=5, border_walls=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = world_persistence.load_world(loaded, stem)
+        check(ok, "дельта загружается поверх родителя", "дельта не загрузилась")
+        check(np.array_equal(world_state(loaded), world_state(world)), "состояние существ восстановлено", "состояние разошлось")
+        expected_genomes, loaded_genomes = genomes(world), genomes(loaded)
+        check(all(np.array_equal(expected_genomes[name], loaded_genomes[name]) for name in expected_genomes), "веса восстановлены бит в бит", "веса разошлись")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            compacted = world_persistence.compact_save(stem)
+        for number, _, path in CheckpointScheduler.list_checkpoints('delta')[:-1]:
+            path.unlink()
+        check(compacted and world_persistence.read_header(world_persistence._find_save_path(stem))['kind'] == 'full', "compact_save сделал дельту полной", "дельта не уплотнена")
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = world_persistence.load_world(loaded, stem)
+        check(ok, "уплотненное сохранение загружается без родителей", "не загрузилось без родителей")
+        check(all(np.array_equal(expected_genomes[name], genomes(loaded)[name]) for name in expected_genomes), "веса после уплотнения те же", "веса после уплотнения разошлись")
+    finally:
+        world_persistence.wait_saves()
+        del world_persistence.SAVES_DIR
+
+print()
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
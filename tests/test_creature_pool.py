@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Тест CreaturePool: слоты, free-list, представления Creature и колонки World"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from creature import Creature
+from creature_pool import CreaturePool
+from world_generator import WorldGenerator
+
+# ---------------------------------------------------------------------------
+print("1. Существо вне пула хранит поля локально...")
+cr = Creature(3.5, 4.5)
+check(cr.slot == -1, "slot == -1", f"slot={cr.slot}")
+cr.energy = 0.25
+check(cr.energy == 0.25 and cr.x == 3.5, "поля читаются/пишутся", "поля не работают")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Добавление в пул превращает существо в представление слота...")
+pool = CreaturePool(capacity=2)
+slot = pool.add(cr)
+check(cr.slot == slot, f"slot={slot}", "slot не назначен")
+check(abs(pool.energy[slot] - 0.25) < 1e-6, "energy перенесена в колонку", "energy не перенесена")
+pool.x[slot] = 7.0
+check(cr.x == 7.0, "запись в колонку видна через существо", "представление не видит колонку")
+cr.health = 0.5
+check(abs(pool.health[slot] - 0.5) < 1e-6, "запись через существо попадает в колонку", "колонка не обновилась")
+print()
+
+# ---------------------------------------------------------------------------
+print("3. Рост емкости и переиспользование слотов...")
+others = [Creature(1, 1) for _ in range(3)]
+for c in others:
+    pool.add(c)
+check(pool.capacity >= 4, f"capacity={pool.capacity}", "пул не вырос")
+check(len(pool) == 4, "4 существа в пуле", f"len={len(pool)}")
+check(cr.x == 7.0, "данные сохранились после роста", "данные потеряны при росте")
+
+freed = others[0].slot
+pool.release(freed)
+check(others[0].slot == -1, "освобожденное существо отвязано", "существо осталось привязано")
+check(others[0].x == 1.0, "поля мертвого существа читаемы", "поля мертвого существа потеряны")
+newcomer = Creature(2, 2)
+check(pool.add(newcomer) == freed, "новое существо занимает освобожденный слот", "слот не переиспользован")
+check(list(pool.slots()) == sorted(c.slot for c in pool.creatures()), "slots() и creatures() согласованы", "кэш рассинхронизирован")
+print()
+
+# ---------------------------------------------------------------------------
+print("4. World.creatures поверх пула...")
+world = WorldGenerator.generate_world(
+    width=40, height=30,
+    wall_count=20, food_count=30, creatures_count=25,
+    border_walls=True,
+)
+check(len(world.creatures) == 25, "25 существ", f"{len(world.creatures)} существ")
+target = world.creatures[5]
+check(world.get_creature_by_id(target.id) is target, "get_creature_by_id работает", "get_creature_by_id не нашел существо")
+
+for _ in range(5):
+    world.update()
+    world.update_map()
+
+slots = world.pool.slots()
+check(np.all(world.pool.age[slots] == 5), "возраст вырос на 5 у всех", "возраст не совпадает")
+for c in world.creatures:
+    if world.map[int(c.y), int(c.x)] != 3:
+        print(f"   ✗ Существо {c.id} не отмечено на карте")
+        sys.exit(1)
+print("   ✓ Все существа отмечены на карте\n")
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Тест FoodStore: колонки пищи, индекс клеток, уплотнение, старение"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+def grid_consistent(store) -> bool:
+    n = store.count
+    if np.count_nonzero(store.grid >= 0) != n:
+        return False
+    return bool(np.all(store.grid[store.y[:n], store.x[:n]] == np.arange(n)))
+
+
+from food import Food
+from food_store import FoodStore
+from simparams import sp
+from world_generator import WorldGenerator
+
+# ---------------------------------------------------------------------------
+print("1. Добавление пищи и занятые клетки...")
+store = FoodStore(10, 8, capacity=2)
+check(store.add(1, 2, 0.5), "пища добавлена", "пища не добавлена")
+check(not store.add(1, 2, 0.5), "занятая клетка отвергнута", "в клетку положили вторую пищу")
+for x in range(2, 7):
+    store.add(x, 3, 0.5)
+check(len(store) == 6 and store.capacity >= 6, f"count={len(store)}, capacity={store.capacity}", "рост емкости не сработал")
+check(store.index_at(4, 3) == 3, "индекс клетки указывает на строку", "индекс клетки неверен")
+check(store.index_at(0, 0) == -1, "пустая клетка -> -1", "пустая клетка занята")
+check(grid_consistent(store), "индекс клеток согласован с колонками", "индекс рассинхронизирован")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Представления Food...")
+food = store[3]
+check(food.x == 4 and food.y == 3, "представление читает колонки", "представление читает не ту строку")
+food.decrement()
+check(abs(store.nutrition[3] - (0.5 - sp.food_energy_chunk)) < 1e-6, "decrement пишет в колонку", "decrement не дошел до колонки")
+check(store.add_food(Food(9, 7)), "add_food принимает Food", "add_food не сработал")
+print()
+
+# ---------------------------------------------------------------------------
+print("3. Удаление съеденной пищи и уплотнение...")
+store.nutrition[0] = -0.1
+store.nutrition[4] = -0.1
+count_before = len(store)
+store.proceed(tick=1)
+check(len(store) == count_before - 2, "съеденная пища удалена", f"count={len(store)}")
+check(store.index_at(1, 2) == -1 and store.index_at(5, 3) == -1, "клетки съеденной пищи освобождены", "клетки не освобождены")
+check(grid_consistent(store), "индекс клеток согласован после уплотнения", "индекс рассинхронизирован")
+print()
+
+# ---------------------------------------------------------------------------
+print("4. Старение и удаление от старости...")
+store.food_age[:store.count] = 0
+store.food_age[0] = sp.food_max_age
+ages_before = store.food_age[:store.count].copy()
+store.proceed(tick=3)
+check(np.array_equal(store.food_age[:store.count], ages_before), "вне кратного 10 тика пища не стареет", "пища постарела не вовремя")
+count_before = len(store)
+store.proceed(tick=10)
+check(len(store) == count_before - 1, "старая пища удалена", f"count={len(store)}")
+check(np.all(store.food_age[:store.count] == 10), "остальная пища постарела на 10", "возраст пищи неверен")
+check(grid_consistent(store), "индекс клеток согласован", "индекс рассинхронизирован")
+print()
+
+# ---------------------------------------------------------------------------
+print("5. Изменение емкости пищи одной операцией...")
+store.fill_nutrition(0.75)
+check(np.all(store.nutrition[:store.count] == np.float32(0.75)), "nutrition заполнена", "nutrition не заполнена")
+print()
+
+# ---------------------------------------------------------------------------
+print("6. World поверх FoodStore...")
+world = WorldGenerator.generate_world(
+    width=40, height=30,
+    wall_count=20, food_count=60, creatures_count=25,
+    border_walls=True,
+)
+for _ in range(20):
+    world.update()
+    world.update_map()
+check(grid_consistent(world.food_store), "индекс пищи мира согласован", "индекс пищи мира рассинхронизирован")
+check(np.all(world.map[world.food_grid >= 0] != 1), "пища не лежит в стенах", "пища в стене")
+food = world.foods[0]
+check(world.bitten_food(food.x, food.y).x == food.x, "bitten_food находит пищу по клетке", "bitten_food не нашел пищу")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Тест GenomeBank: веса сетей живых существ лежат в банке по слотам пула; потомки копируют веса строкой банка"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from creature import Creature
+from creature_pool import CreaturePool
+from nn import NeuralNetwork
+
+# ---------------------------------------------------------------------------
+print("1. Добавление в пул переносит веса в банк...")
+pool = CreaturePool(capacity=2)
+cr = Creature(1, 1)
+w1_before = cr.nn.w1.copy()
+slot = pool.add(cr)
+bank = pool.genome_banks[type(cr.nn)]
+check(bank.w1.dtype == np.float32, "банк хранит float32", f"dtype={bank.w1.dtype}")
+check(np.array_equal(bank.w1[slot], w1_before), "веса скопированы в строку слота", "веса не скопированы")
+cr.nn.w1[0, 0] += 1.0
+check(bank.w1[slot, 0, 0] == cr.nn.w1[0, 0], "изменения сети видны в банке", "сеть не является представлением банка")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. prepare_calc отдает тензоры банка без копирования...")
+others = [Creature(2, 2) for _ in range(3)] # пул вырастет, банк вместе с ним
+for c in others:
+    pool.add(c)
+bank = pool.genome_banks[type(cr.nn)]
+check(bank.capacity == pool.capacity, f"емкость банка {bank.capacity} = емкости пула", "банк не вырос вместе с пулом")
+check(np.shares_memory(cr.nn.w1, bank.w1), "после роста сеть смотрит в новый банк", "сеть осталась на старом массиве")
+creatures = pool.creatures()
+creatures_nns = NeuralNetwork.prepare_calc(creatures)
+check(creatures_nns[1] is bank.w1, "w1 - это тензор банка", "prepare_calc скопировал веса")
+check(list(creatures_nns[0]) == [c.slot for c in creatures], "rows = слоты существ", "rows неверны")
+print()
+
+# ---------------------------------------------------------------------------
+print("3. Инференс по банку совпадает с инференсом по копиям...")
+all_inputs = np.random.rand(len(creatures), 50)
+from_bank = NeuralNetwork.make_all_decisions(all_inputs, creatures, creatures_nns)
+
+
+class FakeCr:
+    def __init__(self, nn):
+        self.nn = nn
+
+
+fakes = [FakeCr(NeuralNetwork.copy(c.nn)) for c in creatures]
+from_copies = NeuralNetwork.make_all_decisions(all_inputs, fakes, NeuralNetwork.prepare_calc(fakes))
+check(np.array_equal(from_bank, from_copies), "выходы совпадают", "выходы различаются")
+print()
+
+# ---------------------------------------------------------------------------
+print("4. Смерть освобождает строку, сеть сохраняет свои веса...")
+dead = others[0]
+dead_w1 = dead.nn.w1.copy()
+dead_slot = dead.slot
+pool.release(dead_slot)
+check(dead.nn._bank is None and not np.shares_memory(dead.nn.w1, bank.w1), "сеть отвязана от банка", "сеть осталась в банке")
+check(not bank.bound[dead_slot] and bank.bound[pool.slots()].all(), "маска занятых строк совпадает со слотами пула", "маска занятых строк разошлась")
+check(np.array_equal(dead.nn.w1, dead_w1), "веса мертвого существа сохранены", "веса потеряны")
+newborn = Creature(3, 3)
+check(pool.add(newborn) == dead_slot, "новорожденный занял строку", "строка не переиспользована")
+check(np.array_equal(dead.nn.w1, dead_w1), "веса мертвого не затерты новорожденным", "веса мертвого затерты")
+replacement = NeuralNetwork()
+newborn.nn = replacement
+check(replacement._row == dead_slot and np.shares_memory(replacement.w1, bank.w1), "замена сети живого существа перепривязывает банк", "новая сеть не в банке")
+print()
+
+# ---------------------------------------------------------------------------
+print("5. Копии сетей и потомки в пуле...")
+parent = NeuralNetwork()
+child = NeuralNetwork.copy(parent)
+check(np.array_equal(child.w1, parent.w1) and not np.shares_memory(child.w1, parent.w1), "копия получает свои веса", "копия делит веса с оригиналом")
+parent_w1 = parent.w1.copy()
+child.mutate(1.0, 0.5)
+check(np.array_equal(parent.w1, parent_w1), "мутация копии не трогает оригинал", "мутация испортила оригинал")
+
+# Копия сети живого существа, которое потом умирает и отдает строку банка
+alive = pool.creatures()[0]
+orphan = NeuralNetwork.copy(alive.nn)
+check(not np.shares_memory(orphan.w1, bank.w1), "копия сети из банка получает свои веса", "копия смотрит в строку банка")
+orphan_w1 = orphan.w1.copy()
+released_slot = alive.slot
+pool.release(released_slot)
+pool.add(Creature(4, 4))
+check(np.array_equal(orphan.w1, orphan_w1), "веса копии не затерты новым владельцем строки", "веса копии затерты")
+
+# Потомок существа из пула: пустая сеть, веса копируются строкой банка
+mother = pool.creatures()[0]
+kid = mother.reprodCreature(mutate=False)[0]
+check(not hasattr(kid.nn, 'w1'), "потомок живого существа создается без весов", "потомку скопированы веса вне банка")
+pool.add(kid, genome_from=mother.slot)
+check(kid.nn._row == kid.slot and all(np.array_equal(bank.arrays[name][kid.slot], bank.arrays[name][mother.slot]) for name in NeuralNetwork.GENOME),
+      "веса потомка - копия строки родителя", "веса потомка не совпадают с родителем")
+check(not np.shares_memory(kid.nn.w1, mother.nn.w1) and np.shares_memory(kid.nn.w1, bank.w1), "потомок владеет своей строкой", "потомок делит строку родителя")
+print()
+
+# ---------------------------------------------------------------------------
+print("6. Пакетная мутация новорожденных (ff и rnn)...")
+from nn.rnn import NeuralNetwork as RnnNetwork
+
+rng = np.random.default_rng(42)
+for network_class in (NeuralNetwork, RnnNetwork):
+    batch_pool = CreaturePool(capacity=8)
+    batch = [Creature(1, 1, nn=network_class()) for _ in range(6)]
+    for c in batch:
+        batch_pool.add(c)
+    batch_bank = batch_pool.genome_banks[network_class]
+    before = {name: array.copy() for name, array in batch_bank.arrays.items()}
+    newborn_slots = [batch[1].slot, batch[4].slot]
+    batch_pool.mutate_genomes(newborn_slots, 0.1, 0.5, rng)
+
+    changed = total = 0
+    untouched = True
+    for name, array in batch_bank.arrays.items():
+        diff = array != before[name]
+        changed += np.count_nonzero(diff[newborn_slots])
+        total += diff[newborn_slots].size
+        others_mask = np.ones(len(array), dtype=bool)
+        others_mask[newborn_slots] = False
+        untouched &= not diff[others_mask].any()
+        if np.abs(array - before[name]).max() > 0.5 + 1e-6:
+            untouched = False
+    rate = changed / total
+    check(untouched, f"{network_class.__module__}: мутированы только строки новорожденных, сила в пределах", "мутация задела чужие строки или превысила силу")
+    check(0.08 < rate < 0.12, f"{network_class.__module__}: доля мутировавших весов {rate:.3f}", f"доля мутаций {rate:.3f} далека от 0.1")
+    check(np.shares_memory(batch[1].nn.w3, batch_bank.w3), "сеть видит мутировавшие веса банка", "сеть отвязана от банка")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
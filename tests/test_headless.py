@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Тест запуска без окна: цикл тиков, статистика, воспроизводимость по зерну, без pygame"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import tempfile
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from headless_application import HeadlessApplication, STATS_COLUMNS
+
+ARGS = ['--headless', '--ticks', '40', '--width', '80', '--height', '60', '--walls', '20',
+        '--creatures', '60', '--seed', '11', '--stats-every', '20']
+
+
+def run(extra_args=()):
+    app = HeadlessApplication(ARGS + list(extra_args))
+    app.run()
+    pool = app.world.pool
+    slots = pool.slots()
+    return app, np.column_stack((pool.x[slots], pool.y[slots], pool.energy[slots]))
+
+
+# ---------------------------------------------------------------------------
+print("1. Прогон без окна...")
+with tempfile.TemporaryDirectory() as tmp:
+    stats_path = os.path.join(tmp, 'stats.csv')
+    app, state1 = run(['--stats-csv', stats_path])
+    with open(stats_path, newline='') as f:
+        rows = list(csv.reader(f))
+check(app.world.tick == 40, "40 тиков посчитано", f"тиков: {app.world.tick}")
+check('pygame' not in sys.modules, "pygame не импортирован", "pygame импортирован")
+check(rows[0] == STATS_COLUMNS and [row[0] for row in rows[1:]] == ['20', '40'],
+      "статистика записана в CSV каждые 20 тиков", f"строки CSV: {rows}")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Одинаковое зерно - одинаковый прогон...")
+_, state2 = run()
+check(state1.shape == state2.shape and np.array_equal(state1, state2),
+      "позиции и энергия существ совпадают", "прогоны с одним зерном разошлись")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Тест прогрева numba-ядер: явные сигнатуры совпадают с типами, которые приходят из World.update()"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from service.jit_warmup.jit_warmup import hot_kernels, warmup, format_report
+from world_generator import WorldGenerator
+
+
+# ---------------------------------------------------------------------------
+print("1. Прогрев...")
+report = warmup(['ff', 'rnn'])
+print("   " + format_report(report).replace("\n", "\n   "))
+check(len(report['kernels']) == 4, "4 горячих ядра (зрение, движение, ff, rnn)", f"ядер: {len(report['kernels'])}")
+check(all(kernel['source'] in ('compiled', 'disk', 'memory') for kernel in report['kernels']),
+      "у каждого ядра известен источник", "неизвестный источник ядра")
+check(not warmup(['ff', 'rnn'])['cold'], "повторный прогрев ничего не компилирует", "повторный прогрев компилирует")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Тики мира не компилируют новых специализаций...")
+np.random.seed(1)
+world = WorldGenerator.generate_world(width=40, height=30, wall_count=20, food_count=30, creatures_count=20,
+                                      border_walls=True, backend_groups={'ff': 1, 'rnn': 1})
+kernels = hot_kernels(['ff', 'rnn'])
+before = [len(kernel.signatures) for _, kernel, _ in kernels]
+for _ in range(5):
+    world.update()
+after = [len(kernel.signatures) for _, kernel, _ in kernels]
+check(before == after, "типы аргументов совпадают с явными сигнатурами", f"новые специализации: {before} -> {after}")
+
+# Штраф за столкновение, исправленный в GUI целым числом, и карта другого dtype (из сохранения)
+from simparams import sp
+saved_penalty = sp.energy_loss_collision
+sp.energy_loss_collision = 1
+world.walls_map = world.walls_map.astype(np.int32)
+try:
+    for _ in range(3):
+        world.update()
+finally:
+    sp.energy_loss_collision = saved_penalty
+after = [len(kernel.signatures) for _, kernel, _ in kernels]
+check(before == after, "аргументы других типов приводятся к сигнатурам", f"новые специализации: {before} -> {after}")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Тест параллельного инференса ff-сетей: выходы совпадают с последовательным режимом"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from nn.my_handmade_ff import NeuralNetwork, INPUT_SIZE, OUTPUT_SIZE
+from nn import threads
+
+
+class FakeCr:
+    def __init__(self):
+        self.nn = NeuralNetwork()
+
+
+np.random.seed(7)
+creatures = [FakeCr() for _ in range(300)]
+creatures_nns = NeuralNetwork.prepare_calc(creatures)
+all_inputs = np.random.rand(len(creatures), INPUT_SIZE).astype(np.float32)
+
+# ---------------------------------------------------------------------------
+print("1. Параллельный и последовательный режимы...")
+NeuralNetwork.parallel = False
+serial = NeuralNetwork.make_all_decisions(all_inputs, creatures, creatures_nns)
+NeuralNetwork.parallel = True
+parallel = NeuralNetwork.make_all_decisions(all_inputs, creatures, creatures_nns)
+check(serial.shape == (len(creatures), OUTPUT_SIZE), f"shape={serial.shape}", f"shape неверен: {serial.shape}")
+check(np.array_equal(serial, parallel), "выходы совпадают побитово", "выходы различаются")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Число потоков...")
+check(threads.set_threads(1) == 1, "1 поток", "не удалось установить 1 поток")
+one_thread = NeuralNetwork.make_all_decisions(all_inputs, creatures, creatures_nns)
+check(np.array_equal(one_thread, serial), "выходы с 1 потоком совпадают", "выходы с 1 потоком различаются")
+check(threads.set_threads(10_000) == threads.max_threads(), "лишние потоки ограничены максимумом", "ограничение не сработало")
+check(threads.set_threads(None) == threads.max_threads(), "None - все ядра", "None не выбрал все ядра")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
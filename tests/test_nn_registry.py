@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Тест реестра бэкендов нейросетей: выбор на запуск, группы существ, загрузка чужого бэкенда"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+import nn
+from creature import Creature
+from world_generator import WorldGenerator
+from service.world_persistence.world_persistence import world_persistence
+
+
+# ---------------------------------------------------------------------------
+print("1. Реестр...")
+ff_class = nn.get_backend('ff')
+rnn_class = nn.get_backend('rnn')
+check(ff_class.__type__ == 'ff' and rnn_class.__type__ == 'rnn', "классы найдены по __type__", "неверный класс бэкенда")
+check(nn.get_backend() is ff_class and nn.NeuralNetwork is ff_class, "по умолчанию - ff", "неверный бэкенд по умолчанию")
+try:
+    nn.get_backend('no_such_backend')
+    check(False, "", "неизвестный бэкенд не вызвал ошибку")
+except ValueError:
+    check(True, "неизвестный бэкенд - ValueError", "")
+nn.set_default_backend('rnn')
+creature = Creature(1, 1)
+child = creature.reprodCreature(mutate=False)[0]
+nn.set_default_backend('ff')
+check(nn.backend_of(creature.nn) == 'rnn', "новое существо получает бэкенд по умолчанию", "бэкенд по умолчанию не применился")
+check(nn.backend_of(child.nn) == 'rnn' and nn.backend_of(Creature(1, 1).nn) == 'ff',
+      "потомок наследует бэкенд родителя", "потомок сменил бэкенд")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Мир с группами существ разных бэкендов...")
+np.random.seed(7)
+world = WorldGenerator.generate_world(width=40, height=30, wall_count=20, food_count=30, creatures_count=21,
+                                      border_walls=True, backend_groups={'ff': 2, 'rnn': 1})
+backends = [nn.backend_of(cr.nn) for cr in world.creatures]
+check(backends.count('ff') == 14 and backends.count('rnn') == 7, "группы 14 ff + 7 rnn", f"группы: {backends}")
+
+all_inputs = np.random.rand(len(world.creatures), 50).astype(np.float32)
+rnn_bank = world.pool.genome_banks[rnn_class]
+saved_h1, saved_h2 = rnn_bank.h1_state.copy(), rnn_bank.h2_state.copy()
+outs = world.make_all_decisions(all_inputs)
+rnn_bank.h1_state[:] = saved_h1
+rnn_bank.h2_state[:] = saved_h2
+expected = np.zeros_like(outs)
+for network_class in (ff_class, rnn_class):
+    indices = [i for i, cr in enumerate(world.creatures) if type(cr.nn) is network_class]
+    group = [world.creatures[i] for i in indices]
+    expected[indices] = network_class.make_all_decisions(all_inputs[indices], group, network_class.prepare_calc(group))
+check(np.array_equal(outs, expected), "выходы групп разложены по порядку существ", "выходы групп перепутаны")
+
+
+class BanklessNetwork:
+    """Сеть бэкенда без GENOME: веса не переносятся в банк, мир считает ее отдельной группой."""
+    __type__ = 'bankless'
+
+    @staticmethod
+    def prepare_calc(creatures):
+        return len(creatures)
+
+    @staticmethod
+    def make_all_decisions(all_inputs, creatures, creatures_nns):
+        return np.full((creatures_nns, 3), 0.5, dtype=np.float32)
+
+
+for network in (BanklessNetwork(), BanklessNetwork()):
+    world.add_creature(Creature(5, 5, nn=network))
+all_inputs = np.random.rand(len(world.creatures), 50).astype(np.float32)
+bankless = [i for i, cr in enumerate(world.creatures) if type(cr.nn) is BanklessNetwork]
+outs = world.make_all_decisions(all_inputs)
+check(len(bankless) == 2 and np.all(outs[bankless] == 0.5), "сети без банка весов считаются своим бэкендом", "существа без банка весов остались без решений")
+world.pool.release_many(world.pool.slots()[bankless])
+for _ in range(30):
+    world.update()
+check(world.tick == 30, "30 тиков смешанного мира", "мир не обновился")
+print()
+
+# ---------------------------------------------------------------------------
+print("3. Загрузка сети другого бэкенда без перезапуска...")
+rnn_data = rnn_class().serialize()
+restored = world_persistence._deserialize_nn(rnn_data)
+check(type(restored) is rnn_class, "сеть rnn восстановлена при бэкенде по умолчанию ff", "тип сети не восстановлен")
+check(np.array_equal(restored.w1_x, np.array(rnn_data['w1_x'], dtype=np.float32)), "веса совпадают", "веса не совпадают")
+old_data = ff_class().serialize()
+del old_data['__type__']
+check(type(world_persistence._deserialize_nn(old_data)) is ff_class,
+      "старое сохранение без типа - бэкенд по умолчанию", "старое сохранение не загрузилось")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -2,7 +2,7 @@ import numpy as np
 from numba import jit
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def bad_example_append():
     arr=[]
     arr.append([[1,2,3,4,5],[1,2,3,4,5]])
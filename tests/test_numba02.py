@@ -3,7 +3,7 @@ from numba import jit
 import math
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def fast_get_all_visions(map, creatures_pos):
     step = 0.9 # шаг перемещения взгляда (для raycast - дистанция на котороую двигаем вперед указатель)
     resolution = 15 # разрешение взгляда - по сути сколько лучше отправит raycast?
@@ -116,7 +116,7 @@ def fast_get_all_visions(map, creatures_pos):
 
     return all_visions, raycast_dots
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def bad_example_append():
     arr=[]
     arr.append([[1,2,3,4,5],[1,2,3,4,5]])
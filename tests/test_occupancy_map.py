@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Тест OccupancyMap: инкрементальный update_map совпадает с полной перестройкой"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from food import Food
+from world_generator import WorldGenerator
+
+world = WorldGenerator.generate_world(
+    width=60, height=40,
+    wall_count=80, food_count=200, creatures_count=120,
+    border_walls=True,
+)
+
+# ---------------------------------------------------------------------------
+print("1. Первое обновление строит карту целиком...")
+world.update_map()
+check(world.occupancy.is_consistent(world), "карта совпадает с полной перестройкой", "карта расходится")
+check(np.all(world.map[world.walls_map == 1] == 1), "стены на месте", "стены потеряны")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Инкрементальные обновления в течение 100 тиков...")
+for tick in range(100):
+    world.update()
+    world.update_map()
+    if not world.occupancy.is_consistent(world):
+        print(f"   ✗ Расхождение на тике {tick}")
+        sys.exit(1)
+print("   ✓ Карта совпадает с полной перестройкой на каждом тике\n")
+
+# ---------------------------------------------------------------------------
+print("3. Несколько существ в одной клетке...")
+a, b = world.creatures[0], world.creatures[1]
+b.x, b.y = a.x, a.y
+world.update_map()
+cell = (int(a.y), int(a.x))
+check(world.occupancy.creature_counts[cell] >= 2, "счетчик клетки >= 2", "счетчик клетки не учел двоих")
+world.pool.release(b.slot)
+world.update_map()
+check(world.map[cell] == 3, "клетка занята оставшимся существом", "клетка очищена раньше времени")
+check(world.occupancy.is_consistent(world), "карта согласована", "карта расходится")
+print()
+
+# ---------------------------------------------------------------------------
+print("4. Пища появляется и исчезает...")
+free = np.argwhere(world.map == 0)
+y, x = int(free[0][0]), int(free[0][1])
+world.add_food(Food(x, y))
+world.update_map()
+check(world.map[y, x] == 2, "новая пища отмечена", "новая пища не отмечена")
+world.food_store.nutrition[world.food_store.index_at(x, y)] = -1.0
+world.proceed_food()
+world.update_map()
+check(world.map[y, x] == 0, "съеденная пища стерта", "съеденная пища осталась на карте")
+print()
+
+# ---------------------------------------------------------------------------
+print("5. Замена пищи целиком и полная перестройка...")
+world.foods = [Food(int(x), int(y)) for y, x in free[1:20]]
+world.update_map()
+check(world.occupancy.is_consistent(world), "после замены пищи карта перестроена", "карта расходится после замены пищи")
+world.update_map(full=True)
+check(world.occupancy.is_consistent(world), "update_map(full=True) работает", "полная перестройка расходится")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -20,7 +20,7 @@ from numba import jit
 
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def fast_get_all_visions(map, creatures_pos):
     step = 0.9 # шаг перемещения взгляда (для raycast - дистанция на котороую двигаем вперед указатель)
     resolution = 15 # разрешение взгляда - по сути сколько лучше отправит raycast?
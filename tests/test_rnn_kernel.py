@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Тест numba-ядра RNN: совпадение с эталоном на numpy и состояния h1/h2 в банке"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from creature import Creature
+from creature_pool import CreaturePool
+from nn.rnn import NeuralNetwork, INPUT_SIZE
+
+
+def reference_step(all_inputs, nns):
+    """Прежняя реализация на einsum (float64) - эталон для ядра."""
+    w1_x = np.stack([nn.w1_x for nn in nns]); w1_h = np.stack([nn.w1_h for nn in nns]); b1 = np.stack([nn.b1 for nn in nns])
+    w2_x = np.stack([nn.w2_x for nn in nns]); w2_h = np.stack([nn.w2_h for nn in nns]); b2 = np.stack([nn.b2 for nn in nns])
+    w3 = np.stack([nn.w3 for nn in nns]); b3 = np.stack([nn.b3 for nn in nns])
+    h1 = np.stack([nn.h1_state for nn in nns]); h2 = np.stack([nn.h2_state for nn in nns])
+    new_h1 = np.tanh(np.einsum("ni,nij->nj", all_inputs, w1_x) + np.einsum("ni,nij->nj", h1, w1_h) + b1)
+    new_h2 = np.tanh(np.einsum("ni,nij->nj", new_h1, w2_x) + np.einsum("ni,nij->nj", h2, w2_h) + b2)
+    outputs = np.clip(np.tanh(np.einsum("ni,nij->nj", new_h2, w3) + b3), -1.0, 1.0)
+    return outputs, new_h1, new_h2
+
+
+np.random.seed(3)
+pool = CreaturePool(capacity=4)
+creatures = [Creature(1, 1, nn=NeuralNetwork()) for _ in range(10)]
+for cr in creatures:
+    pool.add(cr)
+pool.release(creatures[2].slot) # дырка в слотах: строки банка не совпадают с номерами существ
+creatures = pool.creatures()
+bank = pool.genome_banks[NeuralNetwork]
+
+# ---------------------------------------------------------------------------
+print("1. Шаги RNN по банку совпадают с эталоном...")
+for step in range(3):
+    all_inputs = np.random.rand(len(creatures), INPUT_SIZE).astype(np.float32)
+    expected, expected_h1, expected_h2 = reference_step(all_inputs, [cr.nn for cr in creatures])
+    creatures_nns = NeuralNetwork.prepare_calc(creatures)
+    outputs = NeuralNetwork.make_all_decisions(all_inputs, creatures, creatures_nns)
+    h1 = np.stack([cr.nn.h1_state for cr in creatures])
+    h2 = np.stack([cr.nn.h2_state for cr in creatures])
+    if not (np.allclose(outputs, expected, atol=1e-4) and np.allclose(h1, expected_h1, atol=1e-4) and np.allclose(h2, expected_h2, atol=1e-4)):
+        print(f"   ✗ Шаг {step}: расхождение с эталоном")
+        sys.exit(1)
+print("   ✓ Выходы и состояния совпадают на 3 шагах подряд\n")
+
+# ---------------------------------------------------------------------------
+print("2. Состояния живут в банке...")
+check(creatures_nns[9] is bank.h1_state, "prepare_calc отдает состояния банка", "prepare_calc скопировал состояния")
+passed = NeuralNetwork.prepare_calc(creatures, bank, pool.slots())
+check(passed[0] is pool.slots() and np.array_equal(passed[0], creatures_nns[0]), "строки из слотов пула совпадают с найденными по сетям", "строки из слотов пула разошлись")
+check(np.shares_memory(creatures[0].nn.h1_state, bank.h1_state), "h1_state сети - представление банка", "h1_state не в банке")
+dead = creatures[0]
+dead_h1 = dead.nn.h1_state.copy()
+pool.release(dead.slot)
+check(np.array_equal(dead.nn.h1_state, dead_h1) and not np.shares_memory(dead.nn.h1_state, bank.h1_state),
+      "умершее существо забрало свое состояние", "состояние умершего потеряно")
+child = Creature(1, 1, nn=NeuralNetwork.copy(creatures[1].nn))
+pool.add(child)
+check(np.all(child.nn.h1_state == 0), "новорожденный начинает с нулевым состоянием", "новорожденный унаследовал состояние")
+print()
+
+# ---------------------------------------------------------------------------
+print("3. Последовательный режим совпадает с параллельным...")
+all_inputs = np.random.rand(len(pool.creatures()), INPUT_SIZE).astype(np.float32)
+saved_h1, saved_h2 = bank.h1_state.copy(), bank.h2_state.copy()
+parallel = NeuralNetwork.make_all_decisions(all_inputs, pool.creatures(), NeuralNetwork.prepare_calc(pool.creatures()))
+bank.h1_state[:] = saved_h1
+bank.h2_state[:] = saved_h2
+NeuralNetwork.parallel = False
+serial = NeuralNetwork.make_all_decisions(all_inputs, pool.creatures(), NeuralNetwork.prepare_calc(pool.creatures()))
+NeuralNetwork.parallel = True
+check(np.array_equal(parallel, serial), "выходы совпадают побитово", "выходы различаются")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
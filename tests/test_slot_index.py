@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Тест индекса слотов сохранения: обновление при сохранении, инвалидация по mtime, без повторного чтения архивов"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import contextlib
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from service.rng.rng import rng
+from service.world_persistence.world_persistence import world_persistence
+from world_generator import WorldGenerator
+
+
+def count_calls(name: str) -> list:
+    """Подменяет метод сервиса оберткой, которая считает вызовы (снимается через del)."""
+    method = getattr(world_persistence, name)
+    calls = []
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return method(*args, **kwargs)
+    setattr(world_persistence, name, wrapper)
+    return calls
+
+
+def slots_by_name() -> dict:
+    return {slot['filename']: slot for slot in world_persistence.get_save_slots()}
+
+
+rng.seed(5)
+world = WorldGenerator.generate_world(width=60, height=40, wall_count=20, food_count=300, creatures_count=30, border_walls=True)
+for _ in range(3):
+    world.update()
+    world.update_map()
+
+with tempfile.TemporaryDirectory() as tmp:
+    world_persistence.SAVES_DIR = Path(tmp)
+    index_path = Path(tmp) / world_persistence.SLOT_INDEX_NAME
+    try:
+        # -------------------------------------------------------------------
+        print("1. Сохранение записывает слот в индекс...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            world_persistence.save_world(world, 'slot')
+        stem = next(Path(tmp).glob('slot__*.world.npz')).name[:-len(world_persistence.SAVE_EXT)]
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+        check(f"{stem}{world_persistence.SAVE_EXT}" in index['slots'], "слот в индексе сразу после сохранения", str(index))
+
+        reads = count_calls('read_header')
+        slot = slots_by_name()[stem]
+        check(not reads, "get_save_slots не открывает архив", f"прочитано заголовков: {len(reads)}")
+        check(slot['tick'] == world.tick and slot['kind'] == 'full', f"тик {slot['tick']}, вид {slot['kind']}", str(slot))
+        check(slot['backend'] == type(world.creatures[0].nn).__type__, f"бэкенд {slot['backend']}", str(slot))
+        check(slot['creatures_count'] == len(world.creatures) and slot['map_size'] == '60x40', "существа и размер карты", str(slot))
+
+        # -------------------------------------------------------------------
+        print("2. Инвалидация по mtime и удаление...")
+        save_path = Path(tmp) / f"{stem}{world_persistence.SAVE_EXT}"
+        stat = save_path.stat()
+        os.utime(save_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        slots_by_name()
+        check(len(reads) == 1, "измененный файл перечитан один раз", f"прочитано заголовков: {len(reads)}")
+        slots_by_name()
+        check(len(reads) == 1, "после перечитывания снова из индекса", f"прочитано заголовков: {len(reads)}")
+        del world_persistence.read_header
+
+        copy_path = Path(tmp) / f"copy__c1_g0_60x40{world_persistence.SAVE_EXT}"
+        shutil.copy(save_path, copy_path)
+        check('copy__c1_g0_60x40' in slots_by_name(), "файл, положенный вручную, попал в список", "нового файла нет в списке")
+        copy_path.unlink()
+        slots = slots_by_name()
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+        check('copy__c1_g0_60x40' not in slots and copy_path.name not in index['slots'], "удаленный файл убран из индекса", str(index['slots'].keys()))
+
+        # -------------------------------------------------------------------
+        print("3. Старый .world.gz распаковывается один раз...")
+        legacy_path = Path(tmp) / f"old__c2_g7_60x40{world_persistence.LEGACY_EXT}"
+        legacy = {'metadata': {'width': 60, 'height': 40, 'tick': 777, 'creatures_count': 2, 'max_generation': 7},
+                  'walls_map': [], 'creatures': [{'nn': {'__type__': 'rnn'}}, {'nn': {}}], 'foods': []}
+        legacy_path.write_bytes(gzip.compress(json.dumps(legacy).encode('utf-8')))
+        unpacks = count_calls('_read_legacy_header')
+        slot = slots_by_name()['old__c2_g7_60x40']
+        slots_by_name()
+        del world_persistence._read_legacy_header
+        check(len(unpacks) == 1, "распакован при первом сканировании, потом из индекса", f"распаковок: {len(unpacks)}")
+        check(slot['tick'] == 777 and slot['format'] == 'legacy', "тик из старого сохранения", str(slot))
+        check(set(slot['backend'].split('+')) == {'rnn', 'ff'}, f"бэкенды {slot['backend']}", str(slot))
+
+        # -------------------------------------------------------------------
+        print("4. Битый индекс пересобирается; сотни слотов...")
+        index_path.write_text('{not json', encoding='utf-8')
+        check(stem in slots_by_name(), "битый индекс пересобран", "слот пропал при битом индексе")
+        for i in range(300):
+            shutil.copy(save_path, Path(tmp) / f"many{i:03d}__c1_g0_60x40{world_persistence.SAVE_EXT}")
+        start = time.perf_counter()
+        slots_by_name()
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        count = len(slots_by_name())
+        warm = time.perf_counter() - start
+        check(count == 302 and warm < cold, f"{count} слотов: первое сканирование {cold * 1000:.0f} ms, из индекса {warm * 1000:.0f} ms", f"{count} слотов, {cold:.3f} / {warm:.3f} s")
+    finally:
+        for name in ('read_header', '_read_legacy_header'):
+            world_persistence.__dict__.pop(name, None)
+        del world_persistence.SAVES_DIR
+
+print()
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Тест пофазного профайлера тика: laps, скользящая статистика, CSV, фазы реального мира"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import time
+import tempfile
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from service.performance_monitor.performance_monitor import TickProfiler, PHASES
+
+# ---------------------------------------------------------------------------
+print("1. Laps и скользящее окно...")
+profiler = TickProfiler(window=5)
+for _ in range(8):
+    profiler.begin_tick(10)
+    time.sleep(0.002)
+    profiler.lap('perception')
+    profiler.lap('inference')
+    profiler.lap('perception') # повторная фаза за тик суммируется
+    profiler.end_tick()
+summary = profiler.summary()
+check(summary['ticks'] == 5, "окно хранит последние 5 тиков", f"ticks={summary['ticks']}")
+check(summary['phases']['perception']['mean_ms'] >= 2.0, "время фазы накоплено", str(summary['phases']['perception']))
+check(abs(sum(s['share'] for s in summary['phases'].values()) - 1.0) < 0.05, "доли фаз в сумме ~1", str(summary['phases']))
+check(summary['creature_ticks_per_sec'] > summary['ticks_per_sec'], "существо·тик/с учитывает численность", str(summary))
+
+profiler.lap('perception') # вне тика - игнорируется
+check(profiler.summary()['ticks'] == 5, "lap вне тика игнорируется", "lap вне тика изменил статистику")
+
+disabled = TickProfiler(enabled=False)
+disabled.begin_tick(10)
+disabled.lap('perception')
+disabled.end_tick()
+check(disabled.summary()['ticks'] == 0, "выключенный профайлер ничего не пишет", "выключенный профайлер записал тик")
+
+# ---------------------------------------------------------------------------
+print("2. CSV...")
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'phases.csv')
+    profiler = TickProfiler(window=10)
+    profiler.open_csv(path, every=3)
+    for _ in range(7):
+        profiler.begin_tick(1)
+        profiler.lap('render')
+        profiler.end_tick()
+    profiler.close_csv()
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    check(len(rows) == 3, "заголовок + строка каждые 3 тика", f"строк: {len(rows)}")
+    check(len(rows[0]) == 3 + 2 * len(PHASES), "колонки по всем фазам", str(rows[0]))
+
+# ---------------------------------------------------------------------------
+print("3. Фазы мира...")
+from world_generator import WorldGenerator
+world = WorldGenerator.generate_world(width=80, height=60, wall_count=20, food_count=200, creatures_count=40, border_walls=True)
+world.profiler = TickProfiler()
+for _ in range(3):
+    world.update()
+    world.update_map()
+    world.profiler.end_tick()
+phases = world.profiler.summary()['phases']
+world_phases = PHASES[:PHASES.index('update_map') + 1]
+missing = [name for name in world_phases if name not in phases]
+check(not missing, "World отмечает все свои фазы", f"нет фаз: {missing}")
+
+print("\n" + "=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Тест torch-бэкенда: пакетный bmm совпадает с numba-ядром nn/rnn.py на тех же весах"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+try:
+    import torch # noqa: F401
+except ImportError:
+    print("torch не установлен - тест пропущен")
+    sys.exit(0)
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from creature import Creature
+from creature_pool import CreaturePool
+from nn import rnn
+from nn import nn_torch_rnn
+
+
+np.random.seed(5)
+torch_pool = CreaturePool(capacity=4)
+rnn_pool = CreaturePool(capacity=4)
+for _ in range(10):
+    torch_nn = nn_torch_rnn.NeuralNetwork()
+    rnn_nn = rnn.NeuralNetwork.blank()
+    data = torch_nn.serialize()
+    data['__type__'] = 'rnn'
+    rnn_nn.deserialize(data)
+    torch_pool.add(Creature(1, 1, nn=torch_nn))
+    rnn_pool.add(Creature(1, 1, nn=rnn_nn))
+# дырка в слотах: строки банка не совпадают с номерами существ
+torch_pool.release(torch_pool.creatures()[2].slot)
+rnn_pool.release(rnn_pool.creatures()[2].slot)
+torch_creatures = torch_pool.creatures()
+rnn_creatures = rnn_pool.creatures()
+bank = torch_pool.genome_banks[nn_torch_rnn.NeuralNetwork]
+
+# ---------------------------------------------------------------------------
+print("1. Шаги torch-бэкенда совпадают с numba-ядром...")
+for step in range(3):
+    all_inputs = np.random.rand(len(torch_creatures), nn_torch_rnn.INPUT_SIZE).astype(np.float32)
+    got = nn_torch_rnn.NeuralNetwork.make_all_decisions(
+        all_inputs, torch_creatures, nn_torch_rnn.NeuralNetwork.prepare_calc(torch_creatures))
+    expected = rnn.NeuralNetwork.make_all_decisions(
+        all_inputs, rnn_creatures, rnn.NeuralNetwork.prepare_calc(rnn_creatures))
+    if got.shape != expected.shape or not np.allclose(got, expected, atol=1e-4):
+        print(f"   ✗ Шаг {step}: расхождение выходов")
+        sys.exit(1)
+h1 = np.stack([cr.nn.h1_state for cr in torch_creatures])
+expected_h1 = np.stack([cr.nn.h1_state for cr in rnn_creatures])
+check(np.allclose(h1, expected_h1, atol=1e-4), "выходы и состояния совпадают на 3 шагах подряд", "состояния разошлись")
+check(np.shares_memory(torch_creatures[0].nn.h1_state, bank.h1_state),
+      "состояния обновляются прямо в банке", "состояние не в банке")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Копия и мутация...")
+parent = torch_creatures[0].nn
+child = nn_torch_rnn.NeuralNetwork.copy(parent)
+check(np.array_equal(child.w1_x, parent.w1_x) and not np.shares_memory(child.w1_x, parent.w1_x), "копия получает свои веса", "копия делит веса с родителем")
+parent_w1 = parent.w1_x.copy()
+child.mutate(1.0, 0.1)
+check(np.array_equal(parent.w1_x, parent_w1), "мутация копии не трогает родителя", "мутация копии изменила родителя")
+check(not np.array_equal(child.w1_x, parent_w1), "веса копии изменились", "мутация ничего не сделала")
+print()
+
+# ---------------------------------------------------------------------------
+print("3. Сериализация...")
+data = child.serialize()
+check(data['__type__'] == 'torch_rnn', "тип сети - torch_rnn", f"неверный тип: {data['__type__']}")
+restored = nn_torch_rnn.NeuralNetwork.blank()
+restored.deserialize(data)
+check(all(np.array_equal(getattr(restored, name), getattr(child, name)) for name in nn_torch_rnn.NeuralNetwork.GENOME),
+      "веса восстановлены", "веса не совпадают после восстановления")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
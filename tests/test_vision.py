@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Тест ядер зрения: индивидуальная дальность зрения, точки лучей, обход клеток DDA"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+
+def check(condition: bool, msg_ok: str, msg_fail: str):
+    if condition:
+        print(f"   ✓ {msg_ok}")
+    else:
+        print(f"   ✗ {msg_fail}")
+        sys.exit(1)
+
+
+from world import World
+
+RESOLUTION = 15
+
+# Карта 40x20: стена в столбце x=30, существа смотрят вправо (angle=0) из x=10
+world_map = np.zeros((20, 40), dtype='int')
+world_map[:, 30] = 1
+center = RESOLUTION // 2 # центральный луч смотрит прямо по углу существа
+
+# ---------------------------------------------------------------------------
+print("1. Дальность зрения у каждого существа своя...")
+creatures_pos = np.array([
+    [10.5, 10.5, 0.0, 5.0],   # близорукое - стену не видит
+    [10.5, 10.5, 0.0, 30.0],  # дальнозоркое - стену видит
+], dtype='float')
+record_all = np.ones(2, dtype=np.bool_)
+all_visions, raycast_dots = World.fast_get_all_visions_darken_with_distance(world_map, creatures_pos, 1.0, record_all)
+check(all_visions.shape == (2, RESOLUTION * 3), f"shape={all_visions.shape}", f"shape неверен: {all_visions.shape}")
+check(all_visions[0, center] == 0.0, "близорукое существо видит пустоту", f"близорукое видит {all_visions[0, center]}")
+check(all_visions[1, center] > 0.0, "дальнозоркое существо видит стену", "дальнозоркое не видит стену")
+r, g, b = all_visions[1, center], all_visions[1, RESOLUTION + center], all_visions[1, 2 * RESOLUTION + center]
+check(r == g == b, "стена серая (R=G=B)", f"цвет стены неверен: {r}, {g}, {b}")
+print()
+
+# ---------------------------------------------------------------------------
+print("2. Точки лучей...")
+near_visions, near_dots = World.fast_get_all_visions_darken_with_distance(world_map, creatures_pos[:1], 1.0, record_all[:1])
+far_visions, far_dots = World.fast_get_all_visions_darken_with_distance(world_map, creatures_pos[1:], 1.0, record_all[1:])
+check(len(raycast_dots) == len(near_dots) + len(far_dots), "точки всех существ собраны без потерь", "число точек не совпадает")
+check(np.array_equal(raycast_dots[:len(near_dots)], near_dots), "точки идут в порядке существ", "порядок точек нарушен")
+check(np.all(np.hypot(near_dots[:, 0] - 10.5, near_dots[:, 1] - 10.5) <= 5.0 + 0.9 + 1e-6),
+      "лучи близорукого не длиннее его дальности", "лучи близорукого слишком длинные")
+check(np.array_equal(near_visions[0], all_visions[0]) and np.array_equal(far_visions[0], all_visions[1]),
+      "результат существа не зависит от соседей", "результат зависит от соседей")
+print()
+
+# ---------------------------------------------------------------------------
+print("3. Запись точек лучей только для выбранных существ...")
+record_none = np.zeros(2, dtype=np.bool_)
+visions_none, dots_none = World.fast_get_all_visions_darken_with_distance(world_map, creatures_pos, 1.0, record_none)
+check(len(dots_none) == 0, "без записи точек нет", f"записано {len(dots_none)} точек")
+check(np.array_equal(visions_none, all_visions), "зрение не зависит от записи точек", "зрение изменилось без записи точек")
+record_far = np.array([False, True])
+_, dots_far_only = World.fast_get_all_visions_darken_with_distance(world_map, creatures_pos, 1.0, record_far)
+check(np.array_equal(dots_far_only, far_dots), "записаны точки только выбранного существа", "записаны чужие точки")
+print()
+
+# ---------------------------------------------------------------------------
+print("4. DDA: то же кодирование цвета, что и у шага по лучу...")
+dda_visions, dda_dots = World.fast_get_all_visions_dda(world_map, creatures_pos, 1.0, record_all)
+check(dda_visions[0, center] == 0.0, "близорукое существо видит пустоту", f"близорукое видит {dda_visions[0, center]}")
+r, g, b = dda_visions[1, center], dda_visions[1, RESOLUTION + center], dda_visions[1, 2 * RESOLUTION + center]
+check(r == g == b and r > 0.0, "стена серая (R=G=B)", f"цвет стены неверен: {r}, {g}, {b}")
+# Стена в x=30, существо в x=10.5: центральный луч входит в клетку стены на дистанции 19.5
+distance_ratio = 1 - 19.5 / 30.0
+expected = 100 * distance_ratio / 255.0 # серый цвет обесцвечивание не меняет, остается затемнение
+check(abs(r - expected) < 1.5 / 255.0, "затемнение считается от дистанции до клетки", f"яркость {r} != {expected}")
+check(len(dda_dots) > 0 and np.all(dda_dots[:, 0] <= 30.0 + 1e-9), "точки лучей не заходят за стену", "точки лучей за стеной")
+print()
+
+# ---------------------------------------------------------------------------
+print("5. DDA не проскакивает тонкую диагональную стену...")
+diagonal_map = np.zeros((40, 40), dtype='int')
+for i in range(40):
+    diagonal_map[i, 39 - i] = 1
+diagonal_pos = np.array([[5.5, 5.5, 0.785398, 60.0]], dtype='float')
+record_one = np.zeros(1, dtype=np.bool_)
+dda_visions, _ = World.fast_get_all_visions_dda(diagonal_map, diagonal_pos, 1.0, record_one)
+r, g, b = dda_visions[0, :RESOLUTION], dda_visions[0, RESOLUTION:2 * RESOLUTION], dda_visions[0, 2 * RESOLUTION:]
+check(np.all((r > 0) & (r == g) & (g == b)), "все 15 лучей видят стену", "часть лучей прошла сквозь стену")
+print()
+
+print("=" * 60)
+print("✓ Все проверки пройдены успешно!")
+print("=" * 60)
@@ -8,7 +8,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import json
 import gzip
+import zipfile
 from pathlib import Path
+import numpy as np
 
 SAVE_NAME = "_pytest_persistence"
 SAVES_DIR = Path("./saves")
@@ -67,23 +69,26 @@ print("4. Сохранение мира...")
 result = world_persistence.save_world(world, SAVE_NAME)
 check(result, "save_world вернул True", "save_world вернул False")
 
-matching_paths = sorted(SAVES_DIR.glob(f"{SAVE_NAME}__*.world.gz"))
+matching_paths = sorted(SAVES_DIR.glob(f"{SAVE_NAME}__*.world.npz"))
 check(len(matching_paths) > 0, "Файл сохранения найден по encoded-имени", "Файл не найден")
 save_path = matching_paths[-1]
-save_stem = save_path.name[:-9]
+save_stem = save_path.name[:-len('.world.npz')]
 check(save_path.exists(), f"Файл создан: {save_path}", "Файл не создан")
 
-# Проверяем что zones_map попал в файл
-with open(save_path, 'rb') as f:
-    raw = gzip.decompress(f.read())
-saved_json = json.loads(raw.decode('utf-8'))
-check('zones_map' in saved_json, "zones_map присутствует в файле", "zones_map ОТСУТСТВУЕТ в файле")
-check('health' in saved_json['creatures'][0], "health присутствует в creature", "health ОТСУТСТВУЕТ в creature")
-check('input_hurting' in saved_json['creatures'][0], "input_hurting присутствует", "input_hurting ОТСУТСТВУЕТ")
-check('input_starving' in saved_json['creatures'][0], "input_starving присутствует", "input_starving ОТСУТСТВУЕТ")
-check('input_wayblocked' in saved_json['creatures'][0], "input_wayblocked присутствует", "input_wayblocked ОТСУТСТВУЕТ")
-check('input_bite_success' in saved_json['creatures'][0], "input_bite_success присутствует", "input_bite_success ОТСУТСТВУЕТ")
-check('food_age' in saved_json['foods'][0], "food_age присутствует в food", "food_age ОТСУТСТВУЕТ в food")
+# Проверяем содержимое контейнера: заголовок и массивы
+with zipfile.ZipFile(save_path) as archive:
+    names = set(archive.namelist())
+    header = json.loads(archive.read('header.json'))
+check(header['format'] == 'nnevol-world' and header['version'] == 1, "заголовок формата v1", f"заголовок: {header.get('format')} v{header.get('version')}")
+check('zones_map.npy' in names, "zones_map присутствует в файле", "zones_map ОТСУТСТВУЕТ в файле")
+for field in ('health', 'input_hurting', 'input_starving', 'input_wayblocked', 'input_bite_success'):
+    check(f'creatures/{field}.npy' in names, f"{field} присутствует", f"{field} ОТСУТСТВУЕТ")
+check('foods/food_age.npy' in names, "food_age присутствует в food", "food_age ОТСУТСТВУЕТ в food")
+backend = header['networks'][0]['backend']
+with np.load(save_path) as arrays:
+    w1 = arrays[f'nn/{backend}/w1']
+check(w1.shape[0] == header['networks'][0]['count'] and w1.dtype == np.float32,
+      f"веса сложены в один тензор {w1.shape}", f"тензор весов: {w1.shape} {w1.dtype}")
 print()
 
 # ---------------------------------------------------------------------------
@@ -121,6 +126,13 @@ check(abs(cr0.input_starving - 0.77) < 1e-5, f"input_starving={cr0.input_starvin
 check(abs(cr0.input_wayblocked - 0.33) < 1e-5, f"input_wayblocked={cr0.input_wayblocked:.4f}", f"input_wayblocked неверен")
 check(abs(cr0.input_bite_success - 0.99) < 1e-5, f"input_bite_success={cr0.input_bite_success:.4f}", f"input_bite_success неверен")
 check(world2.foods[0].food_age == 88, f"food_age={world2.foods[0].food_age}", f"food_age неверен: {world2.foods[0].food_age}")
+same_weights = all(
+    np.array_equal(getattr(a.nn, name), getattr(b.nn, name))
+    for a, b in zip(world.creatures, world2.creatures) for name in type(a.nn).GENOME
+)
+check(same_weights, "веса сетей восстановлены бит в бит", "веса сетей отличаются")
+check([c.birth_ages for c in world2.creatures] == [c.birth_ages for c in world.creatures],
+      "birth_ages восстановлены", "birth_ages неверны")
 print()
 
 # ---------------------------------------------------------------------------
@@ -196,7 +208,35 @@ check(SAVE_NAME in names, f"Слот '{SAVE_NAME}' найден", f"Слот н
 print()
 
 # ---------------------------------------------------------------------------
-print("11. Удаляем тестовый файл...")
+print("11. Чтение старого формата .world.gz...")
+# Файл в прежнем формате (JSON.GZ со вложенными списками), как его писал старый save_world
+legacy_stem = f"{SAVE_NAME}_legacy__c{len(world.creatures)}_g0_{world.width}x{world.height}"
+legacy_path = SAVES_DIR / f"{legacy_stem}.world.gz"
+creature_fields = ('id', 'generation', 'x', 'y', 'energy', 'health', 'age', 'speed', 'angle', 'bite_effort',
+                   'vision_distance', 'bite_range', 'input_hurting', 'input_starving', 'input_wayblocked', 'input_bite_success')
+legacy_data = {
+    'metadata': {'width': world.width, 'height': world.height, 'tick': 7},
+    'walls_map': world.walls_map.tolist(),
+    'zones_map': world.zones_map.zones_map.tolist(),
+    'creatures': [dict({name: getattr(c, name) for name in creature_fields}, birth_ages=list(c.birth_ages), nn=c.nn.serialize())
+                  for c in world.creatures],
+    'foods': [{'x': f.x, 'y': f.y, 'nutrition': f.nutrition, 'food_age': f.food_age} for f in world.foods],
+}
+legacy_path.write_bytes(gzip.compress(json.dumps(legacy_data).encode('utf-8')))
+world4 = World(10, 10)
+check(world_persistence.load_world(world4, legacy_stem), f"{legacy_path.name} загружен", "старое сохранение не загрузилось")
+check(len(world4.creatures) == len(world.creatures) and world4.tick == 7 and world4.foods[0].food_age == 88,
+      f"существ: {len(world4.creatures)}, tick {world4.tick}", "старое сохранение загружено неверно")
+check(np.array_equal(world4.creatures[0].nn.w1, world.creatures[0].nn.w1), "веса из JSON восстановлены", "веса из JSON неверны")
+world4.update()
+world4.update_map()
+check(any(s['filename'] == legacy_stem and s['format'] == 'legacy' for s in world_persistence.get_save_slots()),
+      "старый слот виден в get_save_slots", "старого слота нет в get_save_slots")
+legacy_path.unlink(missing_ok=True)
+print()
+
+# ---------------------------------------------------------------------------
+print("12. Удаляем тестовый файл...")
 save_path.unlink(missing_ok=True)
 check(not save_path.exists(), "Тестовый файл удалён", "Файл не удалён")
 print()
@@ -1,18 +1,21 @@
 # -*- coding: utf-8 -*-
 
 from creature import Creature
-#from nn.nn_torch_rnn import NeuralNetwork
+from creature_pool import CreaturePool
 from food import Food
-from nn import NeuralNetwork
-import random
+from food_store import FoodStore
+from occupancy_map import OccupancyMap
+from nn import get_backend
 import math
 import numpy as np
-from numba import jit
+from numba import jit, prange
 from simparams import sp
 from zones_map import ZonesMap
 
 from service.logger.logger import logme
 from service.debugger.debugger import debug
+from service.performance_monitor.performance_monitor import TickProfiler
+from service.rng.rng import rng
 
 
 
@@ -22,31 +25,67 @@ class World():
 		self.height = height
 		self.map = np.zeros((height, width), dtype='int')
 		self.walls_map = np.zeros((height, width), dtype='int')
-		self.creatures = []
-		self.foods = []
+		self.pool = CreaturePool() # Состояние всех существ хранится колонками в пуле
+		self.food_store = FoodStore(width, height) # Пища хранится колонками, плюс индекс клеток food_grid
 		self.tick = 0
 		self.zones_map = ZonesMap(width, height)
+		self.occupancy = OccupancyMap(width, height) # Счетчики занятости клеток для инкрементального update_map
+		self.map_consistency_check = False # Отладка: сверять инкрементальную карту с полной перестройкой каждый тик
+		# Запись точек лучей зрения для отрисовки: 'none' - не записывать (быстрый безголовый режим),
+		# 'all' - для всех существ, 'selected' - только для существа raycast_dots_creature_id
+		self.raycast_dots_mode = 'none'
+		self.raycast_dots_creature_id = None
+		# Алгоритм зрения: 'dda' - точный обход клеток сетки, 'march' - прежний шаг по лучу 0.9
+		self.vision_mode = 'dda'
+		# Пофазные тайминги тика; приложение подставляет сюда профайлер своего PerformanceMonitor
+		self.profiler = TickProfiler(enabled=False)
 
 
 		
 
 
 	
-	def update_map(self):
-		# Копируем стены в существующий массив
-		np.copyto(self.map, self.walls_map)
-		
-		# Добавляем еду векторизованно
-		# TODO Медленная штука. Два прохода. И на 50 000 пищи - долго работает
-		food_x = [food.x for food in self.foods]
-		food_y = [food.y for food in self.foods]
-		self.map[food_y, food_x] = 2
-		
-		# Добавляем существ векторизованно
-		# TODO Медленная штука. Два прохода. И на 50 000 пищи - долго работает
-		creature_x = [int(creature.x) for creature in self.creatures]
-		creature_y = [int(creature.y) for creature in self.creatures]
-		self.map[creature_y, creature_x] = 3
+	def update_map(self, full=False):
+		# Карта обновляется инкрементально: перезаписываются только клетки, где
+		# переместились/родились/умерли существа или появилась/исчезла пища.
+		# full=True - полная перестройка (стены + пища + существа), как раньше.
+		if full:
+			self.occupancy.rebuild(self)
+			return
+		self.occupancy.update(self)
+		if self.map_consistency_check and not self.occupancy.is_consistent(self):
+			debug.log(f"update_map: инкрементальная карта разошлась с полной перестройкой на тике {self.tick}")
+			self.occupancy.rebuild(self)
+		self.profiler.lap('update_map')
+
+	@property
+	def creatures(self):
+		# Список существ - это представления слотов пула в порядке слотов.
+		# Список кэшируется пулом и перестраивается только при рождениях/смертях.
+		return self.pool.creatures()
+
+	@creatures.setter
+	def creatures(self, creatures):
+		self.pool.clear()
+		for creature in creatures:
+			self.pool.add(creature)
+
+	@property
+	def foods(self):
+		# FoodStore ведет себя как список пищи: len(), индексация и итерация отдают представления Food
+		return self.food_store
+
+	@foods.setter
+	def foods(self, foods):
+		# Полная замена пищи (например, при загрузке мира) - хранилище строится заново под текущий размер мира
+		self.food_store = FoodStore(self.width, self.height)
+		for food in foods:
+			self.add_food(food)
+
+	@property
+	def food_grid(self):
+		# Индекс пищи: клетка -> номер пищи в food_store, или -1 если пусто
+		return self.food_store.grid
 
 	def get_cell(self, x, y):
 		return self.map[y, x]
@@ -55,46 +94,115 @@ class World():
 		self.map[y, x] = value
 		return True
 
-	def add_food(self, food):
-		self.foods.append(food)
-
-	def add_creature(self, creature):
-		self.creatures.append(creature)
+	def add_food(self, food) -> bool:
+		# В одной клетке может лежать только одна пища - занятую клетку отвергаем без поиска по списку
+		return self.food_store.add_food(food)
+
+	def add_creature(self, creature, genome_from=None):
+		self.pool.add(creature, genome_from)
+
+	def get_raycast_dots_mask(self, slots):
+		# Для каких существ ядро зрения записывает точки лучей (см. raycast_dots_mode)
+		if self.raycast_dots_mode == 'all':
+			return np.ones(len(slots), dtype=np.bool_)
+		if self.raycast_dots_mode == 'selected' and self.raycast_dots_creature_id is not None:
+			return self.pool.id[slots] == self.raycast_dots_creature_id
+		return np.zeros(len(slots), dtype=np.bool_)
+
+	def get_all_visions(self, current_map, creatures_pos, day_lighting, record_dots):
+		# Типы приводим к VISION_SIGNATURE (без копирования, если они уже такие): карта из сохранения
+		# или CSV может прийти другим dtype, и ядро молча скомпилировало бы вторую специализацию посреди прогона
+		current_map = np.ascontiguousarray(current_map, dtype=np.int64)
+		creatures_pos = np.ascontiguousarray(creatures_pos, dtype=np.float64)
+		day_lighting = float(day_lighting)
+		record_dots = np.ascontiguousarray(record_dots, dtype=np.bool_)
+		if self.vision_mode == 'march':
+			return World.fast_get_all_visions_darken_with_distance(current_map, creatures_pos, day_lighting, record_dots)
+		return World.fast_get_all_visions_dda(current_map, creatures_pos, day_lighting, record_dots)
+
+	def make_all_decisions(self, all_inputs):
+		# Существа могут жить с сетями разных бэкендов (группы существ, загруженные сохранения) -
+		# каждую группу считаем ядром ее бэкенда и раскладываем выходы обратно по порядку существ.
+		# Строки сетей в банках весов - это слоты пула: передаем их бэкендам готовыми,
+		# а группы берем масками занятых строк банков, не обходя существ
+		profiler = self.profiler
+		creatures = self.creatures
+		slots = self.pool.slots()
+		groups = [] # (класс сети, банк весов или None, индексы существ группы)
+		banked = np.zeros(len(slots), dtype=np.bool_)
+		for network_class, bank in self.pool.genome_banks.items():
+			mask = bank.bound[slots]
+			if mask.any():
+				groups.append((network_class, bank, np.flatnonzero(mask)))
+				banked |= mask
+		if not banked.all():
+			# Сети бэкендов без GENOME не живут в банках - их группируем по классу сети
+			bankless = {}
+			for index in np.flatnonzero(~banked):
+				bankless.setdefault(type(creatures[index].nn), []).append(index)
+			groups += [(network_class, None, np.array(indices, dtype=np.int64)) for network_class, indices in bankless.items()]
+
+		if len(groups) <= 1:
+			network_class, bank, _ = groups[0] if groups else (get_backend(), None, None)
+			creatures_nns = network_class.prepare_calc(creatures) if bank is None else network_class.prepare_calc(creatures, bank, slots)
+			profiler.lap('prepare_calc')
+			all_outs = network_class.make_all_decisions(all_inputs, creatures, creatures_nns)
+			profiler.lap('inference')
+			return all_outs
+
+		all_outs = np.zeros((len(creatures), 3), dtype=np.float32)
+		for network_class, bank, indices in groups:
+			group = [creatures[i] for i in indices]
+			group_inputs = np.ascontiguousarray(all_inputs[indices])
+			creatures_nns = network_class.prepare_calc(group) if bank is None else network_class.prepare_calc(group, bank, slots[indices])
+			profiler.lap('prepare_calc')
+			all_outs[indices] = network_class.make_all_decisions(group_inputs, group, creatures_nns)
+			profiler.lap('inference')
+		return all_outs
 
 	def get_creature_by_id(self, creature_id):
-		for creature in self.creatures:
-			if creature.id == creature_id:
-				return creature
-		return None
+		slots = self.pool.slots()
+		found = slots[self.pool.id[slots] == creature_id]
+		if len(found) == 0:
+			return None
+		return self.pool.objects[found[0]]
 
 	def update(self):
+		pool = self.pool
+		slots = pool.slots() # Номера слотов живых существ - все стадии работают с колонками пула по этим слотам
+		profiler = self.profiler
+		profiler.begin_tick(len(slots))
+
 		# 1. Восприятие (параллельно)
 		# Подготавливаем данные для быстрой функции
 		current_map = self.map
-		creatures_pos = np.zeros((len(self.creatures),4), dtype='float')
-		for index, creature in enumerate(self.creatures):
-			creatures_pos[index] = np.array([creature.x, 
-				creature.y, 
-				creature.angle,
-				creature.vision_distance]
-				)
+		creatures_pos = np.column_stack((
+			pool.x[slots],
+			pool.y[slots],
+			pool.angle[slots],
+			pool.vision_distance[slots],
+			)).astype('float')
 		
 		# Уровень освещенности в зависимости от времени суток
 		day_lighting = World.dayLighting(self.tick)
 
 		
 		# запускаем быструю функцию
-		all_visions, raycast_dots = self.fast_get_all_visions_darken_with_distance(current_map, creatures_pos, day_lighting)
+		record_dots = self.get_raycast_dots_mask(slots)
+		all_visions, raycast_dots = self.get_all_visions(current_map, creatures_pos, day_lighting, record_dots)
 
-		debug.set("raycast_dots", raycast_dots) # Тут все `numpy.float32`
+		# Точки лучей нужны только для отрисовки - в режиме 'none' их нет вовсе
+		debug.set("raycast_dots", raycast_dots if record_dots.any() else None)
 
 		debug.set("all_visions", all_visions) # Тут все `numpy.float32`
+		profiler.lap('perception')
 
 
-		all_other_inputs = World.get_all_other_inputs(self.creatures) # Тут все `numpy.float32`
+		all_other_inputs = World.get_all_other_inputs(pool, slots) # Тут все `numpy.float32`
 
 		# К Входам всех существ добавляет 3 новых входа, которые пока будут содержать значение 0.111
 		all_inputs = np.concatenate((all_visions, all_other_inputs), axis=1)
+		profiler.lap('input_assembly')
 		# print("==============================================")
 		# print(all_other_inputs)
 
@@ -103,14 +211,8 @@ class World():
 		
 		
 		# 2. Мышление (параллельно)  
-		# Подготавливаем данные для быстрой функции 
-		# эта функция склеивает все сетки в векторизованные массивы: l1_weights, l2_weights, l1_bias, l2_bias)
-		creatures_nns = NeuralNetwork.prepare_calc(self.creatures)
-		# , но на выход она выдает обычный python кортеж (или если не получится, то список), 
-		# содержащий эти самые numpy ndarray: l1_weights, l2_weights, l1_bias, l2_bias ...
-		
-		# запускаем быструю функцию
-		all_outs = NeuralNetwork.make_all_decisions(all_inputs, self.creatures, creatures_nns)
+		# Каждый бэкенд готовит свои сети (prepare_calc) и считает выходы одной быстрой функцией
+		all_outs = self.make_all_decisions(all_inputs)
 		# all_outs[] is a numpy ndarray [angle_delta, speed_delta, bite]
 
 		# Отладочная печать выходов самого последнего рожденного существа, чтобы посмотреть на эти значения.
@@ -120,81 +222,64 @@ class World():
 		debug.set("all_outs", all_outs) # Тут все `numpy.float32`
 
 		# 3. Перемещаем существ, согласно выходам нейросетей
-		for index, creature in enumerate(self.creatures):
-
-
-			ang, spd, newx, newy = World.apply_outs( # По моей задумке - это должен быть статичный метод класса World
-				creature_x = creature.x,
-				creature_y = creature.y,
-				creature_angle = creature.angle,
-				creature_speed = creature.speed,
-				out_angle = all_outs[index][0],  # выход нейросети для angle
-				out_speed = all_outs[index][1],  # выход нейросети для speed
-				)
-			creature.angle = ang
-			creature.speed = spd
-			# newx=newx #     просто демонстрирую, что этот метод возвращает и новые координаты тоже
-			# newy=newy #      и что дальше будет использоваться эта четверка уже расчитанных переменных
-			
-
-			# is_ok_to_go Проверяем/применяем правила, по которым существо может или не может перемещаться
-			is_ok_to_go = True
-			creature.input_wayblocked = 0.0 # Сбрасываем сигнал "путь заблокирован", чтобы нейросеть могла реагировать на него, и не держать его постоянно включенным после того, как путь разблокировался.
-			# За пределы карты проверим выход
-			if int(newx) < 0 or int(newx) > self.width-1 or int(newy) < 0 or int(newy) > self.height-1:
-				is_ok_to_go = False
-			
-			# Проверим, что в новой клетке не стена. На стену нельзя переходить.
-			if self.get_cell(int(newx),int(newy)) == 1:
-				# Существо столкнулось со стеной
-				is_ok_to_go = False
-				creature.energy -= sp.energy_loss_collision     # штраф за столкновение со стеной
-				
-			# Меняем или не меняем координаты на новые
-			if is_ok_to_go:
-				creature.x = newx
-				creature.y = newy
-				# Путь свободен
-				creature.input_wayblocked = 0.0
-			else:
-				# Идем в стену - значит сигнал "путь заблокирован" становится почти единицей, и нейросеть может научиться этому реагировать.
-				creature.input_wayblocked = 1.0
-			
-			# Если существо куснуло - проверить что оно куснуло.
-			creature.input_bite_success = 0.0 # Сбрасываем сигнал успешного укуса, чтобы нейросеть могла реагировать на него, и не держать его постоянно включенным после укуса.
-			creature.bite_effort = float(all_outs[index][2])
-			if creature.bite_effort > 0.5:
-				self.creature_bite(creature)
-
-			# Применим урон от нахождения в зоне, если это включено в параметрах
-			self.apply_zone_penalty(creature)
-
-			creature.update()
-			
-			
-
-			# Контроль размера популяции
-			# По идее в будущем волны изобилия можно двигать, подстраивая их под себя, чтобы не тянуть время
-			# Например, если популяция вымирает - сдвинуть волну изобилия до точки когда начинается рост изобилия.
-			# И наоборот, если популяиця слишком расплодилась, то можно сдвинуть волну изобилия до точки, 
-			# когда начинается скудный сезон - пищи становится все меньше.
-			# Для этого надо ввести переменную "slide_to_rise", "slide_to_descent"
-			# И тогда пока slide_to_rise==True, не надо повторно сдвигать изобилие на рост, потому что этот флаг
-			# говорит о том, что изобилие уже сдвинули, и пока оно не 
-			# станет slide_to_descent - сигмоиду не надо никуда сдвигать.
-			#
-			# С другой стороны, можно не париться, пусть скудный сезон продолжается столько сколько потребуется, 
-			# Потому что мы Остановили мутации на 50 существах, и запретили смерть на 10 существах.
-			# И теперь мы можем не переживать о вымирании. Точно также и про перенаселение.
-			#
-			# Но пока я не делаю сезоны и волны изобилия. Пока я должен сделать именно: 
-			# 1. Предотвратить вымирание популяции
-			# 2. Предотвратить перенаселенность мира
-			# Для этого в классе Worldя напишу приватный метод control_population()
-			# Внутри него должны быть методы которые в штатном режиме реализуют смерть и рождение
-			# А в крайние отрезки - запрещает смерть или запрещает размножение.
+		# Одна быстрая функция за один проход считает: новые угол/скорость/координаты,
+		# блокировку пути (выход за карту или стена), штраф за столкновение и маску желающих укусить.
+		# Типы - как в APPLY_OUTS_SIGNATURE: выходы бэкенда и штраф (его правят в GUI) могут прийти другим типом
+		all_outs = np.ascontiguousarray(all_outs, dtype=np.float32)
+		ang, spd, newx, newy, wayblocked, collision_penalty, bite_mask = World.fast_apply_all_outs(
+			all_outs,
+			pool.x[slots],
+			pool.y[slots],
+			pool.angle[slots],
+			np.ascontiguousarray(self.walls_map, dtype=np.int64),
+			float(sp.energy_loss_collision),
+			)
+		pool.angle[slots] = ang
+		pool.speed[slots] = spd
+		pool.x[slots] = newx
+		pool.y[slots] = newy
+		pool.input_wayblocked[slots] = wayblocked
+		pool.energy[slots] -= collision_penalty
+		profiler.lap('movement')
+
+		# Если существо куснуло - проверить что оно куснуло.
+		pool.input_bite_success[slots] = 0.0 # Сбрасываем сигнал успешного укуса, чтобы нейросеть могла реагировать на него, и не держать его постоянно включенным после укуса.
+		pool.bite_effort[slots] = all_outs[:, 2]
+		for slot in slots[bite_mask]:
+			self.creature_bite(pool.objects[slot])
+		profiler.lap('bite')
+
+		# Применим урон от нахождения в зоне, если это включено в параметрах
+		self.apply_zone_penalty(slots)
+		profiler.lap('zone_penalty')
+
+		# Траты энергии, здоровье и старение (векторный аналог Creature.update())
+		pool.update(slots)
+		profiler.lap('metabolism')
+
+		# Контроль размера популяции
+		# По идее в будущем волны изобилия можно двигать, подстраивая их под себя, чтобы не тянуть время
+		# Например, если популяция вымирает - сдвинуть волну изобилия до точки когда начинается рост изобилия.
+		# И наоборот, если популяиця слишком расплодилась, то можно сдвинуть волну изобилия до точки, 
+		# когда начинается скудный сезон - пищи становится все меньше.
+		# Для этого надо ввести переменную "slide_to_rise", "slide_to_descent"
+		# И тогда пока slide_to_rise==True, не надо повторно сдвигать изобилие на рост, потому что этот флаг
+		# говорит о том, что изобилие уже сдвинули, и пока оно не 
+		# станет slide_to_descent - сигмоиду не надо никуда сдвигать.
+		#
+		# С другой стороны, можно не париться, пусть скудный сезон продолжается столько сколько потребуется, 
+		# Потому что мы Остановили мутации на 50 существах, и запретили смерть на 10 существах.
+		# И теперь мы можем не переживать о вымирании. Точно также и про перенаселение.
+		#
+		# Но пока я не делаю сезоны и волны изобилия. Пока я должен сделать именно: 
+		# 1. Предотвратить вымирание популяции
+		# 2. Предотвратить перенаселенность мира
+		# Для этого в классе Worldя напишу приватный метод control_population()
+		# Внутри него должны быть методы которые в штатном режиме реализуют смерть и рождение
+		# А в крайние отрезки - запрещает смерть или запрещает размножение.
 
 		self.control_population()
+		profiler.lap('population_control')
 
 		self.proceed_food()
 
@@ -204,6 +289,7 @@ class World():
 		# Регулировка количества пищи в мире
 		if self.tick % 50 == 0:
 			self.regulate_food()
+		profiler.lap('food')
 
 		# print("POPULATION: " + str(len(self.creatures)))
 		# print("tick: " + str(self.tick) + "   | cr[0].age:"+ str(self.creatures[0].age) + " cr[0].energy:" + str(self.creatures[0].energy) + "   | cr[0].birth_ages: " + str(self.creatures[0].birth_ages) )
@@ -214,14 +300,22 @@ class World():
 		# То добавляем пищу, в соответствии с пропорцией
 		if len(self.foods) < sp.food_amount:
 			food_to_add = sp.food_amount - len(self.foods)
-			for _ in range(food_to_add):
-				if random.random() < sp.food_proportion_indoor_outdoor:
+			# Занятые клетки отвергаем по индексу пищи и пробуем другую клетку.
+			# Число попыток ограничено, чтобы на переполненной карте не зациклиться.
+			attempts = food_to_add * 10
+			food_rng = rng.stream('food')
+			while food_to_add > 0 and attempts > 0:
+				attempts -= 1
+				if food_rng.random() < sp.food_proportion_indoor_outdoor:
 					# Добавляем пищу внутри норки
-					x, y = self.zones_map.get_random_indoor_pixel()
+					x, y = self.zones_map.get_random_indoor_pixel(food_rng)
 				else:
 					# Добавляем пищу снаружи норки
-					x, y = self.zones_map.get_random_outdoor_pixel()
+					x, y = self.zones_map.get_random_outdoor_pixel(food_rng)
+				if self.food_grid[y, x] >= 0:
+					continue
 				self.add_food(Food(x, y))
+				food_to_add -= 1
 
 	def is_in_nest(self, creature):
 		# Проверяем, что существо находится внутри норки, глядя на его координаты и сравнивая их с картой зон
@@ -233,7 +327,8 @@ class World():
 	def control_population(self):
 
 		# Включить/Выключить мутации
-		if len(self.creatures) <= 50 or len(self.creatures) >= 900:
+		population = len(self.pool)
+		if population <= 50 or population >= 900:
 			sp.allow_mutations = 0
 		else:
 			sp.allow_mutations = 1
@@ -241,26 +336,20 @@ class World():
 		# if len(self.creatures)>=20:  #TODO не стал разбираться, но с этим условием - появляются существа с отрицательной энергией.
 		self.death()
 		
-		if len(self.creatures)<950:
+		if len(self.pool)<950:
 			self.reprod()
 
 	def proceed_food(self):
-		# удаляем из массива foods пищу, если она съедена, а на карту она каждый тик 
+		# удаляем из хранилища пищу, если она съедена, а на карту она каждый тик 
 		# заново наносится, так что про карту не паримся, это приятно 
-		self.foods = [food for food in self.foods if food.nutrition >= 0]
-		
-		# Старение пищи и удаление от старости
-		if self.tick % 10 == 0:
-			for food in self.foods:
-				food.food_age += 10
-				if food.food_age > sp.food_max_age:
-					self.foods.remove(food)
+		# Старение пищи, удаление съеденной и старой пищи и уплотнение колонок -
+		# векторными операциями внутри FoodStore
+		self.food_store.proceed(self.tick)
 
 	def change_food_capacity(self):
 		# Изменение параметра еды, когда пользователь поменял их из simparams
-		# TODO не влияет ли это на производительность, ненужный оверхед
-		for f in self.foods:
-			f.nutrition = sp.food_energy_capacity
+		# Одна операция заполнения колонки
+		self.food_store.fill_nutrition(sp.food_energy_capacity)
 
 	def death(self):
 		"""
@@ -268,78 +357,96 @@ class World():
 		не менее 10 существ с положительной энергией
 		"""
 		
+		pool = self.pool
+		slots = pool.slots()
+		health = pool.health[slots]
+
 		# Считаем количество существ у которых Здоровье > 0
-		positive_health_count = sum(1 for creature in self.creatures if creature.health > 0)
+		positive_health_count = int(np.count_nonzero(health > 0))
 		
 		# Если существ с здоровьем > 0 меньше 10 шт, то не фильтруем
 		if positive_health_count < 10:
 			# Именно тут надо поднять всем здоровье, потому что существ в популяции может быть 11, 
 			# но по факту все они уже мертвы (с отрицательной энергией)
-			for cr in self.creatures:
-				if cr.health <= 0:
-					cr.health = 1.0
-					cr.energy = 1.0
-					cr.age = random.randint(0, 100)
+			revived = slots[health <= 0]
+			pool.health[revived] = 1.0
+			pool.energy[revived] = 1.0
+			pool.age[revived] = rng.stream('population').integers(0, 101, size=len(revived))
 			return
 		
+		dead_slots = slots[health < 0]
+
 		# Здесь надо как-то сохранить статистику по умершим существам
-		# Пока кот так в лоб TODO потом надо както оптимизировтаь этот код
 		if logme.is_enabled():
-			for cr in self.creatures:
-				if cr.health < 0:
-					logme.write_death_stats(
-						id=cr.id,
-						generation=cr.generation,
-						age=cr.age,
-						reprod_ages=cr.birth_ages
-					)
-
-		# Иначе удаляем существ с энергией < 0
-		self.creatures = [creature for creature in self.creatures if creature.health >= 0]
+			for slot in dead_slots:
+				cr = pool.objects[slot]
+				logme.write_death_stats(
+					id=cr.id,
+					generation=cr.generation,
+					age=cr.age,
+					reprod_ages=cr.birth_ages
+				)
+
+		# Иначе удаляем существ с энергией < 0, их слоты уходят в free-list пула
+		pool.release_many(dead_slots)
 	
 		
 
 	def reprod(self):
 		# Цикл размножения
 		baby_creatures = []
-		for i in filter(lambda c:c.age in c.birth_ages, self.creatures):
-			i_children = i.reprodCreature()
+		parent_slots = []
+		# Возраст берем сразу колонкой, чтобы не дергать пул по одному существу
+		ages = self.pool.age[self.pool.slots()].tolist()
+		for i, age in zip(self.creatures, ages):
+			if age not in i.birth_ages:
+				continue
+			i_children = i.reprodCreature(mutate=False)
 			baby_creatures += i_children
+			parent_slots += [i.slot] * len(i_children)
 			# print("Существо с ID " + str(i.id) + " родило " + str(len(i_children)) + " детей.")
 			if logme.is_enabled():
 				logme.log_event(creature_id=i.id, tick=self.tick, event_type="CREATE_CHILD", value=len(i_children))
-		self.creatures += baby_creatures
+		baby_slots = []
+		for baby, parent_slot in zip(baby_creatures, parent_slots):
+			self.add_creature(baby, parent_slot) # веса потомка - копия строки родителя в банке
+			baby_slots.append(baby.slot)
+
+		# Мутируем всех новорожденных тика одним пакетом, прямо в банке весов
+		if baby_slots and sp.allow_mutations == 1:
+			self.pool.mutate_genomes(baby_slots, sp.mutation_probability, sp.mutation_strength, rng.stream('mutation'))
 		
 	
-	def apply_zone_penalty(self, creature):
+	def apply_zone_penalty(self, slots):
 		
 			# Тут можно добавить наказание за нахождение вне норок, будем условно называть это повреждением от радиации.
 			# Смотрим в дополнительную карту - синий там пиксель или нет. Если синий, значит существо находится внутри норки
 			# и наказывать его не надо. Если же там не синий, значит существо находится вне норки, и тогда можно отнимать энергию за радиацию. 
-			# Конечно, хорошо бы это вынести в метод World.is_in_nest(creature) который бы проверял по координатам существо и возвращал 
-			# True или False, в зависимости от того, находится ли существо внутри норки или нет. 
-			# И тогда в этом месте можно было бы написать что-то вроде:
 			# Наверное наказание должно быть не постоянным, а например, когда tick кратен 10 или 100, 
 			# тогда существо получает радиационное повреждение, если находится вне норки. И тогда наказание будет
 			# не таким уж и жестоким, и можно будет пстепенно сокращать этот период, чтобы постепенно не убиваю всю популяцию,
 			# вести приспособленности - не высовываться из норки без крайней необходимости в пище.
-			# ... 
+			# Штраф считается сразу для всех слотов - колонками пула.
 
-			creature.input_hurting = 0.0 # Сбрасываем сигнал "получаю повреждение", чтобы нейросеть могла реагировать на него, и не держать его постоянно включенным после того, как угроза повреждения исчезла.
+			pool = self.pool
+			pool.input_hurting[slots] = 0.0 # Сбрасываем сигнал "получаю повреждение", чтобы нейросеть могла реагировать на него, и не держать его постоянно включенным после того, как угроза повреждения исчезла.
 
 			if sp.zones_penalty_mode == 0:
 				return # нет наказания
 
-			if random.random() > sp.zones_penalty_probability:
-				return # не применяем штраф в этом тике, потому что сработала вероятность
-			
-			is_indoor = self.is_in_nest(creature)
-			if sp.zones_penalty_mode == 1 and is_indoor:
-				creature.health -= sp.zones_penalty
-				creature.input_hurting = 1.0 # Сигнализируем нейросети, что существо получает наказание
-			elif sp.zones_penalty_mode == 2 and not is_indoor:
-				creature.health -= sp.zones_penalty
-				creature.input_hurting = 1.0 # Сигнализируем нейросети, что существо получает наказание
+			# Штраф в этом тике применяется с вероятностью zones_penalty_probability
+			penalized = rng.stream('zone_penalty').random(len(slots)) <= sp.zones_penalty_probability
+			is_indoor = self.zones_map.is_indoor_many(pool.x[slots], pool.y[slots])
+			if sp.zones_penalty_mode == 1:
+				penalized &= is_indoor
+			elif sp.zones_penalty_mode == 2:
+				penalized &= ~is_indoor
+			else:
+				return
+
+			hurt_slots = slots[penalized]
+			pool.health[hurt_slots] -= sp.zones_penalty
+			pool.input_hurting[hurt_slots] = 1.0 # Сигнализируем нейросети, что существо получает наказание
 
 	
 	def creature_bite(self, cr):
@@ -370,6 +477,7 @@ class World():
 			# Уменьшить энергию у пищи.
 			bitten_food = self.bitten_food( int(bitex), int(bitey) )
 			if bitten_food is not None:
+				# Доеденная пища (nutrition < 0) удалится в конце тика в proceed_food()
 				bitten_food.decrement()
 
 
@@ -427,10 +535,11 @@ class World():
 		
 
 	def bitten_food(self, x, y) -> Food | None:
-		for food in self.foods:
-			if food.x == x and food.y == y:
-				return food
-		return None
+		# Поиск пищи по индексу клетки - O(1) вместо просмотра всего списка
+		index = self.food_store.index_at(x, y)
+		if index < 0:
+			return None
+		return Food.view(self.food_store, index)
 
 
 
@@ -439,7 +548,7 @@ class World():
 
 
 	@staticmethod
-	@jit(nopython=True, fastmath=True)
+	@jit(nopython=True, fastmath=True, cache=True)
 	def fast_get_all_visions(map, creatures_pos):
 		step = 0.9 # шаг перемещения взгляда (для raycast - дистанция на котороую двигаем вперед указатель)
 		resolution = 15 # разрешение взгляда - по сути сколько лучше отправит raycast?
@@ -558,145 +667,220 @@ class World():
 	# 	# 255*(1-1/20)  = 255 * 1-0,05
 	# 	# 255*(1-20/20) = 255 * 1-1
 
+	# Явные сигнатуры горячих ядер для прекомпиляции (service/jit_warmup) - те типы, что приходят из update():
+	# карта int64, позиции и обзор существ float64, маска записи точек лучей bool; выходы сетей и колонки пула float32.
+	# Декораторы ядер остаются ленивыми, и сигнатура применяется только в прогреве - поэтому update()
+	# (get_all_visions и вызов fast_apply_all_outs) сам приводит аргументы к этим типам
+	VISION_SIGNATURE = '(int64[:, ::1], float64[:, ::1], float64, boolean[::1])'
+	APPLY_OUTS_SIGNATURE = '(float32[:, ::1], float32[::1], float32[::1], float32[::1], int64[:, ::1], float64)'
+
 	@staticmethod
-	@jit(nopython=True, fastmath=True)
-	def fast_get_all_visions_darken_with_distance(map, creatures_pos, day_lighting_rate: float = 1.0):
+	@jit(nopython=True, fastmath=True, parallel=True, cache=True)
+	def fast_get_all_visions_darken_with_distance(map, creatures_pos, day_lighting_rate, record_dots):
+		# record_dots[i] - записывать ли точки лучей i-го существа для отрисовки.
+		# Если никого не записываем, под точки не выделяется ни одного элемента.
 		step = 0.9 # шаг перемещения взгляда (для raycast - дистанция на котороую двигаем вперед указатель)
 		resolution = 15 # разрешение взгляда - по сути сколько лучше отправит raycast?
 		angleofview = 1.04719 # это примерно 60 градусов
 		anglestep = 1.04719 / resolution
-		distance_of_view = creatures_pos[0,3]
-		dots_in_ray = int(distance_of_view/step)
 		n_creatures = creatures_pos.shape[0] # Выясним сколько существ в массиве creatures_pos
-		
-		max_raycast_dots = n_creatures * resolution * dots_in_ray + 1000  # 1000 - это запас на случай переполнения
-		raycast_dots = np.zeros((max_raycast_dots, 2), dtype='float') # тут хранятся просто точки, и двойка тут означает просто X,Y
-		raycast_dots_idx=0
-		all_visions = np.zeros((n_creatures, resolution*3), dtype='int') # ВСЕГДА ОДИНАКОВЫЙ РАЗМЕР. 15 пикселов для 5 существ
-		
-		for index, cr in enumerate(creatures_pos):
-			visionRed = np.zeros(15, dtype='int')
-			visionGreen = np.zeros(15, dtype='int')
-			visionBlue = np.zeros(15, dtype='int')
-			vision_idx = 0
+		mh = map.shape[0]
+		mw = map.shape[1]
+		# Добавляем минимальную видимость 0.05 чтобы совсем не исчезало
+		lighting_factor = max(0.05, day_lighting_rate)
+
+		# У каждого существа своя дальность зрения (creatures_pos[:, 3]), а значит и свое число точек в луче.
+		# Заранее выдаем каждому записываемому существу собственный участок raycast_dots:
+		# потоки пишут каждый в свой участок, общего счетчика точек нет.
+		dots_offsets = np.zeros(n_creatures + 1, dtype=np.int64)
+		for index in range(n_creatures):
+			dots_in_ray = 0
+			if record_dots[index]:
+				dots_in_ray = max(0, int(creatures_pos[index, 3] / step) + 1)
+			dots_offsets[index + 1] = dots_offsets[index] + resolution * dots_in_ray
+		raycast_dots = np.zeros((dots_offsets[n_creatures], 2), dtype=np.float64) # тут хранятся просто точки, и двойка тут означает просто X,Y
+		dots_counts = np.zeros(n_creatures, dtype=np.int64)
+		all_visions = np.zeros((n_creatures, resolution*3), dtype=np.int64) # ВСЕГДА ОДИНАКОВЫЙ РАЗМЕР. 15 пикселов красного, зеленого, синего
+
+		# Параллельно обрабатываем всех существ
+		for index in prange(n_creatures):
+			cr_x = creatures_pos[index, 0]
+			cr_y = creatures_pos[index, 1]
+			cr_angle = creatures_pos[index, 2]
+			distance_of_view = creatures_pos[index, 3]
+			record = record_dots[index]
+			dots_idx = dots_offsets[index]
 
 			for a in range(resolution):
 				adelta = -1*angleofview/2 + a*anglestep # угол текущего луча
-				d = 0 # длина текущего луча, которую постепенно увеличиваем
-				cur_vision = 0
-				while d < cr[3]:
+				d = 0.0 # длина текущего луча, которую постепенно увеличиваем
+				# Цвет пикселя; если луч ни во что не уперся или вышел за карту - черный
+				red = 0
+				green = 0
+				blue = 0
+				while d < distance_of_view:
 					d += step
-					x = cr[0] + d*math.cos(cr[2]+adelta)
-					y = cr[1] + d*math.sin(cr[2]+adelta)
-					if int(x) == int(cr[0]) and int(y) == int(cr[1]):
+					x = cr_x + d*math.cos(cr_angle+adelta)
+					y = cr_y + d*math.sin(cr_angle+adelta)
+					if int(x) == int(cr_x) and int(y) == int(cr_y):
 						continue # Если смотрит на свое тело, то пропустим эту итерацию
-					if True: #index == 0
-						# сохраним точку в массив точек
-						raycast_dots[raycast_dots_idx] = np.array([x,y])
-						raycast_dots_idx+=1
-					
-					dot = 0
+					if record:
+						# сохраним точку в участок этого существа
+						raycast_dots[dots_idx, 0] = x
+						raycast_dots[dots_idx, 1] = y
+						dots_idx += 1
+
 					ix = int(x)
 					iy = int(y)
-					mw = map.shape[1]
-					mh = map.shape[0]
 					if ix < 0 or ix >= mw or iy < 0 or iy >= mh:
-						# за пределами карты → чёрный
-						visionRed[vision_idx] = 0
-						visionGreen[vision_idx] = 0
-						visionBlue[vision_idx] = 0
-						vision_idx += 1
-						break
-					else:
-						dot = map[iy,ix]
+						break # за пределами карты → чёрный
+					dot = map[iy, ix]
 
 					# Если взгляд во что-то уперся, то Сохраняем цвет точки и Прерываем raycast
 					if dot > 0:
-						cur_vision = dot
-						# Сюда надо вставлять опреденений цветов и разложение на каналы.
-						dotColor = np.zeros(3, dtype='int')
-						if dot == 1:
-							dotColor = np.array([100,100,100])
-						elif dot == 2:
-							dotColor = np.array([255,0,0])
-						elif dot == 3:
-							dotColor = np.array([0,0,255])
-						else:
-							dotColor = np.array([0,0,0])
-
-						# Сюда вставляем искажение цвета, в зависимости от дистанции
-						# Условие нужно, потому что иногда d улетает больше чем self.viewdistance, 
-						# тогда цвет станет больше 255
-						if d < distance_of_view:
-							distance_ratio = 1 - d / distance_of_view
-
-							# 1. Уменьшаем насыщенность с дистанцией (смешиваем с серым)
-							# Чем больше дистанция, тем ближе к серому
-							desaturate_factor = distance_ratio  # на макс дистанции цвет полностью серый
-							# Или более слабое обесцвечивание: desaturate_factor = distance_ratio ** 0.5
+						red, green, blue = shade_vision_dot(dot, d, distance_of_view, lighting_factor)
+						break
 
-							# Вычисляем яркость пикселя (для перехода к серому)
-							luminance = (dotColor[0] + dotColor[1] + dotColor[2]) / 3
+				# Каналы лежат подряд: 15 красных, 15 зеленых, 15 синих
+				all_visions[index, a] = red
+				all_visions[index, resolution + a] = green
+				all_visions[index, 2*resolution + a] = blue
 
-							# Применяем обесцвечивание: смешиваем исходный цвет с серым
-							r = dotColor[0] * desaturate_factor + luminance * (1 - desaturate_factor)
-							g = dotColor[1] * desaturate_factor + luminance * (1 - desaturate_factor)
-							b = dotColor[2] * desaturate_factor + luminance * (1 - desaturate_factor)
+			dots_counts[index] = dots_idx - dots_offsets[index]
 
-							# 2. Применяем затемнение от дистанции
-							r = r * distance_ratio
-							g = g * distance_ratio
-							b = b * distance_ratio
+		# Склеиваем участки существ в один плотный массив точек (в порядке существ)
+		total_dots = 0
+		for index in range(n_creatures):
+			total_dots += dots_counts[index]
+		compact_dots = np.empty((total_dots, 2), dtype=np.float64)
+		pos = 0
+		for index in range(n_creatures):
+			start = dots_offsets[index]
+			count = dots_counts[index]
+			compact_dots[pos:pos + count] = raycast_dots[start:start + count]
+			pos += count
+		return all_visions / 255.0, compact_dots
 
-							# 3. Применяем освещенность времени суток
-							# Добавляем минимальную видимость 0.05 чтобы совсем не исчезало
-							lighting_factor = max(0.05, day_lighting_rate)
-							r = r * lighting_factor
-							g = g * lighting_factor
-							b = b * lighting_factor
 
-							dotColor[0] = int(r)
-							dotColor[1] = int(g)
-							dotColor[2] = int(b)
 
+	@staticmethod
+	@jit(nopython=True, fastmath=True, parallel=True, cache=True)
+	def fast_get_all_visions_dda(map, creatures_pos, day_lighting_rate, record_dots):
+		# Зрение через точный обход клеток сетки (Amanatides-Woo DDA).
+		# В отличие от fast_get_all_visions_darken_with_distance луч не шагает с фиксированным шагом 0.9,
+		# а переходит из клетки в соседнюю клетку ровно по границам: каждая клетка на пути луча
+		# посещается ровно один раз, тонкие диагональные стены не пропускаются,
+		# а cos/sin считаются один раз на луч. Кодирование цвета и затемнения - то же (shade_vision_dot),
+		# дистанция до объекта - расстояние до входа луча в его клетку.
+		# Аргументы и результат такие же, как у fast_get_all_visions_darken_with_distance.
+		resolution = 15 # разрешение взгляда - по сути сколько лучей отправит raycast
+		angleofview = 1.04719 # это примерно 60 градусов
+		anglestep = 1.04719 / resolution
+		n_creatures = creatures_pos.shape[0]
+		mh = map.shape[0]
+		mw = map.shape[1]
+		lighting_factor = max(0.05, day_lighting_rate)
+
+		# Луч длины L пересекает не больше L*(|cos|+|sin|) + 2 <= 1.5*L + 2 клеток
+		dots_offsets = np.zeros(n_creatures + 1, dtype=np.int64)
+		for index in range(n_creatures):
+			cells_in_ray = 0
+			if record_dots[index]:
+				cells_in_ray = max(0, int(creatures_pos[index, 3] * 1.5) + 3)
+			dots_offsets[index + 1] = dots_offsets[index] + resolution * cells_in_ray
+		raycast_dots = np.zeros((dots_offsets[n_creatures], 2), dtype=np.float64)
+		dots_counts = np.zeros(n_creatures, dtype=np.int64)
+		all_visions = np.zeros((n_creatures, resolution*3), dtype=np.int64)
+
+		for index in prange(n_creatures):
+			cr_x = creatures_pos[index, 0]
+			cr_y = creatures_pos[index, 1]
+			cr_angle = creatures_pos[index, 2]
+			distance_of_view = creatures_pos[index, 3]
+			record = record_dots[index]
+			dots_idx = dots_offsets[index]
+			start_ix = int(math.floor(cr_x))
+			start_iy = int(math.floor(cr_y))
 
-						# тут переменная dotColor содержит RGB Представление цвета
-						visionRed[vision_idx] = dotColor[0]
-						visionGreen[vision_idx] = dotColor[1]
-						visionBlue[vision_idx] = dotColor[2]
-						vision_idx += 1
-						break
+			for a in range(resolution):
+				adelta = -1*angleofview/2 + a*anglestep # угол текущего луча
+				# Направление луча - один раз на луч
+				dir_x = math.cos(cr_angle + adelta)
+				dir_y = math.sin(cr_angle + adelta)
+
+				ix = start_ix
+				iy = start_iy
+				# t_max_* - длина луча до ближайшей вертикальной/горизонтальной границы клетки,
+				# t_delta_* - длина луча между соседними границами
+				if dir_x > 0.0:
+					step_x = 1
+					t_max_x = (ix + 1 - cr_x) / dir_x
+					t_delta_x = 1.0 / dir_x
+				elif dir_x < 0.0:
+					step_x = -1
+					t_max_x = (cr_x - ix) / -dir_x
+					t_delta_x = -1.0 / dir_x
 				else:
-					# В этой ветке обслуживаем ситуацию, когда Raycast достиг 
-					# максимальной дистанции взгляда и ничего не увидел
-					visionRed[vision_idx] = 0
-					visionGreen[vision_idx] = 0
-					visionBlue[vision_idx] = 0
-					vision_idx += 1
-
-			# Превратим массив элементами карты в массив с цветами
-			# далее - ручная конкатенация трех массивов в один
-			visionRGB = np.empty(resolution*3, dtype='int')
-			# Копирую вручную (JIT это любит!)
-			visionRGB[0:15] = visionRed
-			visionRGB[15:30] = visionGreen
-			visionRGB[30:45] = visionBlue
-			# print("visionRed: " + str(visionRed))
-			# print("visionGreen: " + str(visionGreen))
-			# print("visionBlue: " + str(visionBlue))
-
-			all_visions[index] = visionRGB
-			
-		# print("Длина массива all_visions: " + str(len(all_visions)))
-		# for index,v in enumerate(all_visions):
-		#   print("Длина " + str(index) + " массива vision: " + str(len(v)))
-		# Обрезаем массив до реального размера (удаляем неиспользованные нули в конце)
-		raycast_dots = raycast_dots[:raycast_dots_idx]
-		# 18 000 против 166 000. Конечно надо обрезку делать
-		# print("raycast_dots_idx: " + str(raycast_dots_idx) + "   | raycast_dots len: " + str(len(raycast_dots)))
-		return all_visions / 255.0, raycast_dots
-
+					step_x = 0
+					t_max_x = np.inf
+					t_delta_x = np.inf
+				if dir_y > 0.0:
+					step_y = 1
+					t_max_y = (iy + 1 - cr_y) / dir_y
+					t_delta_y = 1.0 / dir_y
+				elif dir_y < 0.0:
+					step_y = -1
+					t_max_y = (cr_y - iy) / -dir_y
+					t_delta_y = -1.0 / dir_y
+				else:
+					step_y = 0
+					t_max_y = np.inf
+					t_delta_y = np.inf
+
+				red = 0
+				green = 0
+				blue = 0
+				# Своя клетка пропускается сама собой: первый шаг уводит луч в соседнюю клетку
+				while True:
+					if t_max_x < t_max_y:
+						d = t_max_x
+						ix += step_x
+						t_max_x += t_delta_x
+					else:
+						d = t_max_y
+						iy += step_y
+						t_max_y += t_delta_y
+					if d >= distance_of_view:
+						break # луч достиг дальности зрения и ничего не увидел → чёрный
+					if record:
+						raycast_dots[dots_idx, 0] = cr_x + d * dir_x
+						raycast_dots[dots_idx, 1] = cr_y + d * dir_y
+						dots_idx += 1
+					if ix < 0 or ix >= mw or iy < 0 or iy >= mh:
+						break # за пределами карты → чёрный
+					dot = map[iy, ix]
+					if dot > 0:
+						red, green, blue = shade_vision_dot(dot, d, distance_of_view, lighting_factor)
+						break
 
+				all_visions[index, a] = red
+				all_visions[index, resolution + a] = green
+				all_visions[index, 2*resolution + a] = blue
+
+			dots_counts[index] = dots_idx - dots_offsets[index]
+
+		# Склеиваем участки существ в один плотный массив точек (в порядке существ)
+		total_dots = 0
+		for index in range(n_creatures):
+			total_dots += dots_counts[index]
+		compact_dots = np.empty((total_dots, 2), dtype=np.float64)
+		pos = 0
+		for index in range(n_creatures):
+			start = dots_offsets[index]
+			count = dots_counts[index]
+			compact_dots[pos:pos + count] = raycast_dots[start:start + count]
+			pos += count
+		return all_visions / 255.0, compact_dots
 
 	def simparams_print(self):
 		"""Вывод всех параметров симуляции в консоль."""
@@ -742,6 +926,55 @@ class World():
 		newy = creature_y + new_speed*math.sin(new_angle)
 
 		return new_angle, new_speed, newx, newy
+
+	@staticmethod
+	@jit(nopython=True, parallel=True, fastmath=True, cache=True)
+	def fast_apply_all_outs(all_outs, creatures_x, creatures_y, creatures_angle, walls_map, energy_loss_collision):
+		# Быстрый вариант apply_outs() сразу для всех существ, вместе с правилами перемещения:
+		# - выход за пределы карты и стена блокируют перемещение (сигнал wayblocked = 1.0)
+		# - за столкновение со стеной начисляется штраф энергии
+		# - bite_mask отмечает существ, которые хотят куснуть (выход bite > 0.5)
+		n_creatures = all_outs.shape[0]
+		mh = walls_map.shape[0]
+		mw = walls_map.shape[1]
+		new_angle = np.empty(n_creatures, dtype=np.float32)
+		new_speed = np.empty(n_creatures, dtype=np.float32)
+		new_x = np.empty(n_creatures, dtype=np.float32)
+		new_y = np.empty(n_creatures, dtype=np.float32)
+		wayblocked = np.zeros(n_creatures, dtype=np.float32)
+		collision_penalty = np.zeros(n_creatures, dtype=np.float32)
+		bite_mask = np.zeros(n_creatures, dtype=np.bool_)
+
+		for i in prange(n_creatures):
+			# Та же формула, что и в apply_outs()
+			angle = (creatures_angle[i] + all_outs[i, 0]*0.25) % (2 * math.pi)
+			speed = all_outs[i, 1]*0.1
+			x = creatures_x[i] + speed*math.cos(angle)
+			y = creatures_y[i] + speed*math.sin(angle)
+			new_angle[i] = angle
+			new_speed[i] = speed
+
+			ix = int(x)
+			iy = int(y)
+			is_ok_to_go = True
+			if ix < 0 or ix > mw-1 or iy < 0 or iy > mh-1:
+				is_ok_to_go = False
+			elif walls_map[iy, ix] == 1:
+				# Существо столкнулось со стеной
+				is_ok_to_go = False
+				collision_penalty[i] = energy_loss_collision
+
+			if is_ok_to_go:
+				new_x[i] = x
+				new_y[i] = y
+			else:
+				new_x[i] = creatures_x[i]
+				new_y[i] = creatures_y[i]
+				wayblocked[i] = 1.0
+
+			bite_mask[i] = all_outs[i, 2] > 0.5
+
+		return new_angle, new_speed, new_x, new_y, wayblocked, collision_penalty, bite_mask
 	
 	@staticmethod
 	def dayLighting(tick):
@@ -752,18 +985,51 @@ class World():
 		return 1.0
 
 
-	def get_all_other_inputs(creatures):
+	@staticmethod
+	def get_all_other_inputs(pool, slots):
 		# Эта функция превращает все остальные входы существ (кроме зрения) в векторизованный массив numpy
 		# Идея в том, что мы должны подготовить все эти данные в виде numpy массива, чтобы потом скормить его быстрой функции, которая будет делать все эти расчеты параллельно для всех существ.
 		# Входы: боль, голодание, возможно возраст, возможно близость рождения, возможно столкновение со стеной.
-		n_creatures = len(creatures)
-		all_other_inputs = np.zeros((n_creatures, 5), dtype='float') # 5 - это количество входов кроме зрения
-		for index, creature in enumerate(creatures):
-			all_other_inputs[index] = np.array([
-				creature.input_hurting,
-				creature.input_starving,
-				creature.input_wayblocked,
-				creature.input_bite_success,
-				0.111,
-			])
-		return all_other_inputs	
\ No newline at end of file
+		# Входы уже лежат колонками в пуле - просто собираем их в матрицу.
+		n_creatures = len(slots)
+		all_other_inputs = np.empty((n_creatures, 5), dtype='float') # 5 - это количество входов кроме зрения
+		all_other_inputs[:, 0] = pool.input_hurting[slots]
+		all_other_inputs[:, 1] = pool.input_starving[slots]
+		all_other_inputs[:, 2] = pool.input_wayblocked[slots]
+		all_other_inputs[:, 3] = pool.input_bite_success[slots]
+		all_other_inputs[:, 4] = 0.111
+		return all_other_inputs
+
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def shade_vision_dot(dot, d, distance_of_view, lighting_factor):
+	# Цвет клетки, в которую уперся луч зрения, с учетом дистанции и освещенности.
+	# Общий для всех ядер зрения, чтобы кодирование RGB у них совпадало.
+	if dot == 1:
+		dot_r, dot_g, dot_b = 100, 100, 100
+	elif dot == 2:
+		dot_r, dot_g, dot_b = 255, 0, 0
+	elif dot == 3:
+		dot_r, dot_g, dot_b = 0, 0, 255
+	else:
+		dot_r, dot_g, dot_b = 0, 0, 0
+
+	# Условие нужно, потому что иногда d улетает больше чем дальность зрения,
+	# тогда цвет станет больше 255
+	if d >= distance_of_view:
+		return dot_r, dot_g, dot_b
+
+	distance_ratio = 1 - d / distance_of_view
+
+	# 1. Уменьшаем насыщенность с дистанцией (смешиваем с серым)
+	# Чем больше дистанция, тем ближе к серому
+	desaturate_factor = distance_ratio  # на макс дистанции цвет полностью серый
+	luminance = (dot_r + dot_g + dot_b) / 3
+	r = dot_r * desaturate_factor + luminance * (1 - desaturate_factor)
+	g = dot_g * desaturate_factor + luminance * (1 - desaturate_factor)
+	b = dot_b * desaturate_factor + luminance * (1 - desaturate_factor)
+
+	# 2. Применяем затемнение от дистанции
+	# 3. Применяем освещенность времени суток
+	return int(r * distance_ratio * lighting_factor), int(g * distance_ratio * lighting_factor), int(b * distance_ratio * lighting_factor)
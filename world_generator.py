@@ -1,25 +1,26 @@
 # -*- coding: utf-8 -*-
 
 import csv
-import random
 import numpy as np
 from food import Food
 from creature import Creature
+from nn import get_backend
 from world import World
+from service.rng.rng import rng
 
 class WorldGenerator:
     @staticmethod
-    def generate_world(width=20, height=20, wall_count=100, food_count=10, creatures_count=15, border_walls=True):
+    def generate_world(width=20, height=20, wall_count=100, food_count=10, creatures_count=15, border_walls=True, backend_groups=None):
         world = World(width, height)
         WorldGenerator.generate_walls(world, wall_count, border_walls)
         WorldGenerator.save_walls_map(world)
         world.zones_map.generate_lefthalf_zone(world.walls_map)
         WorldGenerator.generate_food(world, food_count)
-        WorldGenerator.generate_creatures(world, creatures_count)
+        WorldGenerator.generate_creatures(world, creatures_count, backend_groups)
         return world
     
     @staticmethod
-    def generate_world_fromCSV(file_path, random_wall_count=100, food_count=10, creatures_count=15, border_walls=True):
+    def generate_world_fromCSV(file_path, random_wall_count=100, food_count=10, creatures_count=15, border_walls=True, backend_groups=None):
         print("Initialisig World from CSV file")
 
         # Сначала читаем CSV в обычный список, чтобы узнать размеры карты.
@@ -52,7 +53,7 @@ class WorldGenerator:
         WorldGenerator.generate_walls(world, random_wall_count, border_walls)
         WorldGenerator.save_walls_map(world)
         WorldGenerator.generate_food(world, food_count)
-        WorldGenerator.generate_creatures(world, creatures_count)
+        WorldGenerator.generate_creatures(world, creatures_count, backend_groups)
         return world
     
     
@@ -62,8 +63,9 @@ class WorldGenerator:
         height = world.height
 
 		# Генерация стен
+        generator = rng.stream('generator')
         for i in range(wall_count):
-            x, y = random.randint(0, width-1), random.randint(0, height-1)
+            x, y = int(generator.integers(width)), int(generator.integers(height))
             world.set_cell(x , y , 1)
         
         if border_walls:
@@ -88,24 +90,42 @@ class WorldGenerator:
         width = world.width
         height = world.height
         # Генерация еды
+        generator = rng.stream('generator')
         for _ in range(food_count):
             while True:
-                x, y = random.randint(0, width-1), random.randint(0, height-1)
-                # Проверим, что пища создается на пустой ячейке
-                if world.get_cell(x,y) == 0:
-                    world.add_food(Food(x, y))
+                x, y = int(generator.integers(width)), int(generator.integers(height))
+                # Проверим, что пища создается на пустой ячейке (и в клетке еще нет пищи)
+                if world.get_cell(x,y) == 0 and world.add_food(Food(x, y)):
                     break
     
     @staticmethod
-    def generate_creatures(world, creatures_count):
+    def generate_creatures(world, creatures_count, backend_groups=None):
         width = world.width
         height = world.height
+        # Группы существ с разными бэкендами сетей: {имя бэкенда: доля}.
+        # None - все существа получают бэкенд по умолчанию
+        backends = WorldGenerator.split_backend_groups(creatures_count, backend_groups)
         # Генерация существ
-        for _ in range(creatures_count):
+        generator = rng.stream('generator')
+        for backend in backends:
             while True:
-                x, y = random.randint(0, width-1), random.randint(0, height-1)
+                x, y = int(generator.integers(width)), int(generator.integers(height))
                 # Проверим, что существо создается на пустой ячейке
                 if world.get_cell(x,y) == 0:
-                    world.add_creature(Creature(x, y))
+                    nn = get_backend(backend)() if backend is not None else None
+                    world.add_creature(Creature(x, y, nn=nn))
                     break
+
+    @staticmethod
+    def split_backend_groups(creatures_count, backend_groups=None):
+        """Бэкенд для каждого из creatures_count существ (None - по умолчанию), по долям групп."""
+        if not backend_groups:
+            return [None] * creatures_count
+        total = sum(backend_groups.values())
+        backends = []
+        for name, share in backend_groups.items():
+            backends.extend([name] * int(creatures_count * share / total))
+        # Остаток от округления достается последней группе
+        backends.extend([name] * (creatures_count - len(backends)))
+        return backends
 		
@@ -2,7 +2,7 @@
 """Система зон (гнёзда и открытые области) для симуляции."""
 
 import numpy as np
-import random
+from service.rng.rng import rng
 
 
 class ZonesMap:
@@ -114,27 +114,35 @@ class ZonesMap:
 		if not self.outdoor_pixels:
 			raise ValueError("No outdoor pixels found in zones_map")
 	
-	def get_random_indoor_pixel(self) -> tuple:
+	def get_random_indoor_pixel(self, generator=None) -> tuple:
 		"""
 		Возвращает координаты (x, y) случайного пикселя внутри гнезда.
 		
+		Args:
+		    generator: np.random.Generator; по умолчанию - поток 'zones' сервиса rng
+		
 		Returns:
 		    Tuple (x, y) с координатами случайного indoor пикселя
 		"""
 		if not self.indoor_pixels:
 			raise RuntimeError("No indoor pixels available. Call load_from_csv() first.")
-		return random.choice(self.indoor_pixels)
+		generator = generator if generator is not None else rng.stream('zones')
+		return self.indoor_pixels[generator.integers(len(self.indoor_pixels))]
 	
-	def get_random_outdoor_pixel(self) -> tuple:
+	def get_random_outdoor_pixel(self, generator=None) -> tuple:
 		"""
 		Возвращает координаты (x, y) случайного пикселя вне гнезда.
 		
+		Args:
+		    generator: np.random.Generator; по умолчанию - поток 'zones' сервиса rng
+		
 		Returns:
 		    Tuple (x, y) с координатами случайного outdoor пикселя
 		"""
 		if not self.outdoor_pixels:
 			raise RuntimeError("No outdoor pixels available. Call load_from_csv() first.")
-		return random.choice(self.outdoor_pixels)
+		generator = generator if generator is not None else rng.stream('zones')
+		return self.outdoor_pixels[generator.integers(len(self.outdoor_pixels))]
 	
 	def is_indoor(self, x: float, y: float) -> bool:
 		"""
@@ -156,3 +164,17 @@ class ZonesMap:
 		
 		zone = self.zones_map[iy, ix]
 		return zone == self.ZONE_INDOOR
+	
+	def is_indoor_many(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+		"""
+		Векторный вариант is_indoor() для массивов координат.
+		
+		Returns:
+		    bool-массив: True для координат в indoor зоне
+		"""
+		ix = np.asarray(xs).astype(np.int64)
+		iy = np.asarray(ys).astype(np.int64)
+		inside = (ix >= 0) & (ix < self.width) & (iy >= 0) & (iy < self.height)
+		result = np.zeros(ix.shape, dtype=bool)
+		result[inside] = self.zones_map[iy[inside], ix[inside]] == self.ZONE_INDOOR
+		return result